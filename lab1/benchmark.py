@@ -0,0 +1,62 @@
+import sys
+import time
+import numpy as np
+from encoder import embed_sequential, embed_random, embed_sequential_fast, embed_random_fast, embed_random_keyed
+from decoder import (extract_message, extract_message_random, extract_message_fast, extract_message_random_fast,
+                     extract_message_random_keyed)
+from stego.positions import clear_caches
+
+TARGET = 50  # потрібне прискорення векторизованих версій на повну ємність
+
+
+# Вимірювання часу виконання функції (кеші позицій очищаються, щоб не вимірювати влучання в кеш)
+def timed(func, *args):
+    clear_caches()
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+# Порівняння циклічної та векторизованої реалізацій на повну ємність
+# (same_positions=False - варіант з іншими позиціями, тож результат не порівнюється побайтно)
+def compare(name, slow, fast, args, same_positions=True):
+    slow_result, slow_time = timed(slow, *args)
+    fast_result, fast_time = timed(fast, *args)
+    if not same_positions:
+        identical = 'n/a'
+    elif isinstance(slow_result, np.ndarray):
+        identical = slow_result.tobytes() == fast_result.tobytes()
+    else:
+        identical = slow_result == fast_result
+    speedup = slow_time / fast_time
+    print(f"{name:<24} loop {slow_time:9.3f}s  numpy {fast_time:9.4f}s  "
+          f"x{speedup:8.1f}  identical={identical}  target x{TARGET} {'met' if speedup >= TARGET else 'MISSED'}")
+    return fast_result if not same_positions else slow_result
+
+
+# Основне виконання: python -m stego.labs lab1 benchmark [висота] [ширина]
+if __name__ == '__main__':
+    height = int(sys.argv[1]) if len(sys.argv) > 1 else 1024
+    width = int(sys.argv[2]) if len(sys.argv) > 2 else 1024
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+
+    # Повідомлення, що займає всю ємність синього каналу (1 біт на піксель)
+    length = height * width // 8
+    message = ''.join(chr(c) for c in rng.integers(32, 127, length))
+    key = 340698234968
+
+    print(f"Image {width}x{height}, message {length} chars ({length * 8} bits)")
+    image_seq = compare("embed_sequential", embed_sequential, embed_sequential_fast, (image, message))
+    image_rand = compare("embed_random", embed_random, embed_random_fast, (image, message, key))
+    compare("extract_message", extract_message, extract_message_fast, (image_seq, length))
+    compare("extract_message_random", extract_message_random, extract_message_random_fast, (image_rand, length, key))
+
+    # embed_random_fast обмежений random.sample (ті самі позиції, що й у циклу); ключовий генератор
+    # позицій показує, скільки коштує сумісність зі старим порядком. random.sample на повній ємності
+    # виконує послідовну перестановку в Python, тож побайтно ідентичний варіант не досягає TARGET
+    image_keyed = compare("embed_random_keyed", embed_random, embed_random_keyed, (image, message, key), False)
+    _, legacy_time = timed(embed_random_fast, image, message, key)
+    _, keyed_time = timed(embed_random_keyed, image, message, key)
+    print(f"{'random.sample gap':<24} fast {legacy_time:9.4f}s  keyed {keyed_time:9.4f}s  "
+          f"x{legacy_time / keyed_time:8.1f}  "
+          f"roundtrip={extract_message_random_keyed(image_keyed, length, key) == message}")
@@ -1,5 +1,9 @@
 import random
-from utils import bin_to_text
+import numpy as np
+from utils import bin_to_text, bits_to_text, blue_channel_view
+
+from stego import codec
+from stego.positions import keyed_positions, sample_positions
 
 # Витягування повідомлення з послідовно вбудованого зображення
 def extract_message(image, length):
@@ -18,11 +22,37 @@ def extract_message_random(image, length, seed):
     rows, cols, channels = image.shape
     total_pixels = rows * cols
 
-    random.seed(seed)
-    positions = random.sample(range(total_pixels), length * 8)
+    positions = random.Random(seed).sample(range(total_pixels), length * 8)  # Без зміни глобального стану random
 
     for pos in positions:
         row, col = divmod(pos, cols)
         pixel_value = image[row, col]
         bin_msg += str(pixel_value[0] & 1)  # Витягуємо LSB із синього каналу
-    return bin_to_text(bin_msg)
\ No newline at end of file
+    return bin_to_text(bin_msg)
+
+# Векторизоване витягування з послідовно вбудованого зображення (length - у байтах UTF-8)
+# length=None читає заголовок embed_sequential_fast(header=True); None, якщо заголовка немає
+def extract_message_fast(image, length=None):
+    blue = blue_channel_view(np.ascontiguousarray(image))
+    if length is None:
+        return codec.unpack_text(lambda start, count: blue[start:start + count] & 1, blue.size)
+    return bits_to_text(blue[:length * 8] & 1)
+
+# Векторизоване витягування з випадково вбудованого зображення
+def extract_message_random_fast(image, length, seed):
+    blue = blue_channel_view(np.ascontiguousarray(image))
+    positions = sample_positions(seed, blue.size, length * 8)  # Кешовані позиції для пакетної обробки
+    return bits_to_text(blue[positions] & 1)
+
+# Витягування повідомлення, вбудованого embed_random_keyed (length=None - читання заголовка)
+def extract_message_random_keyed(image, length, seed):
+    blue = blue_channel_view(np.ascontiguousarray(image))
+    if length is None:
+        # Ключові позиції мають однаковий префікс за будь-якої довжини, тож читаємо їх частинами
+        def read_bits(start, count):
+            count = max(0, min(count, blue.size - start))
+            return blue[keyed_positions(seed, blue.size, count, start)] & 1
+        return codec.unpack_text(read_bits, blue.size)
+    positions = keyed_positions(seed, blue.size, length * 8)
+    return bits_to_text(blue[positions] & 1)
+
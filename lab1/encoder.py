@@ -1,6 +1,10 @@
 import cv2
 import random
-from utils import text_to_bin
+import numpy as np
+from utils import text_to_bin, text_to_bits, blue_channel_view
+
+from stego import codec
+from stego.positions import keyed_positions, sample_positions
 
 # Послідовне вбудовування повідомлення
 def embed_sequential(image, message):
@@ -25,8 +29,7 @@ def embed_random(image, message, seed):
     rows, cols, channels = img_mod.shape
     total_pixels = rows * cols
 
-    random.seed(seed)
-    positions = random.sample(range(total_pixels), len(bin_msg))
+    positions = random.Random(seed).sample(range(total_pixels), len(bin_msg))  # Без зміни глобального стану random
 
     for i, pos in enumerate(positions):
         row, col = divmod(pos, cols)
@@ -34,4 +37,34 @@ def embed_random(image, message, seed):
         pixel_value[0] = (pixel_value[0] & 254) | int(bin_msg[i])  # Модифікуємо лише синій канал
         img_mod[row, col] = pixel_value
 
-    return img_mod
\ No newline at end of file
+    return img_mod
+
+# Векторизоване послідовне вбудовування (результат ідентичний embed_sequential)
+# header=True додає заголовок (сигнатура, довжина, CRC32), тож витягування не потребує довжини
+def embed_sequential_fast(image, message, header=False):
+    bits = codec.pack(message) if header else text_to_bits(message)
+    img_mod = np.ascontiguousarray(image).copy()
+    blue = blue_channel_view(img_mod)
+    bits = bits[:blue.size]  # Як і в циклі, зайві біти відкидаються
+    blue[:bits.size] = (blue[:bits.size] & 254) | bits
+    return img_mod
+
+# Векторизоване випадкове вбудовування (ті самі позиції, що й у embed_random) - лише для сумісності
+# з extract_message_random: позиції все одно генерує random.sample, і він займає більшу частину часу.
+# Для швидкого шляху - embed_random_keyed / extract_message_random_keyed
+def embed_random_fast(image, message, seed):
+    bits = text_to_bits(message)
+    img_mod = np.ascontiguousarray(image).copy()
+    blue = blue_channel_view(img_mod)
+    positions = sample_positions(seed, blue.size, bits.size)  # Кешовані позиції для пакетної обробки
+    blue[positions] = (blue[positions] & 254) | bits
+    return img_mod
+
+# Випадкове вбудовування з ключовим генератором позицій (O(k), інше розташування, ніж embed_random)
+def embed_random_keyed(image, message, seed, header=False):
+    bits = codec.pack(message) if header else text_to_bits(message)
+    img_mod = np.ascontiguousarray(image).copy()
+    blue = blue_channel_view(img_mod)
+    positions = keyed_positions(seed, blue.size, bits.size)
+    blue[positions] = (blue[positions] & 254) | bits
+    return img_mod
@@ -1,10 +1,17 @@
+import argparse
+import os
 from datetime import datetime
 from encoder import embed_sequential, embed_random
 from decoder import extract_message, extract_message_random
-from utils import read_jpg, write_jpg, plot_histogram, mse
+from utils import read_jpg, write_jpg, plot_histogram, lsb_pair_stats, mse
 
-# Основне виконання
+# Основне виконання: python -m stego.labs lab1 main [--plot | --report-dir DIR]
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Послідовне та випадкове LSB-вбудовування (lab1).")
+    parser.add_argument('--plot', action='store_true', help="показати порівняння гістограм (без дисплея - записати PNG)")
+    parser.add_argument('--report-dir', help="записати гістограми у PNG у цю директорію, не відкриваючи вікон")
+    args = parser.parse_args()
+
     image_name = "image_1"
     image = read_jpg(f"images/{image_name}.jpg")  # Читаємо зображення з файлу
     message = """
@@ -21,14 +28,22 @@ if __name__ == '__main__':
     write_jpg(f"./images/{image_name}_random_{datetime.now().strftime('%Y_%m_%d_%H_%M_%S')}.jpg", image_rand)
 
     # --- Декодування ---
-    retrieved_msg_seq = extract_message(image_seq, len(message))
+    length = len(message.encode('utf-8'))  # довжина в байтах UTF-8, а не в символах
+    retrieved_msg_seq = extract_message(image_seq, length)
     print("Retrieved Message (Sequential):", retrieved_msg_seq)
 
-    retrieved_msg_rand = extract_message_random(image_rand, len(message), key)
+    retrieved_msg_rand = extract_message_random(image_rand, length, key)
     print("Retrieved Message (Random):", retrieved_msg_rand)
 
     # --- Аналіз ---
-    plot_histogram(image, image_seq)  # Порівняння гістрограм
-    plot_histogram(image, image_rand)  # Порівняння гістрограм
+    if args.report_dir:
+        os.makedirs(args.report_dir, exist_ok=True)
+        plot_histogram(image, image_seq, output=os.path.join(args.report_dir, f"{image_name}_seq_histogram.png"))
+        plot_histogram(image, image_rand, output=os.path.join(args.report_dir, f"{image_name}_random_histogram.png"))
+    elif args.plot:
+        plot_histogram(image, image_seq)  # Порівняння гістрограм
+        plot_histogram(image, image_rand)  # Порівняння гістрограм
+    print("LSB pair imbalance (Original / Sequential / Random):",
+          *(f"{lsb_pair_stats(img)['imbalance_mean']:.4f}" for img in (image, image_seq, image_rand)))
     print("MSE (Sequential):", mse(image, image_seq))
     print("MSE (Random):", mse(image, image_rand))
@@ -1,42 +1,54 @@
 import cv2
-import numpy as np
-from matplotlib import pyplot as plt
 
+from stego import codec, metrics
+from stego.histograms import channel_histograms, lsb_pairs, plot_histograms
+from stego.images import imread
 
-# Читання JPG зображення
+
+# Читання JPG зображення (через спільний кеш декодованих зображень; масив лише для читання)
 def read_jpg(filename):
-    return cv2.imread(filename)
+    return imread(filename)
 
 # Запис JPG зображення
 def write_jpg(filename, image, quality=95):
     cv2.imwrite(filename, image, [int(cv2.IMWRITE_JPEG_QUALITY), quality])
 
-# Перетворення тексту в бінарний формат
+# Перетворення тексту в бінарний формат (рядок '0'/'1', текст кодується в UTF-8)
 def text_to_bin(text):
-    return ''.join(format(ord(c), '08b') for c in text)
+    return codec.bits_to_string(codec.to_bits(text))
 
 # Перетворення бінарного формату в текст
 def bin_to_text(binary):
-    chars = [binary[i:i + 8] for i in range(0, len(binary), 8)]
-    return ''.join(chr(int(c, 2)) for c in chars)
+    return codec.bits_to_text(codec.string_to_bits(binary))
+
+# Перетворення повідомлення (str, bytes або готовий масив бітів) у масив бітів uint8
+def text_to_bits(text):
+    return codec.to_bits(text)
+
+# Перетворення масиву бітів у текст UTF-8
+def bits_to_text(bits):
+    return codec.bits_to_text(bits)
 
-# Обчислення MSE (середньоквадратичної помилки) між двома зображеннями
+# Плаский вигляд (view) синього каналу без копіювання даних
+def blue_channel_view(image):
+    return image.reshape(-1, image.shape[2])[:, 0]
+
+# Обчислення MSE (середньоквадратичної помилки) між двома зображеннями (фрагментами, без копій у float)
 def mse(image1, image2):
-    return np.mean((image1.astype(np.float32) - image2.astype(np.float32)) ** 2)
+    return metrics.mse(image1, image2)
+
+# Гістограми каналів (масив (канали, 256)) - через np.bincount, без matplotlib
+def histograms(image):
+    return channel_histograms(image)
 
-# Аналіз гістрограми
-def plot_histogram(original, modified, title="Histogram Comparison"):
-    plt.figure(figsize=(10, 5))
+# Статистики пар значень (2k, 2k+1) синього каналу: різниця частот у парах зменшується після LSB-вбудовування
+def lsb_pair_stats(image):
+    return lsb_pairs(channel_histograms(image)[0])
 
+# Аналіз гістрограми (matplotlib імпортується лише тут; з output або без дисплея графік записується у PNG)
+def plot_histogram(original, modified, title="Histogram Comparison", output=None):
     # Аналізуємо лише синій канал (індекс 0 у BGR)
-    plt.hist(original[:, :, 0].ravel(), bins=256, alpha=0.7, label='Original', color='blue', edgecolor='black',
-             linewidth=0.5)
-    plt.hist(modified[:, :, 0].ravel(), bins=256, alpha=0.7, label='Modified', color='orange', edgecolor='black',
-             linewidth=0.5)
-
-    plt.title(title)
-    plt.xlabel('Pixel Intensity (Blue Channel)')
-    plt.ylabel('Frequency')
-    plt.legend()
-    plt.grid(True, alpha=0.3)
-    plt.show()
\ No newline at end of file
+    return plot_histograms([
+        ('Original', 'blue', channel_histograms(original)[0]),
+        ('Modified', 'orange', channel_histograms(modified)[0]),
+    ], title, 'Pixel Intensity (Blue Channel)', output)
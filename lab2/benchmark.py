@@ -0,0 +1,45 @@
+import sys
+import time
+import numpy as np
+from script import (apply_palette_substitution, reverse_palette_substitution, apply_palette_substitution_fast,
+                    reverse_palette_substitution_fast, build_palette_lut, apply_palette)
+
+
+def timed(func, *args):
+    """Повертає результат виклику функції та час його виконання."""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def report(name, reference, reference_time, result, result_time):
+    """Друкує прискорення та перевіряє, що результат збігається з еталонним."""
+    print(f"{name:<36} {result_time:9.4f}s  x{reference_time / result_time:9.1f}  "
+          f"identical={np.array_equal(reference, result)}")
+
+
+# Основне виконання: python -m stego.labs lab2 benchmark [висота] [ширина]
+if __name__ == '__main__':
+    height = int(sys.argv[1]) if len(sys.argv) > 1 else 512
+    width = int(sys.argv[2]) if len(sys.argv) > 2 else 512
+    img_arr = np.random.default_rng(0).integers(0, 256, (height, width, 3), dtype=np.uint8)
+    color = (99, 99, 99)
+    print(f"Image {width}x{height}")
+
+    encoded, encoded_time = timed(apply_palette_substitution, img_arr, color)
+    print(f"{'apply_palette_substitution (loop)':<36} {encoded_time:9.4f}s")
+    report("apply_palette_substitution_fast", encoded, encoded_time,
+           *timed(apply_palette_substitution_fast, img_arr, color))
+
+    # Довільна палітра через таблицю: тут будуємо ту саму XOR-палітру, що й цикл
+    unique = np.unique(img_arr.reshape(-1, 3), axis=0)
+    palette = {tuple(int(c) for c in pixel): tuple(int(c) for c in np.bitwise_xor(pixel, color)) for pixel in unique}
+    lut, lut_time = timed(build_palette_lut, palette)
+    result, apply_time = timed(apply_palette, img_arr, lut)
+    print(f"{'build_palette_lut':<36} {lut_time:9.4f}s")
+    report("apply_palette (24-bit lookup)", encoded, encoded_time, result, apply_time)
+
+    decoded, decoded_time = timed(reverse_palette_substitution, encoded, color)
+    print(f"{'reverse_palette_substitution (loop)':<36} {decoded_time:9.4f}s")
+    report("reverse_palette_substitution_fast", decoded, decoded_time,
+           *timed(reverse_palette_substitution_fast, encoded, color))
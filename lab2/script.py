@@ -1,8 +1,9 @@
 import os
-import time
 import numpy as np
 from PIL import Image
-from skimage.metrics import structural_similarity as ssim
+
+from stego import codec, metrics
+from stego.positions import shuffled_indexes, inverse_shuffled_indexes
 
 UINT_8 = 'uint8' # кодування для зберігання
 MODE = 'RGB' # мод читання та запису зображення
@@ -24,10 +25,8 @@ def save_image(img_arr, output_path):
 
 def get_shuffled_indexes(size, seed):
     """Генерує список перемішаних індексів на основі seed."""
-    np.random.seed(seed) # встановлення seed для генератора
-    indexes = np.arange(size) # утворення індексів з 0 до size - 1
-    np.random.shuffle(indexes) # перемішування в довільному форматі
-    return indexes
+    # Перестановка кешується за (seed, size) і не змінює глобальний стан np.random
+    return shuffled_indexes(seed, size)
 
 def permute_pixels(img_arr, seed):
     """Виконує псевдовипадкову перестановку пікселів."""
@@ -38,8 +37,7 @@ def permute_pixels(img_arr, seed):
 
 def inverse_permute_pixels(img_arr, seed):
     """Відновлює вихідне зображення після перестановки пікселів."""
-    indexes = get_shuffled_indexes(img_arr.size // 3, seed)  # Генерація переставлених індексів для пікселів
-    inverse_indexes = np.argsort(indexes)  # Створення зворотних індексів для відновлення початкового порядку
+    inverse_indexes = inverse_shuffled_indexes(seed, img_arr.size // 3)  # Зворотні індекси (scatter замість argsort, з кешу)
     restored_pixels = permute_pixels_helper(img_arr, inverse_indexes)  # Відновлення пікселів у початковому порядку
     return restored_pixels.reshape(img_arr.shape)  # Повертаємо зображення в початкову форму
 
@@ -49,35 +47,29 @@ def permute_pixels_helper(img_arr, indexes):
     return pixel_to_rgb_channels[indexes]  # Перестановка пікселів за допомогою заданих індексів
 
 def text_to_binary(text):
-    """Конвертує текст у бінарний рядок."""
-    binary = ""
-    for item in text:
-        binary += bin(ord(item))[2:].zfill(8)  # Отримуємо бінарне значення символу та доповнюємо до 8 бітів
-    return binary
+    """Конвертує текст (UTF-8) у бінарний рядок."""
+    return codec.bits_to_string(codec.to_bits(text))  # Без квадратичного += по символах
 
 
 def binary_to_text(binary_data):
     """Конвертує бінарний рядок у текст."""
-    text = ""
-    for i in range(0, len(binary_data), 8):
-        byte = binary_data[i:i+8]  # Витягуємо кожен байт (8 бітів)
-        text += chr(int(byte, 2))  # Конвертуємо бінарне значення в символ і додаємо до результату
-    return text.rstrip('\x00')  # Видаляємо нульові байти (якщо є)
-
-
-def block_hide(img_arr, secret_data, block_size=8):
-    """Приховує секретне повідомлення у блоках зображення."""
-    height, width, _ = img_arr.shape  # Отримуємо розміри зображення (висота, ширина, кількість каналів)
-    binary_secret_data = text_to_binary(secret_data)  # Перетворюємо секретне повідомлення в бінарний рядок
-    padded_binary_data = binary_secret_data + '0' * ((height * width) - len(binary_secret_data))  # Додаємо нулі до бінарного рядка, якщо довжина повідомлення менша за площу зображення
+    return codec.bits_to_text(codec.string_to_bits(binary_data)).rstrip('\x00')  # Видаляємо нульові байти (якщо є)
+
+
+def block_hide(img_arr, secret_data, block_size=8, header=False):
+    """Приховує секретне повідомлення (str, bytes або масив бітів) у блоках зображення.
+
+    header=True додає заголовок (сигнатура, довжина, CRC32) для extract_block_data(header=True).
+    """
     image_with_hidden_data = img_arr.copy()  # Створюємо копію зображення, щоб не змінювати оригінал
-    data_index = 0  # Лічильник для відстеження поточного індексу в бінарному повідомленні
-    for row in range(0, height, block_size):  # Проходимо по зображенню блоками розміру `block_size`
-        for col in range(0, width, block_size):  # Проходимо по кожному стовпцю в блоках
-            if data_index < len(padded_binary_data):  # Перевіряємо, чи є ще бінарні дані для вставки
-                red_channel = image_with_hidden_data[row, col, 0]  # Отримуємо перший канал пікселя (червоний)
-                image_with_hidden_data[row, col, 0] = replace_least_significant_bit(red_channel, padded_binary_data[data_index]) # Використовуємо нову функцію для заміщення останнього біта
-                data_index += 1  # Збільшуємо індекс для наступного біта
+    # Лівий верхній піксель кожного блоку, червоний канал (view на копію)
+    red_channel = image_with_hidden_data[::block_size, ::block_size, 0]
+    bits = codec.pack(secret_data) if header else codec.to_bits(secret_data)
+    bits = bits[:red_channel.size]  # Біти, що не вміщуються, відкидаються
+    # Решта блоків отримує нульовий біт, як при доповненні повідомлення нулями до площі зображення
+    padded_bits = np.zeros(red_channel.size, dtype=np.uint8)
+    padded_bits[:bits.size] = bits
+    red_channel[...] = replace_least_significant_bit(red_channel, padded_bits.reshape(red_channel.shape))
     return image_with_hidden_data  # Повертаємо зображення з прихованими даними
 
 
@@ -85,20 +77,33 @@ def replace_least_significant_bit(red_channel, bit_value):
     """Заміщає останній біт червоного каналу на заданий біт з бінарного повідомлення."""
     # Використовуємо маску червоного каналу для того, щоб залишити всі біти, окрім останнього,
     # а потім додаємо новий біт на місце найменш значущого біта.
-    return (red_channel & RED_CHANNEL_MASK) | int(bit_value)
+    return (red_channel & RED_CHANNEL_MASK) | np.asarray(bit_value, dtype=UINT_8)
+
 
+def extract_block_data(img_arr, block_size=8, header=False, length=None):
+    """Витягує приховане повідомлення із зображення.
 
-def extract_block_data(img_arr, block_size=8):
-    """Витягує приховане повідомлення із зображення."""
-    height, weigth, _ = img_arr.shape  # Отримуємо розміри зображення (висота, ширина)
+    header=True читає лише заголовок і корисне навантаження замість усіх блоків; повертає None,
+    якщо заголовка немає. length (у байтах) читає лише перші length * 8 блоків.
+    """
+    if header:
+        red_channel = img_arr[::block_size, ::block_size, 0]
+        return codec.unpack_text(lambda start, count: read_grid_bits(red_channel, start, count), red_channel.size)
+    if length is not None:
+        return codec.bits_to_text(read_grid_bits(img_arr[::block_size, ::block_size, 0], 0, length * 8))
     # Пройдемо по кожному блоку зображення розміру `block_size` і витягнемо останній біт
-    # з кожного пікселя в червоному каналі (перший канал зображення).
-    binary_data = ''.join(
-        str(img_arr[i, j, 0] & 1)  # Отримуємо останній біт червоного каналу
-        for i in range(0, height, block_size)  # Ітеруємо по кожному блоку в напрямку висоти
-        for j in range(0, weigth, block_size)  # Ітеруємо по кожному блоку в напрямку ширини
-    )
-    return binary_to_text(binary_data)  # Перетворюємо отриманий бінарний рядок в текст
+    # з лівого верхнього пікселя в червоному каналі (перший канал зображення).
+    bits = (img_arr[::block_size, ::block_size, 0] & 1).ravel()
+    return codec.bits_to_text(bits).rstrip('\x00')  # Перетворюємо біти в текст і видаляємо нульові байти
+
+
+def read_grid_bits(grid, start, count):
+    """Читає count молодших бітів сітки блоків (по рядках), починаючи з позиції start."""
+    width = grid.shape[1]
+    first_row, last_row = start // width, -(-(start + count) // width)  # Лише рядки, що містять потрібні біти
+    bits = (grid[first_row:last_row] & 1).ravel()
+    offset = start - first_row * width
+    return bits[offset:offset + count]
 
 
 def apply_palette_substitution(img_arr, color):
@@ -136,6 +141,52 @@ def reverse_palette_substitution(img_arr, color):
     return new_img_arr
 
 
+def pack_rgb(img_arr):
+    """Пакує кожен RGB-піксель у 24-бітне ціле число (ключ кольору)."""
+    pixels = pixels_to_rbg_channels(img_arr).astype(np.uint32)
+    return (pixels[:, 0] << 16) | (pixels[:, 1] << 8) | pixels[:, 2]
+
+
+def unpack_rgb(keys, shape):
+    """Розпаковує 24-бітні ключі кольорів назад у зображення заданої форми."""
+    pixels = np.empty((keys.size, 3), dtype=UINT_8)
+    pixels[:, 0] = keys >> 16  # Червоний канал
+    pixels[:, 1] = (keys >> 8) & 0xFF  # Зелений канал
+    pixels[:, 2] = keys & 0xFF  # Синій канал
+    return pixels.reshape(shape)
+
+
+def build_palette_lut(palette, default=None):
+    """Будує щільну таблицю на 2^24 кольорів для довільної палітри {(r, g, b): (r, g, b)}.
+
+    Кольори, яких немає в палітрі, переходять у default (або лишаються без змін, якщо default=None).
+    """
+    if default is None:
+        lut = np.arange(1 << 24, dtype=np.uint32)  # Тотожне відображення
+    else:
+        lut = np.full(1 << 24, (default[0] << 16) | (default[1] << 8) | default[2], dtype=np.uint32)
+    if palette:
+        source = np.array(list(palette.keys()), dtype=np.uint32)
+        target = np.array(list(palette.values()), dtype=np.uint32)
+        lut[(source[:, 0] << 16) | (source[:, 1] << 8) | source[:, 2]] = (target[:, 0] << 16) | (target[:, 1] << 8) | target[:, 2]
+    return lut
+
+
+def apply_palette(img_arr, lut):
+    """Замінює кольори всіх пікселів за таблицею однією векторною операцією."""
+    return unpack_rgb(lut[pack_rgb(img_arr)], img_arr.shape)
+
+
+def apply_palette_substitution_fast(img_arr, color):
+    """Векторний аналог apply_palette_substitution: XOR кожного пікселя із заданим кольором."""
+    return np.bitwise_xor(img_arr, np.asarray(color, dtype=img_arr.dtype))
+
+
+def reverse_palette_substitution_fast(img_arr, color):
+    """Векторний аналог reverse_palette_substitution (XOR є власною оберненою операцією)."""
+    return np.bitwise_xor(img_arr, np.asarray(color, dtype=img_arr.dtype))
+
+
 def pixels_to_rbg_channels(img_arr):
     return img_arr.reshape(-1, 3)
 
@@ -152,6 +203,8 @@ def block_hide_executor(img_arr):
     save_image(hidden_image, f"{DIR_NAME}/{IMG_NAME}_hidden.jpg")
     extracted_message = extract_block_data(hidden_image)
     print(f"extracted message [{extracted_message}]")
+    quality = metrics.quality(img_arr, hidden_image)
+    print(f"PSNR {quality['psnr']:.2f} dB, SSIM {quality['ssim']:.5f}")
 
 
 def change_palette_executor(img_arr):
@@ -1,61 +1,99 @@
 import numpy as np
 from PIL import Image
 
-def embed_data(image_path_param, secret_data_param, output_path_param):
+from stego import codec
+
+CHANNELS = 'RGB'  # порядок каналів у масиві, отриманому з PIL
+
+
+def channel_indexes(img_data, channels):
+    """Індекси вибраних каналів (рядок із літер 'R', 'G', 'B' у порядку запису бітів)."""
+    if img_data.ndim != 3:
+        raise ValueError("Очікується кольорове зображення (H, W, C).")
+    indexes = [CHANNELS.index(channel) for channel in channels.upper()]
+    if not indexes or len(set(indexes)) != len(indexes):
+        raise ValueError(f"Некоректний набір каналів: {channels}.")
+    return indexes
+
+
+def check_bits_per_channel(bits_per_channel):
+    if not 1 <= bits_per_channel <= 4:
+        raise ValueError("Кількість молодших бітів на канал має бути від 1 до 4.")
+
+
+def bits_to_symbols(bits, bits_per_channel):
+    """Групує біти по bits_per_channel (старший першим); останню групу доповнено нулями."""
+    padded = np.zeros(-(-bits.size // bits_per_channel) * bits_per_channel, dtype=np.uint8)
+    padded[:bits.size] = bits
+    weights = 1 << np.arange(bits_per_channel - 1, -1, -1, dtype=np.uint8)
+    return (padded.reshape(-1, bits_per_channel) * weights).sum(axis=1, dtype=np.uint8)
+
+
+def symbols_to_bits(symbols, bits_per_channel):
+    """Обернене до bits_to_symbols."""
+    shifts = np.arange(bits_per_channel - 1, -1, -1, dtype=np.uint8)
+    return ((symbols[:, np.newaxis] >> shifts) & 1).reshape(-1)
+
+
+def read_lsb_bits(pixels, indexes, bits_per_channel, start, count):
+    """Читає count бітів, починаючи з позиції start, торкаючись лише пікселів, що їх містять."""
+    slots = len(indexes)
+    first_symbol, last_symbol = start // bits_per_channel, -(-(start + count) // bits_per_channel)
+    first_pixel, last_pixel = first_symbol // slots, -(-last_symbol // slots)
+    symbols = pixels[first_pixel:last_pixel][:, indexes].reshape(-1) & ((1 << bits_per_channel) - 1)
+    symbols = symbols[first_symbol - first_pixel * slots:last_symbol - first_pixel * slots]
+    offset = start - first_symbol * bits_per_channel
+    return symbols_to_bits(symbols, bits_per_channel)[offset:offset + count]
+
+
+def embed_data(image_path_param, secret_data_param, output_path_param, header=False, bits_per_channel=1, channels='B'):
     # Завантаження зображення
     image = Image.open(image_path_param)
     img_data = np.array(image)
 
-    # Перетворення секретних даних у бінарний вигляд
-    secret_data_bin = ''.join(format(ord(i), '08b') for i in secret_data_param)
-    data_len = len(secret_data_bin)
+    # Перетворення секретних даних (str у UTF-8, bytes або масив бітів) у масив бітів
+    # header=True додає заголовок (сигнатура, довжина, CRC32), тож extract_data не потребує довжини
+    secret_data_bits = codec.pack(secret_data_param) if header else codec.to_bits(secret_data_param)
+    data_len = len(secret_data_bits)
 
-    # Перевірка, чи є місце для вбудовування
-    if data_len > img_data.size:
+    # Біти записуються в bits_per_channel (1-4) молодших бітів кожного з вибраних каналів (за замовчуванням -
+    # лише синього), піксель за пікселем; ємність - пікселі x канали x біти
+    check_bits_per_channel(bits_per_channel)
+    indexes = channel_indexes(img_data, channels)
+    pixels = img_data.reshape(-1, img_data.shape[2])
+    if data_len > pixels.shape[0] * len(indexes) * bits_per_channel:
         raise ValueError("Не вистачає місця для вбудовування всіх даних.")
 
-    # Вбудовування бітів секретної інформації в синій канал
-    idx = 0
-    for i in range(img_data.shape[0]):
-        for j in range(img_data.shape[1]):
-            # Отримуємо піксель
-            pixel = img_data[i, j]
-            blue_value = pixel[2]  # Синій канал (RGB)
-
-            if idx < data_len:
-                # Вбудовуємо біт у найменш значущий біт синього каналу
-                blue_value = (blue_value & 0xFE) | int(secret_data_bin[idx])
-                img_data[i, j][2] = blue_value
-                idx += 1
+    # Один векторизований запис: змінюються лише пікселі, що містять корисне навантаження
+    symbols = bits_to_symbols(secret_data_bits, bits_per_channel)
+    used = -(-symbols.size // len(indexes))
+    region = pixels[:used][:, indexes].reshape(-1)
+    region[:symbols.size] = (region[:symbols.size] & (0xFF ^ ((1 << bits_per_channel) - 1))) | symbols
+    pixels[:used, indexes] = region.reshape(used, len(indexes))
 
     # Збереження модифікованого зображення
     output_image = Image.fromarray(img_data)
     output_image.save(output_path_param)
     print("Секретні дані вбудовано в зображення.")
 
-def extract_data(image_path_param, data_length_param):
+def extract_data(image_path_param, data_length_param=None, bits_per_channel=1, channels='B'):
     # Завантаження зображення
     image = Image.open(image_path_param)
     img_data = np.array(image)
 
-    secret_data_bin = ""
-    idx = 0
-    for i in range(img_data.shape[0]):
-        for j in range(img_data.shape[1]):
-            # Отримуємо піксель
-            pixel = img_data[i, j]
-            blue_value = pixel[2]  # Синій канал (RGB)
-            # Витягуємо біт з найменш значущого біта синього каналу
-            secret_data_bin += str(blue_value & 1)
-            idx += 1
-            if idx >= data_length_param * 8:
-                break
-        if idx >= data_length_param * 8:
-            break
-
-    # Перетворення бінарного рядка в символи
-    result_secret_data = ''.join(chr(int(secret_data_bin[i:i+8], 2)) for i in range(0, len(secret_data_bin), 8))
-    return result_secret_data
+    # Витягуємо біти з bits_per_channel молодших бітів вибраних каналів перших пікселів (data_length_param - у байтах)
+    check_bits_per_channel(bits_per_channel)
+    indexes = channel_indexes(img_data, channels)
+    pixels = img_data.reshape(-1, img_data.shape[2])
+    capacity = pixels.shape[0] * len(indexes) * bits_per_channel
+    read_bits = lambda start, count: read_lsb_bits(pixels, indexes, bits_per_channel, start, max(0, min(count, capacity - start)))
+    if data_length_param is None:
+        # Читаємо заголовок, а потім рівно стільки бітів, скільки займає повідомлення
+        return codec.unpack_text(read_bits, capacity)
+    secret_data_bits = read_bits(0, data_length_param * 8)
+
+    # Перетворення бітів у текст UTF-8
+    return codec.bits_to_text(secret_data_bits)
 
 if __name__ == '__main__':
     image_path = "images/image_1.jpg"
@@ -63,5 +101,5 @@ if __name__ == '__main__':
     secret_data = "lishchuk bohdan"
 
     embed_data(image_path, secret_data, output_path)
-    extracted_data = extract_data(output_path, len(secret_data))
+    extracted_data = extract_data(output_path, len(secret_data.encode('utf-8')))  # довжина в байтах UTF-8
     print("Витягнуті дані:", extracted_data)
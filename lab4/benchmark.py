@@ -0,0 +1,50 @@
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from script import embed_koch_zhao, extract_koch_zhao, embed_bits_batched, extract_bits_batched
+
+
+def timed(func, *args, **kwargs):
+    """Return (result, seconds) for a single call."""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    # Usage: python -m stego.labs lab4 benchmark [height] [width]; defaults to a 4K frame
+    height = int(sys.argv[1]) if len(sys.argv) > 1 else 2160
+    width = int(sys.argv[2]) if len(sys.argv) > 2 else 3840
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 256, (height, width), dtype=np.uint8)
+    bits = ''.join(rng.choice(['0', '1'], size=height * width // 64))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        container = os.path.join(tmp, 'container.png')
+        loop_out = os.path.join(tmp, 'loop.png')
+        batched_out = os.path.join(tmp, 'batched.png')
+        cv2.imwrite(container, image)
+
+        _, loop_embed = timed(embed_koch_zhao, container, bits, loop_out)
+        _, file_embed = timed(embed_koch_zhao, container, bits, batched_out, batched=True)
+        stego, array_embed = timed(embed_bits_batched, image, bits)
+        identical = np.array_equal(cv2.imread(loop_out, cv2.IMREAD_GRAYSCALE), stego)
+
+        loop_bits, loop_extract = timed(extract_koch_zhao, loop_out, len(bits))
+        array_bits, array_extract = timed(extract_bits_batched, stego, len(bits))
+
+    print(f"Image {width}x{height}, {len(bits)} bits (full capacity)")
+    print(f"embed   loop {loop_embed:8.3f}s  batched (with file I/O) {file_embed:8.3f}s  "
+          f"batched (arrays) {array_embed * 1000:8.1f}ms  identical={identical}")
+    print(f"extract loop {loop_extract:8.3f}s  batched (arrays) {array_extract * 1000:8.1f}ms  "
+          f"identical={loop_bits == array_bits}")
+
+    print("thread scaling (embed_bits_batched, arrays)")
+    for workers in (1, 2, 4, 8):
+        result, seconds = timed(embed_bits_batched, image, bits, workers=workers)
+        print(f"  workers={workers}  {seconds * 1000:8.1f}ms  identical={np.array_equal(result, stego)}")
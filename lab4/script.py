@@ -2,19 +2,38 @@ import numpy as np
 import cv2
 from scipy.fftpack import dct, idct
 import os
+from concurrent.futures import ThreadPoolExecutor
 
+from stego import codec
+from stego.images import imread
 
-def resize_to_multiple_of_8(img_path, output_path):
-    """Resize image to dimensions divisible by 8."""
-    image = cv2.imread(img_path, cv2.IMREAD_GRAYSCALE)
+
+def load_gray(source, name='image'):
+    """Return a grayscale array: arrays pass through, paths are decoded via the shared image cache (read-only)."""
+    if isinstance(source, np.ndarray):
+        return source
+    if not os.path.exists(source):
+        raise FileNotFoundError(f"Input {name} {source} does not exist.")
+    image = imread(source, cv2.IMREAD_GRAYSCALE)
     if image is None:
-        raise ValueError(f"Failed to load {img_path}")
+        raise ValueError(f"Failed to load {name} {source}.")
+    return image
 
+
+def resize_image_to_multiple_of_8(image):
+    """Resize a grayscale array to dimensions divisible by 8 (returned unchanged if already divisible)."""
     height, width = image.shape
     new_height = ((height + 7) // 8) * 8
     new_width = ((width + 7) // 8) * 8
+    if (new_height, new_width) == (height, width):
+        return image
+    return cv2.resize(image, (new_width, new_height), interpolation=cv2.INTER_AREA)
+
 
-    resized_img = cv2.resize(image, (new_width, new_height), interpolation=cv2.INTER_AREA)
+def resize_to_multiple_of_8(img_path, output_path):
+    """Resize image to dimensions divisible by 8."""
+    resized_img = resize_image_to_multiple_of_8(load_gray(img_path))
+    new_height, new_width = resized_img.shape
     cv2.imwrite(output_path, resized_img)
     print(f"Resized image to {new_width}x{new_height} and saved to {output_path}")
     return output_path
@@ -22,43 +41,43 @@ def resize_to_multiple_of_8(img_path, output_path):
 
 def convert_jpg_to_png(jpg_path, png_path):
     """Convert a JPG image to PNG format."""
-    if not os.path.exists(jpg_path):
-        raise FileNotFoundError(f"Input image {jpg_path} does not exist.")
-    image = cv2.imread(jpg_path, cv2.IMREAD_GRAYSCALE)
-    if image is None:
-        raise ValueError(f"Failed to load image {jpg_path}.")
-    cv2.imwrite(png_path, image)
+    cv2.imwrite(png_path, load_gray(jpg_path))
     return png_path
 
 
 def text_to_bits(text):
-    """Convert a text string to a binary string."""
-    return ''.join(format(ord(c), '08b') for c in text)
+    """Convert a text string (UTF-8) or bytes to a binary string."""
+    return codec.bits_to_string(codec.to_bits(text))
 
 
-def embed_koch_zhao(img_path, bits, output_path, P=100):
-    """Embed a binary string into an image using the Koch-Zhao algorithm."""
-    if not os.path.exists(img_path):
-        raise FileNotFoundError(f"Input image {img_path} does not exist.")
+def embed_koch_zhao(img_path, bits, output_path=None, P=100, batched=False, workers=1):
+    """Embed a binary string into an image using the Koch-Zhao algorithm.
 
-    image = cv2.imread(img_path, cv2.IMREAD_GRAYSCALE)
-    if image is None:
-        raise ValueError(f"Failed to load image {img_path}.")
+    img_path may also be a grayscale array. The stego array is returned and, when output_path
+    is given, also written to disk.
+    With batched=True all blocks are transformed at once (bit-exact with the loop).
+    workers > 1 implies batched and splits the blocks into row bands processed on a thread pool.
+    """
+    image = load_gray(img_path)
 
     height, width = image.shape
     if height % 8 != 0 or width % 8 != 0:
         raise ValueError(f"Image dimensions {width}x{height} must be divisible by 8.")
 
-    if not all(bit in '01' for bit in bits):
+    bits = bits_to_array(bits)  # accepts a '0'/'1' string or a codec bit array
+    if bits.size and bits.max() > 1:
         raise ValueError("Message must be a binary string (0s and 1s).")
     if len(bits) > (height * width // 64):
         raise ValueError("Message is too long for the image capacity.")
 
+    if batched or workers > 1:
+        return save_stego(embed_bits_batched(image, bits, P, workers), output_path)
+
     stego = np.copy(image).astype(np.float32)
 
     def embed_bit(_dct_block, bit, u1, v1, u2, v2):
         c1, c2 = _dct_block[u1, v1], _dct_block[u2, v2]
-        if bit == '0':
+        if bit == 0:
             _dct_block[u1, v1] = c1 + P / 2
             _dct_block[u2, v2] = c2 - P / 2
         else:
@@ -80,23 +99,36 @@ def embed_koch_zhao(img_path, bits, output_path, P=100):
             stego[i:i + 8, j:j + 8] = np.clip(idct_block, 0, 255)
             bit_idx += 1
 
-    cv2.imwrite(output_path, stego.astype(np.uint8))
-    print(f"Stego image saved to {output_path}")
+    return save_stego(stego.astype(np.uint8), output_path)
 
 
-def extract_koch_zhao(stego_path, bit_length, P=100):
-    """Extract a binary string from a stego image using the Koch-Zhao algorithm."""
-    if not os.path.exists(stego_path):
-        raise FileNotFoundError(f"Stego image {stego_path} does not exist.")
+def save_stego(stego, output_path):
+    """Write the stego array when an output path is given and return it."""
+    if output_path is not None:
+        cv2.imwrite(output_path, stego)
+        print(f"Stego image saved to {output_path}")
+    return stego
 
-    image = cv2.imread(stego_path, cv2.IMREAD_GRAYSCALE)
-    if image is None:
-        raise ValueError(f"Failed to load stego image {stego_path}.")
+
+def extract_koch_zhao(stego_path, bit_length=None, P=100, batched=False):
+    """Extract a binary string from a stego image using the Koch-Zhao algorithm.
+
+    With bit_length=None the payload is expected to start with a codec.pack header; only the
+    header and payload blocks are transformed, and None is returned when there is no header.
+    stego_path may also be a grayscale array.
+    """
+    image = load_gray(stego_path, 'stego image')
 
     h, w = image.shape
+    if bit_length is None:
+        payload = codec.unpack(lambda start, count: extract_bits_range(image, start, count), (h // 8) * (w // 8))
+        return None if payload is None else codec.bits_to_string(codec.to_bits(payload))
     if bit_length > (h * w // 64):
         raise ValueError("Requested bit length exceeds image capacity.")
 
+    if batched:
+        return extract_bits_batched(image, bit_length)
+
     bits = ''
     bit_count = 0
     for i in range(0, h, 8):
@@ -115,39 +147,124 @@ def extract_koch_zhao(stego_path, bit_length, P=100):
     return bits
 
 
-try:
-    os.makedirs("images", exist_ok=True)
+def image_to_blocks(image):
+    """View an (H, W) image as an (H/8, W/8, 8, 8) tensor of 8x8 blocks."""
+    h, w = image.shape
+    return image.reshape(h // 8, 8, w // 8, 8).swapaxes(1, 2)
+
+
+def blocks_to_image(blocks):
+    """Inverse of image_to_blocks."""
+    bh, bw = blocks.shape[:2]
+    return blocks.swapaxes(1, 2).reshape(bh * 8, bw * 8)
+
+
+def block_dct(blocks):
+    """2D orthonormal DCT over the last two axes (same axis order as the per-block loop)."""
+    return dct(dct(blocks, axis=-2, norm='ortho'), axis=-1, norm='ortho')
+
+
+def block_idct(blocks):
+    """2D orthonormal IDCT over the last two axes (same axis order as the per-block loop)."""
+    return idct(idct(blocks, axis=-2, norm='ortho'), axis=-1, norm='ortho')
+
+
+def bits_to_array(bits):
+    """Convert a '0'/'1' string (or an iterable of 0/1) to a uint8 array."""
+    if isinstance(bits, str):
+        return codec.string_to_bits(bits)
+    return np.asarray(bits, dtype=np.uint8)
+
+
+def row_bands(block_rows, parts):
+    """Split block_rows rows of 8x8 blocks into at most `parts` contiguous (start, stop) pixel-row bands."""
+    edges = np.linspace(0, block_rows, min(parts, block_rows) + 1).astype(int) * 8
+    return list(zip(edges[:-1], edges[1:]))
+
+
+def embed_bits_batched(image, bits, P=100, workers=1):
+    """Koch-Zhao embedding of bits into a grayscale array using one batched DCT/IDCT."""
+    bits = bits_to_array(bits)
+    if workers > 1:
+        return embed_bits_parallel(image, bits, P, workers)
+    stego = image.astype(np.float32)
+    # Bits go into blocks in row-major order, so only the first len(bits) blocks change
+    blocks = image_to_blocks(stego).reshape(-1, 8, 8)
+    dct_blocks = block_dct(blocks[:len(bits)])
+    delta = np.where(bits == 0, P / 2, -P / 2).astype(np.float32)
+    dct_blocks[:, 2, 3] += delta
+    dct_blocks[:, 3, 2] -= delta
+    blocks[:len(bits)] = np.clip(block_idct(dct_blocks), 0, 255)
+    return blocks_to_image(blocks.reshape(image.shape[0] // 8, image.shape[1] // 8, 8, 8)).astype(np.uint8)
+
+
+def embed_bits_parallel(image, bits, P, workers):
+    """Run embed_bits_batched on row bands in a thread pool; output is identical to the serial call.
+
+    Blocks are independent, and the SciPy DCT releases the GIL, so bands scale across cores.
+    Only the block rows that carry bits are split between workers.
+    """
+    blocks_per_row = image.shape[1] // 8
+    stego = image.copy()
+
+    def embed_band(band):
+        start, stop = band
+        stego[start:stop] = embed_bits_batched(image[start:stop], bits[start // 8 * blocks_per_row:stop // 8 * blocks_per_row], P)
+
+    carrying_rows = -(-len(bits) // blocks_per_row)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(embed_band, row_bands(carrying_rows, workers)))
+    return stego
+
+
+def extract_bits_batched(image, bit_length):
+    """Koch-Zhao extraction of bit_length bits from a grayscale array using one batched DCT."""
+    h, w = image.shape
+    blocks = image_to_blocks(image[:h - h % 8, :w - w % 8]).reshape(-1, 8, 8)
+    dct_blocks = block_dct(blocks[:bit_length].astype(np.float32))
+    bits = (dct_blocks[:, 2, 3] <= dct_blocks[:, 3, 2]).astype(np.uint8) + ord('0')
+    return bits.tobytes().decode('ascii')
+
+
+def extract_bits_range(image, start, count):
+    """Extract bits [start, start + count) as a uint8 array, transforming only the blocks involved."""
+    blocks_per_row = image.shape[1] // 8
+    first_row = start // blocks_per_row
+    last_row = min(-(-(start + count) // blocks_per_row), image.shape[0] // 8)
+    if last_row <= first_row:
+        return np.empty(0, dtype=np.uint8)
+    rows = image[first_row * 8:last_row * 8, :blocks_per_row * 8]
+    offset = start - first_row * blocks_per_row
+    blocks = image_to_blocks(rows).reshape(-1, 8, 8)[offset:offset + count]
+    dct_blocks = block_dct(blocks.astype(np.float32))
+    return (dct_blocks[:, 2, 3] <= dct_blocks[:, 3, 2]).astype(np.uint8)
+
 
-    image_alias = 'image_2'
+if __name__ == '__main__':
+    try:
+        os.makedirs("images", exist_ok=True)
 
-    source_jpg = f"images/{image_alias}.jpg"
-    resized_jpg = f"images/{image_alias}_resized.jpg"
-    converted_png = f"images/{image_alias}_converted.png"
-    output_stego = f"images/{image_alias}_stego_koch.png"
+        image_alias = 'image_2'
 
-    img = cv2.imread(source_jpg, cv2.IMREAD_GRAYSCALE)
-    if img is None:
-        raise ValueError(f"Failed to load {source_jpg}")
-    h, w = img.shape
-    if h % 8 != 0 or w % 8 != 0:
-        source_jpg = resize_to_multiple_of_8(source_jpg, resized_jpg)
+        source_jpg = f"images/{image_alias}.jpg"
+        output_stego = f"images/{image_alias}_stego_koch.png"
 
-    convert_jpg_to_png(source_jpg, converted_png)
-    print(f"Converted {source_jpg} to {converted_png}")
+        # The image is decoded once and passed between stages as an array; only the stego PNG is written
+        image = resize_image_to_multiple_of_8(load_gray(source_jpg))
 
-    message_text = "lishchuk"
-    message_bits = text_to_bits(message_text)
-    print(f"Input text: {message_text}")
-    print(f"Message bits: {message_bits}")
+        message_text = "lishchuk"
+        message_bits = text_to_bits(message_text)
+        print(f"Input text: {message_text}")
+        print(f"Message bits: {message_bits}")
 
-    embed_koch_zhao(converted_png, message_bits, output_stego)
+        stego_image = embed_koch_zhao(image, message_bits, output_stego)
 
-    extracted_bits = extract_koch_zhao(output_stego, bit_length=len(message_bits))
-    print("Embedded bits:", message_bits)
-    print("Extracted bits:", extracted_bits)
+        extracted_bits = extract_koch_zhao(stego_image, bit_length=len(message_bits))
+        print("Embedded bits:", message_bits)
+        print("Extracted bits:", extracted_bits)
 
-    chars = [chr(int(extracted_bits[i:i+8], 2)) for i in range(0, len(extracted_bits), 8)]
-    print("Extracted message as text:", ''.join(chars))
+        chars = [chr(int(extracted_bits[i:i+8], 2)) for i in range(0, len(extracted_bits), 8)]
+        print("Extracted message as text:", ''.join(chars))
 
-except Exception as e:
-    print(f"Error: {str(e)}")
\ No newline at end of file
+    except Exception as e:
+        print(f"Error: {str(e)}")
\ No newline at end of file
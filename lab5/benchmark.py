@@ -0,0 +1,47 @@
+import sys
+import time
+
+import numpy as np
+
+from script import embed_watermark_dct, embed_watermark_dct_batched, extract_watermark_dct, ContainerDCT
+
+
+def max_diff(a, b):
+    return int(np.abs(a.astype(np.int16) - b).max())
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    # Usage: python -m stego.labs lab5 benchmark [height] [width] [strength]
+    height = int(sys.argv[1]) if len(sys.argv) > 1 else 2160
+    width = int(sys.argv[2]) if len(sys.argv) > 2 else 3840
+    strength = float(sys.argv[3]) if len(sys.argv) > 3 else 10
+    rng = np.random.default_rng(0)
+    container = rng.integers(0, 256, (height, width), dtype=np.uint8)
+    watermark = rng.integers(0, 256, (64, 64), dtype=np.uint8)
+    wm_shape = (height // 8, width // 8)
+    print(f"Container {width}x{height}, strength {strength}")
+
+    loop, loop_time = timed(embed_watermark_dct, container, watermark, strength)
+    batched, batched_time = timed(embed_watermark_dct_batched, container, watermark, strength)
+    # The batched path is approximately equal to the loop: float32 truncation can differ by one grey level
+    print(f"embed   loop {loop_time:8.3f}s  batched {batched_time * 1000:8.1f}ms  "
+          f"x{loop_time / batched_time:6.1f}  identical={np.array_equal(loop, batched)}  max_diff={max_diff(loop, batched)}")
+
+    extracted, extract_time = timed(extract_watermark_dct, loop, container, wm_shape, strength)
+    cached, cache_time = timed(ContainerDCT, container)
+    fast, fast_time = timed(cached.extract, loop, wm_shape)
+    print(f"extract loop {extract_time:8.3f}s  ContainerDCT build {cache_time * 1000:8.1f}ms  "
+          f"cached extract {fast_time * 1000:8.1f}ms  identical={np.array_equal(extracted, fast)}")
+
+    print("thread scaling")
+    for workers in (1, 2, 4, 8):
+        result, seconds = timed(embed_watermark_dct, container, watermark, strength, workers=workers)
+        result_batched, seconds_batched = timed(embed_watermark_dct_batched, container, watermark, strength, workers=workers)
+        print(f"  workers={workers}  loop {seconds:8.3f}s identical={np.array_equal(result, loop)}  "
+              f"batched {seconds_batched * 1000:8.1f}ms identical={np.array_equal(result_batched, batched)}")
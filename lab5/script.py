@@ -1,15 +1,40 @@
 import cv2
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 
 
-def embed_watermark_dct(container_img, watermark_img, strength=10):
+def row_bands(h, parts):
+    # Split the rows into at most `parts` bands whose boundaries fall on 8x8 block edges
+    block_rows = -(-h // 8)
+    edges = np.minimum(np.linspace(0, block_rows, min(parts, block_rows) + 1).astype(int) * 8, h)
+    return list(zip(edges[:-1], edges[1:]))
+
+
+def run_bands(func, h, workers):
+    # Blocks are independent and each band writes its own rows, so the result does not depend on workers
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(lambda band: func(*band), row_bands(h, workers)))
+    else:
+        func(0, h)
+
+
+def embed_watermark_dct(container_img, watermark_img, strength=10, workers=1):
     h, w = container_img.shape
     watermark_resized = cv2.resize(watermark_img, (w // 8, h // 8), interpolation=cv2.INTER_NEAREST)
     watermark_bin = (watermark_resized > 128).astype(np.uint8)
     watermarked_img = np.zeros_like(container_img, dtype=np.float32)
     container_img = container_img.astype(np.float32)
 
-    for i in range(0, h, 8):
+    run_bands(lambda row_start, row_stop: embed_watermark_rows(
+        container_img, watermark_bin, watermarked_img, strength, row_start, row_stop), h, workers)
+
+    return np.clip(watermarked_img, 0, 255).astype(np.uint8)
+
+
+def embed_watermark_rows(container_img, watermark_bin, watermarked_img, strength, row_start, row_stop):
+    w = container_img.shape[1]
+    for i in range(row_start, row_stop, 8):
         for j in range(0, w, 8):
             block = container_img[i:i + 8, j:j + 8]
             if block.shape[0] < 8 or block.shape[1] < 8:
@@ -29,8 +54,6 @@ def embed_watermark_dct(container_img, watermark_img, strength=10):
             idct_block = cv2.idct(dct_block)
             watermarked_img[i:i + 8, j:j + 8] = idct_block
 
-    return np.clip(watermarked_img, 0, 255).astype(np.uint8)
-
 
 def extract_watermark_dct(watermarked_img, container_img, wm_shape, strength=10):
     h, w = container_img.shape
@@ -60,21 +83,171 @@ def extract_watermark_dct(watermarked_img, container_img, wm_shape, strength=10)
     return extracted
 
 
-container_path = "images/image_2.jpg"
-watermark_path = "images/watermark.png"
-visible_output_path = "images/watermarked_dct.png"
-extracted_output_path = "images/extracted_dct.png"
+def dct_matrix(n=8):
+    # Orthonormal DCT-II basis, the same transform cv2.dct applies to an n x n block
+    k = np.arange(n).reshape(-1, 1)
+    basis = np.cos(np.pi * (2 * np.arange(n) + 1) * k / (2 * n)) * np.sqrt(2 / n)
+    basis[0] /= np.sqrt(2)
+    return basis.astype(np.float32)
+
+
+DCT_8 = dct_matrix()
+
+
+def image_blocks(img):
+    # (H, W) -> (H/8 * W/8, 8, 8) copy of the full 8x8 blocks in row-major order
+    h, w = img.shape
+    bh, bw = h // 8, w // 8
+    return img[:bh * 8, :bw * 8].reshape(bh, 8, bw, 8).swapaxes(1, 2).reshape(-1, 8, 8)
+
+
+def blocks_to_image(blocks, shape):
+    bh, bw = shape[0] // 8, shape[1] // 8
+    return blocks.reshape(bh, bw, 8, 8).swapaxes(1, 2).reshape(bh * 8, bw * 8)
+
+
+def batch_dct(blocks):
+    return DCT_8 @ blocks @ DCT_8.T
+
+
+def batch_idct(blocks):
+    return DCT_8.T @ blocks @ DCT_8
+
+
+def watermark_mask(watermark_img, shape):
+    h, w = shape
+    watermark_resized = cv2.resize(watermark_img, (w // 8, h // 8), interpolation=cv2.INTER_NEAREST)
+    return watermark_resized > 128
+
+
+def embed_watermark_dct_batched(container_img, watermark_img, strength=10, workers=1):
+    watermark_bin = watermark_mask(watermark_img, container_img.shape)
+    return embed_watermark_mask(container_img, watermark_bin, strength, workers)
+
+
+def embed_watermark_mask(container_img, watermark_bin, strength=10, workers=1):
+    # watermark_bin holds one boolean per 8x8 block, shape (H // 8, W // 8).
+    # Output matches embed_watermark_dct only approximately (pixels may differ by 1): both paths
+    # truncate float32 results, and when the exact value is an integer (the [4, 4] basis is +-1/8,
+    # so a strength that is a multiple of 8 moves every pixel by whole grey levels) the matrix DCT
+    # and cv2.dct round differently
+    h, w = container_img.shape
+    if workers > 1:
+        watermarked_img = np.empty_like(container_img, dtype=np.uint8)
+
+        def embed_band(row_start, row_stop):
+            mask = watermark_bin[row_start // 8:row_start // 8 + (row_stop - row_start) // 8]
+            watermarked_img[row_start:row_stop] = embed_watermark_mask(container_img[row_start:row_stop], mask, strength)
+
+        run_bands(embed_band, h, workers)
+        return watermarked_img
+
+    dct_blocks = batch_dct(image_blocks(container_img.astype(np.float32)))
+    dct_blocks[:, 4, 4] += np.where(watermark_bin.ravel(), strength, -strength).astype(np.float32)
+
+    # Partial blocks on the right/bottom edge stay zero, as in embed_watermark_dct
+    watermarked_img = np.zeros((h, w), dtype=np.float32)
+    watermarked_img[:h - h % 8, :w - w % 8] = blocks_to_image(batch_idct(dct_blocks), (h, w))
+    return np.clip(watermarked_img, 0, 255).astype(np.uint8)
+
+
+def watermark_pattern(watermark_bin, strength=10):
+    # The DCT is linear: adding +-strength to coefficient [4, 4] of a block adds +-strength times
+    # the (4, 4) basis image to its pixels, so one pattern serves every container of this size
+    signs = np.where(watermark_bin, strength, -strength).astype(np.float32)
+    return np.kron(signs, np.outer(DCT_8[4], DCT_8[4]))
+
+
+class ContainerDCT:
+    # Caches the [4, 4] coefficient of every container block so repeated
+    # extractions against the same container skip the reference transform
+
+    def __init__(self, container_img):
+        self.shape = container_img.shape
+        self.coeffs = self.coefficient_44(container_img)
+
+    @staticmethod
+    def coefficient_44(img):
+        basis = np.outer(DCT_8[4], DCT_8[4])
+        coeffs = np.einsum('nij,ij->n', image_blocks(img.astype(np.float32)), basis)
+        return coeffs.reshape(img.shape[0] // 8, img.shape[1] // 8)
+
+    def extract(self, watermarked_img, wm_shape):
+        if watermarked_img.shape != self.shape:
+            raise ValueError(f"Watermarked image shape {watermarked_img.shape} does not match container {self.shape}.")
+        delta = self.coefficient_44(watermarked_img) - self.coeffs
+        extracted = np.zeros(wm_shape, dtype=np.uint8)
+        rows, cols = min(wm_shape[0], delta.shape[0]), min(wm_shape[1], delta.shape[1])
+        extracted[:rows, :cols] = np.where(delta[:rows, :cols] > 0, 255, 0)
+        return extracted
+
+
+def extract_watermark_dct_batched(watermarked_img, container_img, wm_shape, strength=10):
+    container = container_img if isinstance(container_img, ContainerDCT) else ContainerDCT(container_img)
+    return container.extract(watermarked_img, wm_shape)
+
+
+def quantize_44(coeffs, watermark_bin, step):
+    # Quantization index modulation: bit 0 snaps the coefficient to multiples of step,
+    # bit 1 to the lattice shifted by step / 2
+    offset = np.where(watermark_bin, step / 2, 0).astype(np.float32)
+    return np.round((coeffs - offset) / step) * step + offset
+
+
+def embed_watermark_blind(container_img, watermark_img, strength=10):
+    watermark_bin = watermark_mask(watermark_img, container_img.shape)
+    return embed_watermark_mask_blind(container_img, watermark_bin, strength)
+
+
+def embed_watermark_mask_blind(container_img, watermark_bin, strength=10):
+    # Same block layout and watermark_bin mapping as embed_watermark_mask, but the [4, 4] coefficient
+    # is quantized (moved by at most `strength`) so extraction needs no container.
+    # Partial edge blocks are kept and pixels are rounded, so the lattice survives the uint8 cast.
+    # One grey level on every pixel of a block moves [4, 4] by 8, so strength below ~8 is rounded away
+    h, w = container_img.shape
+    bh, bw = h // 8, w // 8
+    coeffs = ContainerDCT.coefficient_44(container_img)
+    delta = quantize_44(coeffs, watermark_bin, 2 * strength) - coeffs
+    watermarked_img = container_img.astype(np.float32)
+    watermarked_img[:bh * 8, :bw * 8] += np.kron(delta, np.outer(DCT_8[4], DCT_8[4]))
+    return np.clip(np.rint(watermarked_img), 0, 255).astype(np.uint8)
+
+
+def extract_watermark_blind(watermarked_img, wm_shape, strength=10):
+    # A coefficient closer to the shifted lattice than to multiples of 2 * strength is a 1
+    step = 2 * strength
+    remainder = np.mod(ContainerDCT.coefficient_44(watermarked_img), step)
+    bits = np.abs(remainder - step / 2) < np.minimum(remainder, step - remainder)
+    extracted = np.zeros(wm_shape, dtype=np.uint8)
+    rows, cols = min(wm_shape[0], bits.shape[0]), min(wm_shape[1], bits.shape[1])
+    extracted[:rows, :cols] = np.where(bits[:rows, :cols], 255, 0)
+    return extracted
+
+
+if __name__ == '__main__':
+    container_path = "images/image_2.jpg"
+    watermark_path = "images/watermark.png"
+    visible_output_path = "images/watermarked_dct.png"
+    extracted_output_path = "images/extracted_dct.png"
+
+    container = cv2.imread(container_path, cv2.IMREAD_GRAYSCALE)
+    watermark = cv2.imread(watermark_path, cv2.IMREAD_GRAYSCALE)
 
-container = cv2.imread(container_path, cv2.IMREAD_GRAYSCALE)
-watermark = cv2.imread(watermark_path, cv2.IMREAD_GRAYSCALE)
+    if container is None or watermark is None:
+        raise FileNotFoundError("❌ Check that 'image_1.jpg' and 'watermark.png' exist in the 'images/' folder.")
 
-if container is None or watermark is None:
-    raise FileNotFoundError("❌ Check that 'image_1.jpg' and 'watermark.png' exist in the 'images/' folder.")
+    watermarked_dct = embed_watermark_dct(container, watermark, strength=150)
+    cv2.imwrite(visible_output_path, watermarked_dct)
 
-watermarked_dct = embed_watermark_dct(container, watermark, strength=150)
-cv2.imwrite(visible_output_path, watermarked_dct)
+    extracted_dct = extract_watermark_dct(watermarked_dct, container, (container.shape[0] // 8, container.shape[1] // 8), strength=150)
+    cv2.imwrite(extracted_output_path, extracted_dct)
 
-extracted_dct = extract_watermark_dct(watermarked_dct, container, (container.shape[0] // 8, container.shape[1] // 8), strength=150)
-cv2.imwrite(extracted_output_path, extracted_dct)
+    print("✅ Watermark embedded using DCT and extracted using Hsu-Wu method.")
 
-print("✅ Watermark embedded using DCT and extracted using Hsu-Wu method.")
+    # Blind variant: extraction from the watermarked image alone
+    wm_shape = (container.shape[0] // 8, container.shape[1] // 8)
+    watermarked_blind = embed_watermark_blind(container, watermark, strength=150)
+    extracted_blind = extract_watermark_blind(watermarked_blind, wm_shape, strength=150)
+    cv2.imwrite("images/extracted_blind.png", extracted_blind)
+    expected = np.where(watermark_mask(watermark, container.shape), 255, 0)
+    print(f"✅ Blind extraction matches {np.mean(extracted_blind == expected[:wm_shape[0], :wm_shape[1]]):.2%} of the watermark bits.")
@@ -0,0 +1 @@
+"""Спільні інструменти для лабораторних робіт зі стеганографії."""
@@ -0,0 +1,225 @@
+import argparse
+import contextlib
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from stego import jpeg, positions
+from stego.labs import load_lab
+
+DEFAULT_SIZES = (256, 1024, 4096, 8192)  # сторони квадратних синтетичних зображень
+PAYLOAD_BYTES = 4096  # корисне навантаження (обрізається до ємності методу)
+LOOP_LIMIT = 1024 * 1024  # попіксельні цикли довше цього розміру (у пікселях) пропускаються без --full
+SEED = 340698234968
+
+
+class Case:
+    """Один бенчмарк: підготовка вхідних даних та пара функцій вбудовування/витягування."""
+
+    def __init__(self, name, prepare, capacity, loop=False, gray=False):
+        self.name = name
+        self.prepare = prepare  # prepare(image, message, tmp) -> (embed, extract)
+        self.capacity = capacity  # capacity(height, width) -> ємність у бітах
+        self.loop = loop  # True для попіксельних реалізацій, що масштабуються з розміром зображення
+        self.gray = gray
+
+
+def message_for(case, height, width):
+    """Повідомлення розміром PAYLOAD_BYTES, обрізане до ємності методу."""
+    length = min(PAYLOAD_BYTES, case.capacity(height, width) // 8)
+    rng = np.random.default_rng(length)
+    return ''.join(chr(c) for c in rng.integers(32, 127, length))
+
+
+def write_png(tmp, name, image):
+    path = os.path.join(tmp, f"{name}.png")
+    cv2.imwrite(path, image)
+    return path
+
+
+def lab1_cases():
+    encoder, decoder = load_lab('lab1', 'encoder'), load_lab('lab1', 'decoder')
+    capacity = lambda h, w: h * w
+    pairs = [
+        ('embed_sequential', lambda im, m: encoder.embed_sequential(im, m), lambda st, m: decoder.extract_message(st, len(m)), True),
+        ('embed_sequential_fast', lambda im, m: encoder.embed_sequential_fast(im, m), lambda st, m: decoder.extract_message_fast(st, len(m)), False),
+        ('embed_random', lambda im, m: encoder.embed_random(im, m, SEED), lambda st, m: decoder.extract_message_random(st, len(m), SEED), True),
+        ('embed_random_fast', lambda im, m: encoder.embed_random_fast(im, m, SEED), lambda st, m: decoder.extract_message_random_fast(st, len(m), SEED), True),
+        ('embed_random_keyed', lambda im, m: encoder.embed_random_keyed(im, m, SEED), lambda st, m: decoder.extract_message_random_keyed(st, len(m), SEED), False),
+    ]
+    for name, embed, extract, loop in pairs:
+        def prepare(image, message, tmp, embed=embed, extract=extract):
+            stego = embed(image, message)
+            return lambda: embed(image, message), lambda: extract(stego, message)
+        yield Case(f"lab1.{name}", prepare, capacity, loop)
+
+
+def lab2_cases():
+    script = load_lab('lab2')
+
+    def prepare_block(image, message, tmp):
+        stego = script.block_hide(image, message)
+        return lambda: script.block_hide(image, message), lambda: script.extract_block_data(stego)
+    yield Case('lab2.block_hide', prepare_block, lambda h, w: -(-h // 8) * -(-w // 8))
+
+    def prepare_permute(image, message, tmp):
+        permuted = script.permute_pixels(image, 42)
+        return lambda: script.permute_pixels(image, 42), lambda: script.inverse_permute_pixels(permuted, 42)
+    yield Case('lab2.permute_pixels', prepare_permute, lambda h, w: 0)
+
+    color = (99, 99, 99)
+    for name, apply, reverse, loop in [
+        ('apply_palette_substitution', script.apply_palette_substitution, script.reverse_palette_substitution, True),
+        ('apply_palette_substitution_fast', script.apply_palette_substitution_fast, script.reverse_palette_substitution_fast, False),
+    ]:
+        def prepare_palette(image, message, tmp, apply=apply, reverse=reverse):
+            encoded = apply(image, color)
+            return lambda: apply(image, color), lambda: reverse(encoded, color)
+        yield Case(f"lab2.{name}", prepare_palette, lambda h, w: 0, loop)
+
+
+def lab3_cases():
+    script = load_lab('lab3')
+
+    for name, bits_per_channel, channels in [('embed_data', 1, 'B'), ('embed_data_4lsb_rgb', 4, 'RGB')]:
+        def prepare(image, message, tmp, bits_per_channel=bits_per_channel, channels=channels):
+            source, output = write_png(tmp, 'lab3', image), os.path.join(tmp, 'lab3_stego.png')
+            script.embed_data(source, message, output, bits_per_channel=bits_per_channel, channels=channels)
+            return (lambda: script.embed_data(source, message, output, bits_per_channel=bits_per_channel, channels=channels),
+                    lambda: script.extract_data(output, len(message), bits_per_channel, channels))
+        yield Case(f"lab3.{name}", prepare, lambda h, w, slots=bits_per_channel * len(channels): h * w * slots)
+
+
+def lab4_cases():
+    script = load_lab('lab4')
+    for name, batched in [('embed_koch_zhao', False), ('embed_koch_zhao_batched', True)]:
+        def prepare(image, message, tmp, batched=batched):
+            bits = script.text_to_bits(message)
+            source, output = write_png(tmp, 'lab4', image), os.path.join(tmp, 'lab4_stego.png')
+            script.embed_koch_zhao(source, bits, output, batched=batched)
+            return (lambda: script.embed_koch_zhao(source, bits, output, batched=batched),
+                    lambda: script.extract_koch_zhao(output, len(bits), batched=batched))
+        yield Case(f"lab4.{name}", prepare, lambda h, w: h * w // 64, loop=not batched, gray=True)
+
+    def prepare_jpeg(image, message, tmp):
+        # JPEG -> JPEG у коефіцієнтах (stego.jpeg); ентропійне декодування - цикл Python, тож loop=True
+        bits = script.text_to_bits(message)
+        source, output = os.path.join(tmp, 'lab4.jpg'), os.path.join(tmp, 'lab4_stego.jpg')
+        cv2.imwrite(source, image, [cv2.IMWRITE_JPEG_QUALITY, 90])
+        embed = lambda: jpeg.embed_koch_zhao(jpeg.JpegImage.open(source), bits).save(output)
+        embed()
+        return embed, lambda: jpeg.extract_koch_zhao(jpeg.JpegImage.open(output, lazy=True), len(bits))
+    yield Case("lab4.embed_koch_zhao_jpeg", prepare_jpeg, lambda h, w: h * w // 64, loop=True, gray=True)
+
+
+def lab5_cases():
+    script = load_lab('lab5')
+    watermark = (np.indices((64, 64)).sum(axis=0) % 2 * 255).astype(np.uint8)
+    for name, embed, extract, loop in [
+        ('embed_watermark_dct', script.embed_watermark_dct, script.extract_watermark_dct, True),
+        ('embed_watermark_dct_batched', script.embed_watermark_dct_batched, script.extract_watermark_dct_batched, False),
+    ]:
+        def prepare(image, message, tmp, embed=embed, extract=extract):
+            wm_shape = (image.shape[0] // 8, image.shape[1] // 8)
+            watermarked = embed(image, watermark)
+            return lambda: embed(image, watermark), lambda: extract(watermarked, image, wm_shape)
+        yield Case(f"lab5.{name}", prepare, lambda h, w: (h // 8) * (w // 8), loop, gray=True)
+
+
+def all_cases():
+    for cases in (lab1_cases, lab2_cases, lab3_cases, lab4_cases, lab5_cases):
+        yield from cases()
+
+
+def best_time(func, repeat):
+    """Найкращий час із repeat запусків; кеші позицій очищаються перед кожним, щоб не вимірювати влучання в кеш."""
+    times = []
+    for _ in range(repeat):
+        positions.clear_caches()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def run(sizes, pattern=None, repeat=3, full=False):
+    """Виконує всі бенчмарки та повертає словник результатів {"case@size": {...}}."""
+    results = {}
+    cases = [case for case in all_cases() if not pattern or re.search(pattern, case.name)]
+    with open(os.devnull, 'w') as devnull:
+        for size in sizes:
+            rng = np.random.default_rng(size)
+            color = rng.integers(0, 256, (size, size, 3), dtype=np.uint8)
+            gray = np.ascontiguousarray(color[:, :, 0])
+            for case in cases:
+                key = f"{case.name}@{size}"
+                if case.loop and size * size > LOOP_LIMIT and not full:
+                    print(f"{key:<48} skipped (pixel loop, use --full)", file=sys.stderr)
+                    continue
+                image = gray if case.gray else color
+                message = message_for(case, size, size)
+                bits = case.capacity(size, size) and len(message) * 8
+                with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(devnull):
+                    embed, extract = case.prepare(image, message, tmp)
+                    embed_time, extract_time = best_time(embed, repeat), best_time(extract, repeat)
+                megapixels = size * size / 1e6
+                results[key] = {
+                    'pixels': size * size,
+                    'bits': bits,
+                    'embed_seconds': embed_time,
+                    'extract_seconds': extract_time,
+                    'embed_mp_per_s': megapixels / embed_time,
+                    'extract_mp_per_s': megapixels / extract_time,
+                    'embed_bits_per_s': bits / embed_time,
+                    'extract_bits_per_s': bits / extract_time,
+                }
+                print(f"{key:<48} embed {embed_time * 1000:10.2f}ms {megapixels / embed_time:9.1f} MP/s  "
+                      f"extract {extract_time * 1000:10.2f}ms {megapixels / extract_time:9.1f} MP/s", flush=True)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Повертає список регресій: випадки, що стали повільнішими за базовий рівень більш ніж на tolerance."""
+    regressions = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        for field in ('embed_seconds', 'extract_seconds'):
+            ratio = result[field] / baseline[key][field]
+            if ratio > 1 + tolerance:
+                regressions.append(f"{key} {field}: {baseline[key][field] * 1000:.2f}ms -> {result[field] * 1000:.2f}ms (x{ratio:.2f})")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m stego.benchmarks', description="Бенчмарки всіх алгоритмів вбудовування/витягування.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('-k', '--only', help="регулярний вираз для назв випадків")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--full', action='store_true', help="не пропускати попіксельні цикли на великих зображеннях")
+    parser.add_argument('--save', help="записати результати у JSON як новий базовий рівень")
+    parser.add_argument('--compare', help="порівняти з базовим рівнем із JSON")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="допустиме уповільнення (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.only, args.repeat, args.full)
+    if args.save:
+        with open(args.save, 'w') as file:
+            json.dump(results, file, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
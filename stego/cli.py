@@ -0,0 +1,308 @@
+import argparse
+import contextlib
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import cv2
+import numpy as np
+
+from stego import codec, inplace, jpeg, metrics, profiling
+from stego.images import imread
+from stego.labs import load_lab
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.tif', '.tiff')  # розширення, які шукаємо в директоріях
+
+
+def collect_images(sources):
+    """Розгортає директорії та glob-шаблони у впорядкований список файлів зображень."""
+    paths = []
+    for source in sources:
+        if os.path.isdir(source):
+            paths.extend(sorted(
+                os.path.join(source, name) for name in os.listdir(source)
+                if name.lower().endswith(IMAGE_EXTENSIONS)
+            ))
+        elif glob.has_magic(source):
+            paths.extend(sorted(glob.glob(source, recursive=True)))
+        else:
+            paths.append(source)
+    return paths
+
+
+def output_path(image_path, options, suffix, ext='.png'):
+    """Будує шлях до вихідного файлу: PNG (без втрат, щоб не зруйнувати LSB) або JPEG для режиму --jpeg."""
+    stem = os.path.splitext(os.path.basename(image_path))[0]
+    output_dir = options['output_dir'] or os.path.dirname(image_path)
+    return os.path.join(output_dir, f"{stem}_{suffix}{ext}")
+
+
+def bits_to_text(bits):
+    """Перетворює рядок бітів lab4 у текст."""
+    return codec.bits_to_text(codec.string_to_bits(bits))
+
+
+def measure(image_path, output, mode=cv2.IMREAD_COLOR):
+    """Метрики якості (MSE, PSNR, SSIM) між вхідним файлом та записаним результатом."""
+    return metrics.quality(cv2.imread(image_path, mode), cv2.imread(output, mode))
+
+
+def embed_job(image_path, options):
+    """Вбудовує повідомлення алгоритмом обраної лабораторної."""
+    lab, header = options['lab'], options['header']
+    # Із заголовком вбудовуємо вже готові біти (сигнатура, довжина, CRC32 та повідомлення)
+    message = codec.pack(options['message']) if header else codec.to_bits(options['message'])
+    if options['in_place']:
+        INPLACE_EMBEDDERS[lab](image_path, message)
+        return {'output': image_path, 'bits': message.size}
+    output = output_path(image_path, options, f"lab{lab}_stego", '.jpg' if options['jpeg'] else '.png')
+    if options['jpeg']:
+        # Коефіцієнти JPEG змінюються напряму: без IDCT/DCT та повторного стиснення пікселів
+        jpeg.embed_koch_zhao(jpeg.JpegImage.open(image_path), message, P=options['P']).save(output)
+    elif lab == 1:
+        encoder = load_lab('lab1', 'encoder')
+        image = cv2.imread(image_path)
+        if options['seed'] is None:
+            stego_image = encoder.embed_sequential_fast(image, message)
+        elif header:
+            stego_image = encoder.embed_random_keyed(image, message, options['seed'])  # префікс позицій не залежить від довжини
+        else:
+            stego_image = encoder.embed_random_fast(image, message, options['seed'])
+        cv2.imwrite(output, stego_image)
+    elif lab == 2:
+        script = load_lab('lab2')
+        img_arr = np.array(script.load_image(image_path))
+        script.save_image(script.block_hide(img_arr, message), output)
+    elif lab == 3:
+        load_lab('lab3').embed_data(image_path, message, output, bits_per_channel=options['lsb'], channels=options['channels'])
+    elif lab == 4:
+        load_lab('lab4').embed_koch_zhao(image_path, message, output, P=options['P'])
+    result = {'output': output, 'bits': message.size}
+    if options['metrics']:
+        result['metrics'] = measure(image_path, output, cv2.IMREAD_GRAYSCALE if lab == 4 else cv2.IMREAD_COLOR)
+    return result
+
+
+INPLACE_EMBEDDERS = {
+    1: inplace.embed_sequential_inplace,
+    2: inplace.block_hide_inplace,
+    3: inplace.embed_data_inplace,
+}
+
+
+def extract_job(image_path, options):
+    """Витягує повідомлення алгоритмом обраної лабораторної.
+
+    Без --length повідомлення читається за заголовком; message=None означає, що заголовка немає.
+    """
+    lab, length = options['lab'], options['length']
+    if lab == 1:
+        decoder = load_lab('lab1', 'decoder')
+        image = cv2.imread(image_path)
+        if options['seed'] is None:
+            message = decoder.extract_message_fast(image, length)
+        elif length is None:
+            message = decoder.extract_message_random_keyed(image, None, options['seed'])
+        else:
+            message = decoder.extract_message_random_fast(image, length, options['seed'])
+    elif lab == 2:
+        script = load_lab('lab2')
+        message = script.extract_block_data(np.array(script.load_image(image_path)), header=length is None, length=length)
+    elif lab == 3:
+        message = load_lab('lab3').extract_data(image_path, length, options['lsb'], options['channels'])
+    else:
+        if options['jpeg']:
+            # Ентропійне декодування зупиняється на останньому потрібному блоці
+            bits = jpeg.extract_koch_zhao(jpeg.JpegImage.open(image_path, lazy=True), None if length is None else length * 8)
+        else:
+            bits = load_lab('lab4').extract_koch_zhao(image_path, None if length is None else length * 8, P=options['P'])
+        message = None if bits is None else bits_to_text(bits)
+    return {'message': message}
+
+
+def watermark_job(image_path, options):
+    """Вбудовує водяний знак методом Хсу-Ву (lab5)."""
+    if options['jpeg']:
+        return watermark_jpeg_job(image_path, options)
+    script = load_lab('lab5')
+    container = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+    watermark = imread(options['watermark'], cv2.IMREAD_GRAYSCALE)  # спільний для всіх задач, декодується раз на процес
+    if container is None or watermark is None:
+        raise FileNotFoundError(f"Не вдалося прочитати {image_path} або {options['watermark']}.")
+    output = output_path(image_path, options, 'watermarked')
+    watermarked = script.embed_watermark_dct(container, watermark, strength=options['strength'])
+    cv2.imwrite(output, watermarked)
+    result = {'output': output}
+    if options['metrics']:
+        result['metrics'] = metrics.quality(container, watermarked)
+    return result
+
+
+def watermark_jpeg_job(image_path, options):
+    """Водяний знак lab5 у коефіцієнтах [4, 4] яскравості JPEG; результат - JPEG з тими самими таблицями квантування."""
+    watermark = imread(options['watermark'], cv2.IMREAD_GRAYSCALE)
+    if watermark is None:
+        raise FileNotFoundError(f"Не вдалося прочитати {options['watermark']}.")
+    image = jpeg.JpegImage.open(image_path)
+    jpeg.embed_watermark_mask(image, jpeg.watermark_mask(image, watermark), options['strength'])
+    output = image.save(output_path(image_path, options, 'watermarked', '.jpg'))
+    result = {'output': output}
+    if options['metrics']:
+        result['metrics'] = measure(image_path, output, cv2.IMREAD_GRAYSCALE)
+    return result
+
+
+def permute_job(image_path, options):
+    """Виконує (або скасовує) псевдовипадкову перестановку пікселів (lab2)."""
+    script = load_lab('lab2')
+    img_arr = np.array(script.load_image(image_path))
+    if options['inverse']:
+        result, suffix = script.inverse_permute_pixels(img_arr, options['seed']), 'restored'
+    else:
+        result, suffix = script.permute_pixels(img_arr, options['seed']), 'permuted'
+    output = output_path(image_path, options, suffix)
+    script.save_image(result, output)
+    return {'output': output}
+
+
+def palette_job(image_path, options):
+    """Виконує (або скасовує) заміну палітри кольорів (lab2)."""
+    script = load_lab('lab2')
+    img_arr = np.array(script.load_image(image_path))
+    if options['reverse']:
+        result, suffix = script.reverse_palette_substitution_fast(img_arr, options['color']), 'palette_decoded'
+    else:
+        result, suffix = script.apply_palette_substitution_fast(img_arr, options['color']), 'palette_encoded'
+    output = output_path(image_path, options, suffix)
+    script.save_image(result, output)
+    return {'output': output}
+
+
+JOBS = {
+    'embed': embed_job,
+    'extract': extract_job,
+    'watermark': watermark_job,
+    'permute': permute_job,
+    'palette': palette_job,
+}
+
+
+def run_job(command, image_path, options):
+    """Виконує одну задачу у процесі-воркері та повертає результат у вигляді словника."""
+    start = time.perf_counter()
+    result = {'command': command, 'input': image_path}
+    if options.get('profile'):
+        profiling.enable().reset()  # воркери перевикористовуються: профіль кожної задачі окремо
+    try:
+        # Лабораторні друкують повідомлення у stdout, а він зайнятий потоком JSON
+        with contextlib.redirect_stdout(sys.stderr):
+            result.update(JOBS[command](image_path, options))
+        result['ok'] = True
+    except Exception as e:
+        result.update(ok=False, error=f"{type(e).__name__}: {e}")
+    result['seconds'] = round(time.perf_counter() - start, 6)
+    if options.get('profile'):
+        result['profile'] = profiling.profiler.snapshot()
+    return result
+
+
+def run_batch(command, paths, options, workers=None):
+    """Розподіляє зображення між процесами та повертає результати в міру завершення."""
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(run_job, command, path, options) for path in paths]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def parse_color(value):
+    """Розбирає колір у форматі R,G,B."""
+    color = tuple(int(channel) for channel in value.split(','))
+    if len(color) != 3 or not all(0 <= channel <= 255 for channel in color):
+        raise argparse.ArgumentTypeError(f"Очікується колір R,G,B у діапазоні 0-255, отримано {value}.")
+    return color
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m stego', description="Пакетна обробка зображень алгоритмами лабораторних.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    def add_command(name, help_text):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument('sources', nargs='+', help="файли, директорії або glob-шаблони")
+        command.add_argument('-o', '--output-dir', help="директорія для результатів (за замовчуванням поруч із вхідним файлом)")
+        command.add_argument('-j', '--workers', type=int, default=os.cpu_count(), help="кількість процесів")
+        command.add_argument('--profile', metavar='PATH', help="записати профіль етапів (декодування, біти, DCT, цикли, кодування)")
+        command.add_argument('--profile-format', choices=sorted(profiling.EXPORTS), default='folded',
+                             help="folded - для flame graph (flamegraph.pl, speedscope), json або prometheus")
+        return command
+
+    embed = add_command('embed', "вбудувати повідомлення")
+    embed.add_argument('--lab', type=int, choices=(1, 2, 3, 4), default=1)
+    embed.add_argument('-m', '--message', required=True)
+    embed.add_argument('--seed', type=int, help="ключ випадкового вбудовування (lab1)")
+    embed.add_argument('--P', type=float, default=100, help="сила вбудовування Коха-Жао (lab4)")
+    embed.add_argument('--lsb', type=int, choices=(1, 2, 3, 4), default=1, help="молодших бітів на канал (lab3)")
+    embed.add_argument('--channels', default='B', help="канали для вбудовування, напр. RGB (lab3)")
+    embed.add_argument('--in-place', action='store_true', help="змінити BMP/NPY-файл на місці (lab1-lab3)")
+    embed.add_argument('--header', action='store_true', help="додати заголовок (сигнатура, довжина, CRC32)")
+    embed.add_argument('--metrics', action='store_true', help="додати до результату MSE, PSNR та SSIM")
+    embed.add_argument('--jpeg', action='store_true', help="змінювати коефіцієнти baseline JPEG без декодування пікселів, результат - JPEG (lab4)")
+
+    extract = add_command('extract', "витягти повідомлення")
+    extract.add_argument('--lab', type=int, choices=(1, 2, 3, 4), default=1)
+    extract.add_argument('-n', '--length', type=int, help="довжина повідомлення в байтах (без неї читається заголовок)")
+    extract.add_argument('--seed', type=int, help="ключ випадкового вбудовування (lab1)")
+    extract.add_argument('--lsb', type=int, choices=(1, 2, 3, 4), default=1, help="молодших бітів на канал (lab3)")
+    extract.add_argument('--channels', default='B', help="канали, з яких читати (lab3)")
+    extract.add_argument('--P', type=float, default=100, help="сила вбудовування Коха-Жао (lab4)")
+    extract.add_argument('--jpeg', action='store_true', help="читати коефіцієнти JPEG без декодування пікселів (lab4)")
+
+    watermark = add_command('watermark', "вбудувати водяний знак (lab5)")
+    watermark.add_argument('-w', '--watermark', required=True, help="зображення водяного знака")
+    watermark.add_argument('--strength', type=float, default=10)
+    watermark.add_argument('--metrics', action='store_true', help="додати до результату MSE, PSNR та SSIM")
+    watermark.add_argument('--jpeg', action='store_true', help="змінювати коефіцієнти [4, 4] baseline JPEG, результат - JPEG")
+
+    permute = add_command('permute', "перестановка пікселів (lab2)")
+    permute.add_argument('--seed', type=int, default=42)
+    permute.add_argument('--inverse', action='store_true', help="відновити початковий порядок")
+
+    palette = add_command('palette', "заміна палітри (lab2)")
+    palette.add_argument('--color', type=parse_color, default=(99, 99, 99), help="колір XOR у форматі R,G,B")
+    palette.add_argument('--reverse', action='store_true', help="відновити початкову палітру")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if getattr(args, 'in_place', False) and args.lab not in INPLACE_EMBEDDERS:
+        parser.error("--in-place підтримується лише для lab1-lab3")
+    if getattr(args, 'in_place', False) and (args.lsb, args.channels.upper()) != (1, 'B'):
+        parser.error("--in-place підтримує лише 1 біт синього каналу")
+    if getattr(args, 'in_place', False) and args.metrics:
+        parser.error("--metrics потребує оригіналу, тож несумісний з --in-place")
+    if getattr(args, 'jpeg', False) and args.command in ('embed', 'extract') and args.lab != 4:
+        parser.error("--jpeg підтримується лише для lab4 (та команди watermark)")
+    if getattr(args, 'jpeg', False) and getattr(args, 'in_place', False):
+        parser.error("--jpeg несумісний з --in-place")
+    options = {key: value for key, value in vars(args).items() if key not in ('command', 'sources', 'workers')}
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    failed = 0
+    profile = profiling.Profiler()
+    for result in run_batch(args.command, collect_images(args.sources), options, args.workers):
+        failed += not result['ok']
+        profile.merge(result.pop('profile', {}))
+        print(json.dumps(result, ensure_ascii=False), flush=True)
+    if args.profile:
+        profiling.dump(args.profile, args.profile_format, profile)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
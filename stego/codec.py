@@ -0,0 +1,108 @@
+import struct
+import zlib
+
+import numpy as np
+
+ENCODING = 'utf-8'  # кодування тексту повідомлень
+LENGTH_BITS = 32  # розмір заголовка довжини (кількість байтів корисного навантаження, big-endian)
+MAGIC = b'STG\x01'  # сигнатура та версія заголовка
+MAGIC_BITS = len(MAGIC) * 8
+HEADER = struct.Struct('>II')  # довжина корисного навантаження в байтах та CRC32
+HEADER_BITS = MAGIC_BITS + HEADER.size * 8
+
+
+def to_bytes(message):
+    """Перетворює повідомлення (str у UTF-8 або bytes-подібний об'єкт) на bytes."""
+    if isinstance(message, str):
+        return message.encode(ENCODING)
+    if isinstance(message, (bytes, bytearray, memoryview)):
+        return bytes(message)
+    raise TypeError(f"Очікується str або bytes, отримано {type(message).__name__}.")
+
+
+def to_bits(message):
+    """Перетворює повідомлення на масив бітів uint8 (0/1, старший біт першим).
+
+    Масив numpy вважається вже готовим масивом бітів і повертається без копіювання.
+    """
+    if isinstance(message, np.ndarray):
+        return message.astype(np.uint8, copy=False)
+    return np.unpackbits(np.frombuffer(to_bytes(message), dtype=np.uint8))
+
+
+def bits_to_bytes(bits):
+    """Пакує масив бітів у bytes; неповний останній байт відкидається."""
+    bits = np.asarray(bits, dtype=np.uint8)
+    return np.packbits(bits[:bits.size - bits.size % 8]).tobytes()
+
+
+def bits_to_text(bits, errors='replace'):
+    """Декодує масив бітів як текст UTF-8."""
+    return bits_to_bytes(bits).decode(ENCODING, errors)
+
+
+def bits_to_string(bits):
+    """Масив бітів -> рядок із символів '0'/'1' (для старих інтерфейсів лабораторних)."""
+    return (np.asarray(bits, dtype=np.uint8) + ord('0')).tobytes().decode('ascii')
+
+
+def string_to_bits(binary):
+    """Рядок із символів '0'/'1' -> масив бітів."""
+    bits = np.frombuffer(binary.encode('ascii'), dtype=np.uint8) - ord('0')
+    if bits.size and bits.max() > 1:
+        raise ValueError("Message must be a binary string (0s and 1s).")
+    return bits
+
+
+def with_length(message):
+    """Біти повідомлення з 32-бітним заголовком довжини (у байтах) попереду."""
+    data = to_bytes(message)
+    return np.unpackbits(np.frombuffer(len(data).to_bytes(LENGTH_BITS // 8, 'big') + data, dtype=np.uint8))
+
+
+def read_length(bits):
+    """Читає довжину корисного навантаження (у байтах) із перших LENGTH_BITS бітів."""
+    return int.from_bytes(bits_to_bytes(bits[:LENGTH_BITS]), 'big')
+
+
+def read_with_length(read_bits):
+    """Витягує повідомлення із заголовком довжини, читаючи лише потрібні біти.
+
+    read_bits(start, count) повертає count бітів, починаючи з позиції start.
+    """
+    length = read_length(read_bits(0, LENGTH_BITS))
+    return bits_to_bytes(read_bits(LENGTH_BITS, length * 8))
+
+
+def pack(message):
+    """Біти повідомлення із самоописним заголовком: сигнатура, довжина, CRC32."""
+    data = to_bytes(message)
+    header = MAGIC + HEADER.pack(len(data), zlib.crc32(data))
+    return np.unpackbits(np.frombuffer(header + data, dtype=np.uint8))
+
+
+def unpack(read_bits, capacity=None):
+    """Витягує повідомлення, вбудоване разом із заголовком pack, читаючи лише потрібні біти.
+
+    read_bits(start, count) повертає до count бітів, починаючи з позиції start; capacity -
+    загальна кількість бітів, доступних у контейнері. Якщо сигнатура не збігається (після
+    MAGIC_BITS бітів) або довжина не вміщується в контейнер, повертає None.
+    """
+    if bits_to_bytes(read_bits(0, MAGIC_BITS)) != MAGIC:
+        return None
+    header = bits_to_bytes(read_bits(MAGIC_BITS, HEADER.size * 8))
+    if len(header) < HEADER.size:
+        return None
+    length, crc = HEADER.unpack(header)
+    if capacity is not None and HEADER_BITS + length * 8 > capacity:
+        return None
+    data = bits_to_bytes(read_bits(HEADER_BITS, length * 8))
+    if len(data) != length or zlib.crc32(data) != crc:
+        raise ValueError("Контрольна сума CRC32 корисного навантаження не збігається.")
+    return data
+
+
+def unpack_text(read_bits, capacity=None, errors='replace'):
+    """Як unpack, але декодує повідомлення як текст UTF-8."""
+    data = unpack(read_bits, capacity)
+    return None if data is None else data.decode(ENCODING, errors)
@@ -0,0 +1,80 @@
+import os
+import sys
+
+import cv2
+import numpy as np
+
+
+def channel_histograms(image, mask=None):
+    """Гістограми кожного каналу 8-бітного зображення: масив (канали, 256) int64.
+
+    Без маски рахується np.bincount по кожному каналу (без копії всього зображення у плоский вигляд),
+    з маскою (uint8 тієї ж висоти й ширини) - cv2.calcHist.
+    """
+    if image.dtype != np.uint8:
+        raise ValueError(f"Підтримуються лише 8-бітні зображення, отримано {image.dtype}.")
+    image = image[:, :, np.newaxis] if image.ndim == 2 else image
+    counts = np.empty((image.shape[2], 256), dtype=np.int64)
+    for channel in range(image.shape[2]):
+        if mask is None:
+            counts[channel] = np.bincount(np.ascontiguousarray(image[:, :, channel]).reshape(-1), minlength=256)
+        else:
+            counts[channel] = cv2.calcHist([image], [channel], mask, [256], [0, 256]).reshape(-1)
+    return counts
+
+
+def lsb_pairs(counts):
+    """Статистики пар значень (2k, 2k+1), що їх вирівнює LSB-заміна.
+
+    counts - гістограми (..., 256). Повертає словник масивів (..., 128): even та odd - частоти
+    парних і непарних значень, imbalance - |even - odd| / (even + odd) (0 для порожніх пар),
+    а також скаляр на канал imbalance_mean, зважений за кількістю пікселів у парах.
+    """
+    pairs = np.asarray(counts).reshape(*np.shape(counts)[:-1], 128, 2)
+    even, odd = pairs[..., 0], pairs[..., 1]
+    total = even + odd
+    difference = np.abs(even - odd)
+    imbalance = np.divide(difference, total, out=np.zeros(total.shape), where=total > 0)
+    imbalance_mean = difference.sum(axis=-1) / np.maximum(total.sum(axis=-1), 1)
+    return {'even': even, 'odd': odd, 'imbalance': imbalance, 'imbalance_mean': imbalance_mean}
+
+
+def has_display():
+    """Чи є графічний дисплей (на Linux - змінна DISPLAY або WAYLAND_DISPLAY)."""
+    if not sys.platform.startswith('linux'):
+        return True
+    return bool(os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY'))
+
+
+def pyplot(headless):
+    """Лінивий імпорт matplotlib.pyplot; headless=True вмикає бекенд Agg (без вікон)."""
+    import matplotlib
+    if headless:
+        matplotlib.use('Agg')
+    from matplotlib import pyplot as plt
+    return plt
+
+
+def plot_histograms(series, title, xlabel='Pixel Intensity', output=None):
+    """Будує гістограми series - список (підпис, колір, частоти (256,)) - на одному графіку.
+
+    Якщо задано output або немає дисплея, графік записується у PNG (output або <title>.png)
+    і функція не блокує виконання; інакше показується вікно. Повертає шлях до PNG або None.
+    """
+    headless = output is not None or not has_display()
+    plt = pyplot(headless)
+    figure = plt.figure(figsize=(10, 5))
+    for label, color, counts in series:
+        plt.stairs(counts, np.arange(257), fill=True, alpha=0.7, label=label, color=color)
+    plt.title(title)
+    plt.xlabel(xlabel)
+    plt.ylabel('Frequency')
+    plt.legend()
+    plt.grid(True, alpha=0.3)
+    if not headless:
+        plt.show()
+        return None
+    output = output or f"{title.replace(' ', '_').lower()}.png"
+    figure.savefig(output)
+    plt.close(figure)
+    return output
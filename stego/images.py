@@ -0,0 +1,75 @@
+import os
+import threading
+from collections import OrderedDict
+
+import cv2
+
+from stego.positions import readonly
+
+CACHE_BYTES = 512 * 1024 * 1024  # бюджет кешу декодованих зображень у байтах
+
+
+class ImageCache:
+    """LRU-кеш декодованих зображень з обмеженням за сумарним розміром масивів.
+
+    Ключ - (шлях, mtime, режим cv2.imread), тож змінений на диску файл декодується заново.
+    Масиви повертаються лише для читання: кешоване значення ділиться між викликами,
+    і той, хто хоче його змінити, має зробити копію.
+    """
+
+    def __init__(self, max_bytes=CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = self.misses = 0
+        self._images = OrderedDict()
+        self._lock = threading.Lock()
+
+    def read(self, path, mode=cv2.IMREAD_COLOR):
+        """Декодує зображення (як cv2.imread) або повертає його з кешу; None, якщо файл не читається."""
+        try:
+            key = (os.path.abspath(path), os.stat(path).st_mtime_ns, mode)
+        except OSError:
+            return None
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+                self.hits += 1
+                return image
+            self.misses += 1
+        image = cv2.imread(path, mode)
+        if image is not None:
+            self.put(key, readonly(image))
+        return image
+
+    def put(self, key, image):
+        """Додає масив до кешу, витісняючи найдавніше використані, доки не вистачить бюджету."""
+        if image.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._images:
+                return
+            self._images[key] = image
+            self.bytes += image.nbytes
+            while self.bytes > self.max_bytes:
+                _, evicted = self._images.popitem(last=False)
+                self.bytes -= evicted.nbytes
+
+    def clear(self):
+        with self._lock:
+            self._images.clear()
+            self.bytes = 0
+
+    def info(self):
+        """Статистика кешу: влучання, промахи, кількість зображень та зайняті байти."""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'images': len(self._images),
+                    'bytes': self.bytes, 'max_bytes': self.max_bytes}
+
+
+default_cache = ImageCache()
+
+
+def imread(path, mode=cv2.IMREAD_COLOR):
+    """cv2.imread через спільний кеш процесу (масив лише для читання)."""
+    return default_cache.read(path, mode)
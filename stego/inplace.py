@@ -0,0 +1,114 @@
+import struct
+
+import numpy as np
+
+from stego.codec import to_bits
+
+BGR_MASKS = (0x00FF0000, 0x0000FF00, 0x000000FF)  # маски червоного, зеленого та синього каналів у порядку BGR(A)
+
+
+def open_bmp_pixels(path):
+    """Відображає у пам'ять пікселі нестиснутого 24/32-бітного BMP як масив (H, W, C) у порядку BGR.
+
+    Рядки BMP зазвичай зберігаються знизу вгору та вирівнюються до 4 байтів;
+    повернений масив - це view, у якому рядки йдуть згори вниз, як після cv2.imread.
+    """
+    with open(path, 'rb') as file:
+        header = file.read(66)
+    if header[:2] != b'BM':
+        raise ValueError(f"{path} не є BMP-файлом.")
+    data_offset, = struct.unpack_from('<I', header, 10)
+    width, height, _, bits_per_pixel, compression = struct.unpack_from('<iiHHI', header, 18)
+    if bits_per_pixel not in (24, 32) or compression not in (0, 3):
+        raise ValueError(f"Підтримуються лише нестиснуті 24/32-бітні BMP, отримано {bits_per_pixel} біт, стиснення {compression}.")
+    # BI_BITFIELDS: маски каналів ідуть одразу після BITMAPINFOHEADER (і в заголовках V4/V5 теж)
+    if compression == 3 and (len(header) < 66 or struct.unpack_from('<III', header, 54) != BGR_MASKS):
+        raise ValueError(f"{path}: BMP з нестандартними масками каналів (BI_BITFIELDS) не підтримується.")
+    channels = bits_per_pixel // 8
+    row_stride = (width * channels + 3) & ~3
+    rows = np.memmap(path, dtype=np.uint8, mode='r+', offset=data_offset, shape=(abs(height), row_stride))
+    pixels = rows[:, :width * channels].reshape(abs(height), width, channels)
+    return pixels[::-1] if height > 0 else pixels
+
+
+def open_pixels(path, npy_order='RGB'):
+    """Відкриває нестиснутий контейнер (BMP або NPY) для зміни на місці.
+
+    Повертає (pixels, order): memmap-масив (H, W, C) та порядок каналів ('BGR' для BMP).
+    NPY не зберігає порядок каналів, тому він задається параметром npy_order.
+    """
+    if path.lower().endswith('.bmp'):
+        return open_bmp_pixels(path), 'BGR'
+    if path.lower().endswith('.npy'):
+        pixels = np.load(path, mmap_mode='r+')
+        if pixels.dtype != np.uint8 or pixels.ndim != 3:
+            raise ValueError(f"Очікується масив uint8 форми (H, W, C), отримано {pixels.dtype} {pixels.shape}.")
+        return pixels, npy_order
+    raise ValueError(f"Зміна на місці можлива лише для BMP та NPY, а не для {path}.")
+
+
+def channel_index(order, channel):
+    """Індекс каналу ('red', 'green', 'blue') для заданого порядку каналів."""
+    return order.upper().index(channel[0].upper())
+
+
+def flush(pixels):
+    """Скидає змінені сторінки на диск."""
+    base = pixels
+    while base is not None and not isinstance(base, np.memmap):
+        base = base.base
+    if base is not None:
+        base.flush()
+
+
+def embed_lsb_prefix(pixels, channel, bits):
+    """Записує біти в LSB каналу перших len(bits) пікселів (порядок по рядках).
+
+    Торкається лише рядків, що містять корисне навантаження.
+    """
+    height, width = pixels.shape[:2]
+    bits = bits[:height * width]
+    rows = -(-bits.size // width)
+    region = pixels[:rows, :, channel]
+    values = np.array(region).reshape(-1)  # копія розміром із повідомлення, а не із зображення
+    values[:bits.size] = (values[:bits.size] & 254) | bits
+    region[...] = values.reshape(rows, width)
+
+
+def embed_sequential_inplace(path, message, npy_order='BGR'):
+    """Аналог embed_sequential (lab1): LSB синього каналу, змінюючи файл на місці."""
+    pixels, order = open_pixels(path, npy_order)
+    embed_lsb_prefix(pixels, channel_index(order, 'blue'), to_bits(message))
+    flush(pixels)
+
+
+def embed_data_inplace(path, message, npy_order='RGB'):
+    """Аналог embed_data (lab3): LSB синього каналу, змінюючи файл на місці."""
+    pixels, order = open_pixels(path, npy_order)
+    bits = to_bits(message)
+    if bits.size > pixels.shape[0] * pixels.shape[1]:  # один біт на піксель
+        raise ValueError("Не вистачає місця для вбудовування всіх даних.")
+    embed_lsb_prefix(pixels, channel_index(order, 'blue'), bits)
+    flush(pixels)
+
+
+def block_hide_inplace(path, message, block_size=8, pad=False, npy_order='RGB'):
+    """Аналог block_hide (lab2): LSB червоного каналу лівого верхнього пікселя кожного блоку.
+
+    Типово змінюються лише блоки з бітами повідомлення, тож час залежить від довжини повідомлення,
+    а не від розміру зображення. Результат однаково витягується extract_block_data - за заголовком
+    (header=True) або за відомою довжиною (length); решта блоків зберігає початкові LSB.
+    block_hide доповнює повідомлення нулями до кінця зображення; pad=True відтворює це побайтно
+    (і торкається кожного блоку).
+    """
+    pixels, order = open_pixels(path, npy_order)
+    grid = pixels[::block_size, ::block_size, channel_index(order, 'red')]
+    bits = to_bits(message)[:grid.size]
+    count = grid.size if pad else bits.size
+    rows = -(-count // grid.shape[1])
+    region = grid[:rows]
+    values = np.array(region).reshape(-1)
+    values[:count] &= 254
+    values[:bits.size] |= bits
+    region[...] = values.reshape(region.shape)
+    flush(pixels)
@@ -0,0 +1,546 @@
+import numpy as np
+
+from stego import codec
+
+# ZIGZAG[k] - індекс (рядок * 8 + стовпець) k-го коефіцієнта в порядку потоку JPEG
+ZIGZAG = np.array(sorted(range(64), key=lambda i: (i // 8 + i % 8, i // 8 if (i // 8 + i % 8) % 2 else -(i // 8))))
+ZIGZAG_INDEX = np.argsort(ZIGZAG)  # зворотне: позиція в блоці -> номер у зигзаг-порядку
+KZ_1, KZ_2 = ZIGZAG_INDEX[2 * 8 + 3], ZIGZAG_INDEX[3 * 8 + 2]  # пара Коха-Жао (2, 3)/(3, 2), як у lab4
+WM_44 = ZIGZAG_INDEX[4 * 8 + 4]  # коефіцієнт [4, 4] водяного знака lab5
+MAX_AC = 1023  # найбільший модуль коефіцієнта AC у baseline JPEG (8 біт)
+
+SOI, EOI, SOS, DQT, DHT, DRI = 0xD8, 0xD9, 0xDA, 0xDB, 0xC4, 0xDD
+BASELINE = (0xC0, 0xC1)  # послідовні кадри з кодами Хаффмана
+UNSUPPORTED = (0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF)  # прогресивні, lossless, арифметичні
+
+# Типові таблиці Хаффмана (ITU T.81, додаток K.3): (клас, номер) -> (кількості кодів довжини 1..16, символи)
+STANDARD_TABLES = {
+    (0, 0): (bytes([0, 1, 5, 1, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0, 0, 0]), bytes(range(12))),
+    (0, 1): (bytes([0, 3, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0]), bytes(range(12))),
+    (1, 0): (bytes([0, 2, 1, 3, 3, 2, 4, 3, 5, 5, 4, 4, 0, 0, 1, 125]), bytes.fromhex(
+        '01020300041105122131410613516107227114328191a1082342b1c11552d1f0'
+        '2433627282090a161718191a25262728292a3435363738393a434445464748494a'
+        '535455565758595a636465666768696a737475767778797a838485868788898a'
+        '92939495969798999aa2a3a4a5a6a7a8a9aab2b3b4b5b6b7b8b9bac2c3c4c5c6'
+        'c7c8c9cad2d3d4d5d6d7d8d9dae1e2e3e4e5e6e7e8e9eaf1f2f3f4f5f6f7f8f9fa')),
+    (1, 1): (bytes([0, 2, 1, 2, 4, 4, 3, 4, 7, 5, 4, 4, 0, 1, 2, 119]), bytes.fromhex(
+        '000102031104052131061241510761711322328108144291a1b1c109233352f0'
+        '156272d10a162434e125f11718191a262728292a35363738393a434445464748'
+        '494a535455565758595a636465666768696a737475767778797a828384858687'
+        '88898a92939495969798999aa2a3a4a5a6a7a8a9aab2b3b4b5b6b7b8b9bac2c3'
+        'c4c5c6c7c8c9cad2d3d4d5d6d7d8d9dae2e3e4e5e6e7e8e9eaf2f3f4f5f6f7f8f9fa')),
+}
+
+
+def huffman_codes(counts, symbols):
+    """Канонічні коди таблиці: (codes, sizes) - масиви на 256 символів; sizes == 0 - символа немає в таблиці."""
+    codes, sizes = np.zeros(256, dtype=np.int64), np.zeros(256, dtype=np.int64)
+    code, index = 0, 0
+    for length, count in enumerate(counts, 1):
+        for _ in range(count):
+            codes[symbols[index]], sizes[symbols[index]] = code, length
+            code += 1
+            index += 1
+        code <<= 1
+    return codes, sizes
+
+
+def decode_table(counts, symbols):
+    """Таблиця декодування за наступними 16 бітами потоку: (довжина коду << 8) | символ; 0 - недійсний код."""
+    codes, sizes = huffman_codes(counts, symbols)
+    table = np.zeros(1 << 16, dtype=np.uint16)
+    for symbol in symbols:
+        shift = 16 - sizes[symbol]
+        table[codes[symbol] << shift:(codes[symbol] + 1) << shift] = (sizes[symbol] << 8) | symbol
+    return memoryview(table)
+
+
+def bit_windows(segment):
+    """Для кожної бітової позиції сегмента - 16 бітів, що починаються з неї (кінець доповнено одиницями)."""
+    data = np.frombuffer(segment + b'\xff' * 4, dtype=np.uint8).astype(np.uint32)
+    words = (data[:-2] << 16) | (data[1:-1] << 8) | data[2:]
+    return memoryview(((words[:, np.newaxis] >> np.arange(8, 0, -1, dtype=np.uint32)) & 0xFFFF).astype(np.uint16).ravel())
+
+
+def magnitude_sizes(values):
+    """Категорія (кількість додаткових бітів) кожного значення: 0 для 0, інакше довжина |v| у бітах."""
+    return np.frexp(np.abs(values).astype(np.float64))[1].astype(np.int64)
+
+
+def split_scan(data, start):
+    """Ентропійні дані скану від start: сегменти між маркерами RSTn (без байтового заповнення) і позиція маркера кінця."""
+    segments, position, segment_start = [], start, start
+    while True:
+        position = data.find(b'\xff', position)
+        if position < 0 or position + 1 >= len(data):
+            raise ValueError("Скан не завершується маркером.")
+        following = data[position + 1]
+        if following == 0x00:
+            position += 2
+        elif 0xD0 <= following <= 0xD7:
+            segments.append(data[segment_start:position])
+            position += 2
+            segment_start = position
+        elif following == 0xFF:
+            position += 1  # байти заповнення перед маркером
+        else:
+            segments.append(data[segment_start:position].rstrip(b'\xff') if data[position - 1] == 0xFF else data[segment_start:position])
+            return [segment.replace(b'\xff\x00', b'\xff') for segment in segments], position
+
+
+class JpegImage:
+    """Baseline JPEG, розібраний до квантованих коефіцієнтів DCT без IDCT та декодування пікселів.
+
+    blocks - (N, 64) int32, блоки в порядку потоку, коефіцієнти в зигзаг-порядку;
+    layout[c] - номери блоків компоненти c на її сітці (рядки x стовпці блоків).
+    to_bytes() кодує коефіцієнти заново (лише ентропійний рівень): заголовки, таблиці квантування
+    та все, що після скану, копіюються без змін.
+    """
+
+    def __init__(self, data, lazy=False):
+        data = bytes(data)
+        if data[:2] != bytes([0xFF, SOI]):
+            raise ValueError("Це не JPEG: немає маркера SOI.")
+        self.segments = []  # (маркер, вміст) усіх сегментів до SOS
+        self.quant_tables, self.huffman_tables = {}, {}
+        self.restart_interval = 0
+        self.frame = None
+        position = 2
+        while True:
+            while position < len(data) and data[position] == 0xFF and data[position + 1] == 0xFF:
+                position += 1
+            if position + 4 > len(data) or data[position] != 0xFF:
+                raise ValueError("Пошкоджений JPEG: очікувався маркер.")
+            marker = data[position + 1]
+            length = int.from_bytes(data[position + 2:position + 4], 'big')
+            payload = data[position + 4:position + 2 + length]
+            position += 2 + length
+            if marker in UNSUPPORTED:
+                raise ValueError(f"Підтримується лише baseline JPEG (SOF0/SOF1), а не SOF 0x{marker:02X}; "
+                                 "перетворити без втрат можна, напр., jpegtran -copy all.")
+            if marker == EOI:
+                raise ValueError("JPEG не містить скану.")
+            if marker == SOS:
+                self.parse_scan(payload)
+                break
+            self.parse_segment(marker, payload)
+            self.segments.append((marker, payload))
+        if self.frame is None:
+            raise ValueError("JPEG не містить заголовка кадру SOF.")
+        segments, scan_end = split_scan(data, position)
+        self.trailer = data[scan_end:]
+        if bytes([0xFF, SOS]) in self.trailer:
+            raise ValueError("Підтримується лише один скан з усіма компонентами.")
+        self.prepare(segments)
+        if not lazy:
+            self.require()
+
+    @classmethod
+    def open(cls, path, lazy=False):
+        with open(path, 'rb') as file:
+            return cls(file.read(), lazy)
+
+    def parse_segment(self, marker, payload):
+        if marker == DQT:
+            position = 0
+            while position < len(payload):
+                precision, table_id = payload[position] >> 4, payload[position] & 15
+                size = 128 if precision else 64
+                self.quant_tables[table_id] = np.frombuffer(payload[position + 1:position + 1 + size], dtype='>u2' if precision else np.uint8).astype(np.int32)
+                position += 1 + size
+        elif marker == DHT:
+            position = 0
+            while position < len(payload):
+                table_class, table_id = payload[position] >> 4, payload[position] & 15
+                counts = payload[position + 1:position + 17]
+                symbols = payload[position + 17:position + 17 + sum(counts)]
+                self.huffman_tables[table_class, table_id] = (counts, symbols)
+                position += 17 + sum(counts)
+        elif marker == DRI:
+            self.restart_interval = int.from_bytes(payload[:2], 'big')
+        elif marker in BASELINE:
+            if payload[0] != 8:
+                raise ValueError(f"Підтримується лише 8-бітна точність, а не {payload[0]}.")
+            self.height, self.width = int.from_bytes(payload[1:3], 'big'), int.from_bytes(payload[3:5], 'big')
+            self.frame = [{'id': payload[6 + 3 * i], 'h': payload[7 + 3 * i] >> 4, 'v': payload[7 + 3 * i] & 15,
+                           'tq': payload[8 + 3 * i]} for i in range(payload[5])]
+
+    def parse_scan(self, payload):
+        count = payload[0]
+        selectors = {payload[1 + 2 * i]: payload[2 + 2 * i] for i in range(count)}
+        spectral = tuple(payload[1 + 2 * count:4 + 2 * count])
+        if self.frame is None or count != len(self.frame) or set(selectors) != {c['id'] for c in self.frame}:
+            raise ValueError("Підтримується лише один скан з усіма компонентами.")
+        if spectral != (0, 63, 0):
+            raise ValueError("Підтримується лише послідовний скан (Ss=0, Se=63, Ah=Al=0).")
+        for component in self.frame:
+            component['td'], component['ta'] = selectors[component['id']] >> 4, selectors[component['id']] & 15
+
+    def geometry(self):
+        """Розміри сітки блоків кожної компоненти, кількість MCU та план блоків одного MCU."""
+        h_max, v_max = max(c['h'] for c in self.frame), max(c['v'] for c in self.frame)
+        if len(self.frame) == 1:
+            # Неперемежований скан: MCU - один блок, сітка без доповнення до MCU
+            rows, cols = -(-self.height // 8), -(-self.width // 8)
+            return [(rows, cols)], rows * cols, cols, [(0, 0, 0)]
+        mcu_rows, mcu_cols = -(-self.height // (8 * v_max)), -(-self.width // (8 * h_max))
+        grids = [(mcu_rows * c['v'], mcu_cols * c['h']) for c in self.frame]
+        plan = [(slot, v, h) for slot, c in enumerate(self.frame) for v in range(c['v']) for h in range(c['h'])]
+        return grids, mcu_rows * mcu_cols, mcu_cols, plan
+
+    def prepare(self, segments):
+        """Сітка блоків і таблиці декодування; самі коефіцієнти декодуються в require()."""
+        grids, mcus, mcu_cols, plan = self.geometry()
+        self.mcus, self.per_mcu = mcus, len(plan)
+        self.interval = self.restart_interval or mcus
+        if len(segments) < -(-mcus // self.interval):
+            raise ValueError("Скан обірвано: замало інтервалів між маркерами RST.")
+        tables = {}
+        for key in {(0, c['td']) for c in self.frame} | {(1, c['ta']) for c in self.frame}:
+            if key not in self.huffman_tables:
+                raise ValueError(f"Немає таблиці Хаффмана {key}.")
+            tables[key] = decode_table(*self.huffman_tables[key])
+        self.block_plan = [(slot, tables[0, self.frame[slot]['td']], tables[1, self.frame[slot]['ta']]) for slot, _, _ in plan]
+        self.scan_segments = segments
+        self.decoded = 0  # скільки MCU вже декодовано
+        self.cursor = None  # (вікна бітів, позиція, предиктори DC) поточного інтервалу
+        self.blocks = np.zeros((mcus * self.per_mcu, 64), dtype=np.int32)
+
+        # Номер блоку в потоці для кожної позиції на сітці компоненти
+        self.block_slot = np.tile(np.array([slot for slot, _, _ in plan]), mcus)
+        self.layout = []
+        for slot, (rows, cols) in enumerate(grids):
+            if len(self.frame) == 1:
+                self.layout.append(np.arange(rows * cols).reshape(rows, cols))
+                continue
+            component = self.frame[slot]
+            offset = next(i for i, (s, _, _) in enumerate(plan) if s == slot)
+            r, c = np.ogrid[:rows, :cols]
+            mcu = (r // component['v']) * mcu_cols + c // component['h']
+            self.layout.append(mcu * self.per_mcu + offset + (r % component['v']) * component['h'] + c % component['h'])
+
+    def require(self, indexes=None):
+        """Декодує потік до блоків indexes включно (None - весь скан); блоки після них лишаються нулями.
+
+        Ентропійне декодування послідовне, тож для заголовка та короткого повідомлення lab4
+        достатньо розібрати лише початок скану.
+        """
+        target = self.mcus if indexes is None or not np.size(indexes) else int(np.max(indexes)) // self.per_mcu + 1
+        index, values = [], []
+        while self.decoded < target:
+            number, offset = divmod(self.decoded, self.interval)
+            if offset == 0:
+                self.cursor = (bit_windows(self.scan_segments[number]), 0, [0] * self.per_mcu)
+            windows, position, predictions = self.cursor
+            count = min(self.interval - offset, target - self.decoded)
+            try:
+                position = decode_mcus(windows, position, predictions, count, self.block_plan, self.decoded * self.per_mcu, index, values)
+            except IndexError:
+                raise ValueError("Скан обірвано посеред блоку.")
+            if position > len(self.scan_segments[number]) * 8:
+                raise ValueError("Скан обірвано посеред блоку.")
+            self.cursor = (windows, position, predictions)
+            self.decoded += count
+        self.blocks.ravel()[np.array(index, dtype=np.int64)] = values
+
+    def component_size(self, slot=0):
+        """Розмір компоненти в пікселях (висота, ширина) з урахуванням субдискретизації."""
+        h_max, v_max = max(c['h'] for c in self.frame), max(c['v'] for c in self.frame)
+        component = self.frame[slot]
+        return -(-self.height * component['v'] // v_max), -(-self.width * component['h'] // h_max)
+
+    def block_indexes(self, slot=0):
+        """Номери повних блоків 8x8 компоненти (рядок за рядком, як image_to_blocks у lab4): (H // 8, W // 8)."""
+        height, width = self.component_size(slot)
+        return self.layout[slot][:height // 8, :width // 8]
+
+    def quantization(self, slot=0):
+        """Таблиця квантування компоненти в зигзаг-порядку."""
+        return self.quant_tables[self.frame[slot]['tq']]
+
+    def coefficients(self, slot=0):
+        """Деквантовані коефіцієнти повних блоків: (H // 8, W // 8, 8, 8), як DCT 8x8 пікселів мінус 128."""
+        indexes = self.block_indexes(slot)
+        self.require(indexes)
+        blocks = self.blocks[indexes] * self.quantization(slot)
+        return blocks[..., ZIGZAG_INDEX].reshape(*blocks.shape[:2], 8, 8)
+
+    def encode_tables(self, standard=False):
+        """Таблиці кодування для кожної компоненти: (dc_codes, dc_sizes, ac_codes, ac_sizes) - масиви (компоненти, 256)."""
+        if standard:
+            keys = [((0, 0), (1, 0)) if slot == 0 else ((0, 1), (1, 1)) for slot in range(len(self.frame))]
+            tables = STANDARD_TABLES
+        else:
+            keys = [((0, c['td']), (1, c['ta'])) for c in self.frame]
+            tables = self.huffman_tables
+        dc = [huffman_codes(*tables[key]) for key, _ in keys]
+        ac = [huffman_codes(*tables[key]) for _, key in keys]
+        return tuple(np.stack(column) for column in ([c for c, _ in dc], [s for _, s in dc], [c for c, _ in ac], [s for _, s in ac]))
+
+    def encode_scan(self, tables):
+        """Кодує коефіцієнти в ентропійні дані скану (векторно); None, якщо в таблицях бракує потрібного символу."""
+        dc_codes, dc_sizes, ac_codes, ac_sizes = tables
+        blocks, slots = self.blocks, self.block_slot
+        count = len(blocks)
+        if self.restart_interval:
+            interval = np.arange(count) // (self.restart_interval * len(self.geometry()[3]))
+        else:
+            interval = np.zeros(count, dtype=np.int64)
+
+        # DC: різниця з попереднім блоком тієї ж компоненти; предиктор скидається на початку інтервалу
+        dc = blocks[:, 0].astype(np.int64)
+        diff = np.empty(count, dtype=np.int64)
+        for slot in range(len(self.frame)):
+            selected = np.flatnonzero(slots == slot)
+            previous = np.concatenate(([0], dc[selected[:-1]]))
+            previous[np.concatenate(([True], interval[selected[1:]] != interval[selected[:-1]]))] = 0
+            diff[selected] = dc[selected] - previous
+
+        # AC: ненульові коефіцієнти (блок, k), довжини серій нулів перед ними, ZRL для серій від 16 і EOB
+        rows, ks = np.nonzero(blocks[:, 1:])
+        ks = ks + 1
+        previous_k = np.concatenate(([0], ks[:-1]))
+        previous_k[np.concatenate(([True], rows[1:] != rows[:-1]))] = 0
+        runs = ks - previous_k - 1
+        ac = blocks[rows, ks].astype(np.int64)
+        last_k = np.zeros(count, dtype=np.int64)
+        last_k[rows] = ks
+        eob = np.flatnonzero(last_k < 63)
+        zrl = np.repeat(np.arange(len(rows)), runs >> 4)
+
+        dc_size = magnitude_sizes(diff)
+        ac_size = magnitude_sizes(ac)
+        ac_symbol = ((runs & 15) << 4) | ac_size
+        items = [  # (блок, порядок у блоці, символ, розмір коду, код, додаткові біти, їх кількість)
+            (np.arange(count), np.zeros(count, dtype=np.int64), dc_sizes[slots, dc_size], dc_codes[slots, dc_size], diff, dc_size),
+            (rows[zrl], 2 * ks[zrl] - 1, ac_sizes[slots[rows[zrl]], 0xF0], ac_codes[slots[rows[zrl]], 0xF0], np.zeros(len(zrl), dtype=np.int64), np.zeros(len(zrl), dtype=np.int64)),
+            (rows, 2 * ks, ac_sizes[slots[rows], ac_symbol], ac_codes[slots[rows], ac_symbol], ac, ac_size),
+            (eob, np.full(len(eob), 200), ac_sizes[slots[eob], 0], ac_codes[slots[eob], 0], np.zeros(len(eob), dtype=np.int64), np.zeros(len(eob), dtype=np.int64)),
+        ]
+        if any((code_sizes == 0).any() for _, _, code_sizes, _, _, _ in items):
+            return None
+        block = np.concatenate([item[0] for item in items])
+        order = np.concatenate([item[1] for item in items])
+        extra_sizes = np.concatenate([item[5] for item in items])
+        extra = np.concatenate([item[4] for item in items])
+        extra = np.where(extra < 0, extra + (1 << extra_sizes) - 1, extra)  # від'ємні - доповнення до одиниць
+        lengths = np.concatenate([item[2] for item in items]) + extra_sizes
+        words = (np.concatenate([item[3] for item in items]) << extra_sizes) | extra
+
+        # Кожен інтервал доповнюється одиничними бітами до цілого байта
+        item_interval = interval[block]
+        interval_bits = np.bincount(item_interval, weights=lengths, minlength=interval[-1] + 1).astype(np.int64)
+        padding = -interval_bits % 8
+        last_block = np.flatnonzero(np.concatenate((interval[1:] != interval[:-1], [True])))
+        block = np.concatenate((block, last_block))
+        order = np.concatenate((order, np.full(len(last_block), 300)))
+        lengths = np.concatenate((lengths, padding))
+        words = np.concatenate((words, (1 << padding) - 1))
+        sort = np.argsort(block * 512 + order, kind='stable')
+        lengths, words = lengths[sort], words[sort]
+
+        item_of_bit = np.repeat(np.arange(len(lengths)), lengths)
+        offset = np.arange(item_of_bit.size) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        bits = (words[item_of_bit] >> (lengths[item_of_bit] - 1 - offset)) & 1
+        stream = np.packbits(bits.astype(np.uint8)).tobytes()
+
+        edges = np.concatenate(([0], np.cumsum((interval_bits + padding) // 8)))
+        parts = []
+        for number in range(len(edges) - 1):
+            if number:
+                parts.append(bytes([0xFF, 0xD0 + (number - 1) % 8]))
+            parts.append(stream[edges[number]:edges[number + 1]].replace(b'\xff', b'\xff\x00'))
+        return b''.join(parts)
+
+    def to_bytes(self):
+        """Записує JPEG: таблиці Хаффмана оригіналу або, якщо їм бракує символів, типові таблиці T.81 (K.3)."""
+        self.require()
+        scan = self.encode_scan(self.encode_tables())
+        standard = scan is None
+        if standard:
+            scan = self.encode_scan(self.encode_tables(standard=True))
+        parts = [bytes([0xFF, SOI])]
+        for marker, payload in self.segments:
+            if standard and marker == DHT:
+                continue
+            if standard and marker in BASELINE:
+                parts.append(segment(marker, payload))
+                parts.append(segment(DHT, b''.join(bytes([table_class << 4 | table_id]) + counts + symbols
+                                                   for (table_class, table_id), (counts, symbols) in STANDARD_TABLES.items())))
+                continue
+            parts.append(segment(marker, payload))
+        selectors = []
+        for slot, component in enumerate(self.frame):
+            dc, ac = (min(slot, 1),) * 2 if standard else (component['td'], component['ta'])
+            selectors.append(bytes([component['id'], dc << 4 | ac]))
+        parts.append(segment(SOS, bytes([len(self.frame)]) + b''.join(selectors) + bytes([0, 63, 0])))
+        parts.append(scan)
+        parts.append(self.trailer)
+        return b''.join(parts)
+
+    def save(self, path):
+        with open(path, 'wb') as file:
+            file.write(self.to_bytes())
+        return path
+
+
+def segment(marker, payload):
+    return bytes([0xFF, marker]) + (len(payload) + 2).to_bytes(2, 'big') + payload
+
+
+def decode_mcus(windows, position, predictions, mcus, block_plan, first_block, index, values):
+    """Декодує mcus MCU з бітової позиції position; ненульові коефіцієнти додаються в index
+    (номер у blocks.ravel()) та values. predictions (DC компонент) оновлюються на місці; повертає нову позицію."""
+    base = first_block * 64
+    append_index, append_value = index.append, values.append
+    for _ in range(mcus):
+        for slot, dc_table, ac_table in block_plan:
+            entry = dc_table[windows[position]]
+            if not entry:
+                raise ValueError("Недійсний код Хаффмана (DC).")
+            position += entry >> 8
+            size = entry & 15
+            if size:
+                value = windows[position] >> (16 - size)
+                position += size
+                if value < 1 << (size - 1):
+                    value -= (1 << size) - 1
+                predictions[slot] += value
+            if predictions[slot]:
+                append_index(base)
+                append_value(predictions[slot])
+            k = 1
+            while k < 64:
+                entry = ac_table[windows[position]]
+                if not entry:
+                    raise ValueError("Недійсний код Хаффмана (AC).")
+                position += entry >> 8
+                size = entry & 15
+                if size:
+                    k += (entry >> 4) & 15
+                    value = windows[position] >> (16 - size)
+                    position += size
+                    if value < 1 << (size - 1):
+                        value -= (1 << size) - 1
+                    append_index(base + k)
+                    append_value(value)
+                    k += 1
+                elif entry & 0xFF == 0xF0:
+                    k += 16
+                else:
+                    break
+            if k > 64:
+                raise ValueError("Пошкоджений блок: більше 64 коефіцієнтів.")
+            base += 64
+    return position
+
+
+# Схеми lab4/lab5 на квантованих коефіцієнтах яскравості (компонента 0); блоки - як image_to_blocks у lab4
+
+def bits_to_array(bits):
+    """Рядок '0'/'1' або послідовність 0/1 -> масив uint8."""
+    return codec.string_to_bits(bits) if isinstance(bits, str) else np.asarray(bits, dtype=np.uint8)
+
+
+def embed_koch_zhao(image, bits, P=100):
+    """Коха-Жао в коефіцієнтах (2, 3)/(3, 2): біт 0 - c1 - c2 >= P, біт 1 - c1 - c2 <= -P (після деквантування).
+
+    Змінює image (JpegImage) на місці й повертає його. На відміну від lab4, що завжди зсуває пару на
+    +-P/2, змінюються лише блоки, де співвідношення ще не виконано, і лише на потрібну кількість кроків
+    квантування. Витягування lab4 з декодованих пікселів дає ті самі біти (c1 > c2 -> 0).
+    """
+    bits = bits_to_array(bits)
+    indexes = image.block_indexes().ravel()
+    if bits.size > indexes.size:
+        raise ValueError("Повідомлення задовге для ємності зображення.")
+    indexes = indexes[:bits.size]
+    image.require(indexes)
+    table = image.quantization()
+    q1, q2 = int(table[KZ_1]), int(table[KZ_2])
+    c1 = image.blocks[indexes, KZ_1].astype(np.int64)
+    c2 = image.blocks[indexes, KZ_2].astype(np.int64)
+    sign = np.where(bits == 0, 1, -1)
+    need = np.maximum(P - sign * (c1 * q1 - c2 * q2), 0)  # на скільки різниця не дотягує до P у потрібний бік
+    image.blocks[indexes, KZ_1] = np.clip(c1 + sign * np.ceil(need / 2 / q1).astype(np.int64), -MAX_AC, MAX_AC)
+    image.blocks[indexes, KZ_2] = np.clip(c2 - sign * np.ceil(need / 2 / q2).astype(np.int64), -MAX_AC, MAX_AC)
+    return image
+
+
+def extract_bits_range(image, start, count):
+    """Біти [start, start + count) як масив uint8 (як extract_bits_range у lab4, без DCT)."""
+    indexes = image.block_indexes().ravel()[start:start + count]
+    image.require(indexes)
+    table = image.quantization()
+    return (image.blocks[indexes, KZ_1] * table[KZ_1] <= image.blocks[indexes, KZ_2] * table[KZ_2]).astype(np.uint8)
+
+
+def extract_koch_zhao(image, bit_length=None):
+    """Рядок бітів, як extract_koch_zhao у lab4; bit_length=None - за заголовком codec.pack (None, якщо його немає)."""
+    capacity = image.block_indexes().size
+    if bit_length is None:
+        payload = codec.unpack(lambda start, count: extract_bits_range(image, start, count), capacity)
+        return None if payload is None else codec.bits_to_string(codec.to_bits(payload))
+    if bit_length > capacity:
+        raise ValueError("Запитана довжина перевищує ємність зображення.")
+    return codec.bits_to_string(extract_bits_range(image, 0, bit_length))
+
+
+def watermark_mask(image, watermark_img):
+    """Бінарна маска водяного знака на сітці повних блоків яскравості (як watermark_mask у lab5)."""
+    from stego.labs import load_lab
+    return load_lab('lab5').watermark_mask(watermark_img, image.component_size())
+
+
+def embed_watermark_mask(image, watermark_bin, strength=10):
+    """lab5: коефіцієнт [4, 4] кожного блоку +-strength, округлено до кроку квантування (щонайменше один крок)."""
+    indexes = image.block_indexes()
+    if watermark_bin.shape != indexes.shape:
+        raise ValueError(f"Маска {watermark_bin.shape} не відповідає сітці блоків {indexes.shape}.")
+    image.require(indexes)
+    step = max(1, round(strength / image.quantization()[WM_44]))
+    coeffs = image.blocks[indexes.ravel(), WM_44] + np.where(watermark_bin.ravel(), step, -step)
+    image.blocks[indexes.ravel(), WM_44] = np.clip(coeffs, -MAX_AC, MAX_AC)
+    return image
+
+
+def qim_step(image, strength):
+    """Крок QIM у кроках квантування [4, 4]: близько 2 * strength, парний і не менший за 2."""
+    return max(2, 2 * round(strength / image.quantization()[WM_44]))
+
+
+def embed_watermark_mask_blind(image, watermark_bin, strength=10):
+    """QIM-варіант lab5 (quantize_44) на цілих квантованих коефіцієнтах: витягування не потребує контейнера."""
+    indexes = image.block_indexes()
+    if watermark_bin.shape != indexes.shape:
+        raise ValueError(f"Маска {watermark_bin.shape} не відповідає сітці блоків {indexes.shape}.")
+    image.require(indexes)
+    step = qim_step(image, strength)
+    offset = np.where(watermark_bin.ravel(), step // 2, 0)
+    coeffs = image.blocks[indexes.ravel(), WM_44]
+    image.blocks[indexes.ravel(), WM_44] = np.clip(np.round((coeffs - offset) / step).astype(np.int64) * step + offset, -MAX_AC, MAX_AC)
+    return image
+
+
+def extract_watermark(watermarked, original, wm_shape):
+    """Невсліпе витягування: знак зміни коефіцієнта [4, 4] відносно оригінального JPEG (0/255, як у lab5)."""
+    indexes = watermarked.block_indexes()
+    watermarked.require(indexes)
+    original.require(original.block_indexes())
+    delta = watermarked.blocks[indexes, WM_44] - original.blocks[original.block_indexes(), WM_44]
+    return fit_mask(delta > 0, wm_shape)
+
+
+def extract_watermark_blind(image, wm_shape, strength=10):
+    """Сліпе витягування QIM: коефіцієнт ближчий до зсунутої ґратки - біт 1."""
+    indexes = image.block_indexes()
+    image.require(indexes)
+    step = qim_step(image, strength)
+    remainder = np.mod(image.blocks[indexes, WM_44], step)
+    return fit_mask(np.abs(remainder - step // 2) < np.minimum(remainder, step - remainder), wm_shape)
+
+
+def fit_mask(bits, wm_shape):
+    extracted = np.zeros(wm_shape, dtype=np.uint8)
+    rows, cols = min(wm_shape[0], bits.shape[0]), min(wm_shape[1], bits.shape[1])
+    extracted[:rows, :cols] = np.where(bits[:rows, :cols], 255, 0)
+    return extracted
@@ -0,0 +1,53 @@
+import argparse
+import importlib.util
+import os
+import runpy
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # корінь репозиторію
+
+
+def load_lab(lab, module='script'):
+    """Імпортує модуль лабораторної роботи за шляхом до файлу (усі скрипти мають однакову назву)."""
+    name = f"{lab}_{module}"
+    if name in sys.modules:
+        return sys.modules[name]
+    lab_dir = os.path.join(ROOT_DIR, lab)
+    if lab_dir not in sys.path:
+        sys.path.insert(0, lab_dir)  # модулі lab1 імпортують один одного за короткою назвою
+    spec = importlib.util.spec_from_file_location(name, os.path.join(lab_dir, f"{module}.py"))
+    lab_module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = lab_module
+    spec.loader.exec_module(lab_module)
+    return lab_module
+
+
+def run_lab(lab, module='script', argv=()):
+    """Виконує модуль лабораторної як скрипт (__main__) з її директорії, де лежать images/.
+
+    Корінь репозиторію вже в sys.path (python -m stego.labs), тож модулі лабораторних імпортують
+    пакет stego без власних змін sys.path.
+    """
+    lab_dir = os.path.join(ROOT_DIR, lab)
+    if lab_dir not in sys.path:
+        sys.path.insert(0, lab_dir)
+    path = os.path.join(lab_dir, f"{module}.py")
+    sys.argv = [path, *argv]
+    os.chdir(lab_dir)  # скрипти читають і записують images/ відносно своєї директорії
+    runpy.run_path(path, run_name='__main__')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m stego.labs', description="Запуск скриптів лабораторних.")
+    parser.add_argument('lab', help="директорія лабораторної (lab1-lab5)")
+    parser.add_argument('module', nargs='?', default='script', help="модуль (main, benchmark, script)")
+    parser.add_argument('args', nargs=argparse.REMAINDER, help="аргументи скрипта")
+    args = parser.parse_args(argv)
+    if not os.path.isfile(os.path.join(ROOT_DIR, args.lab, f"{args.module}.py")):
+        parser.error(f"немає модуля {args.lab}/{args.module}.py")
+    run_lab(args.lab, args.module, args.args)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
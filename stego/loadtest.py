@@ -0,0 +1,83 @@
+import argparse
+import asyncio
+import json
+import sys
+import time
+from urllib.parse import urlencode
+
+import numpy as np
+
+
+async def request(method, target, body=b'', host='127.0.0.1', port=8765, unix=None):
+    """Один HTTP-запит до stego.server; повертає (статус, заголовки, тіло)."""
+    if unix:
+        reader, writer = await asyncio.open_unix_connection(unix)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    head = f"{method} {target} HTTP/1.1\r\nHost: {host}\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n"
+    writer.write(head.encode('latin-1') + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while (line := await reader.readline()) not in (b'\r\n', b''):
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    data = await reader.readexactly(int(headers.get('content-length', 0)))
+    writer.close()
+    return status, headers, data
+
+
+async def load_test(target, body, requests=200, concurrency=16, **connection):
+    """Надсилає requests запитів, тримаючи concurrency одночасно; повертає статистику."""
+    latencies, statuses = [], {}
+    pending = iter(range(requests))
+
+    async def client():
+        for _ in pending:
+            start = time.perf_counter()
+            try:
+                status, _, _ = await request('POST', target, body, **connection)
+            except OSError:
+                status = 'connection error'
+            statuses[status] = statuses.get(status, 0) + 1
+            if status == 200:
+                latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies = np.array(latencies) * 1000
+    return {
+        'requests': requests, 'concurrency': concurrency, 'seconds': elapsed,
+        'requests_per_second': requests / elapsed, 'ok_per_second': latencies.size / elapsed,
+        'statuses': {str(status): count for status, count in statuses.items()},
+        **{f"p{q}_ms": float(np.percentile(latencies, q)) if latencies.size else None for q in (50, 90, 99)},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m stego.loadtest', description="Навантажувальний тест stego.server.")
+    parser.add_argument('image', help="зображення, що надсилається в кожному запиті")
+    parser.add_argument('--endpoint', choices=('embed', 'extract'), default='embed')
+    parser.add_argument('--lab', type=int, default=1)
+    parser.add_argument('-m', '--message', default='lishchuk bohdan')
+    parser.add_argument('-n', '--requests', type=int, default=200)
+    parser.add_argument('-c', '--concurrency', type=int, default=16)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help="Unix-сокет сервера")
+    args = parser.parse_args(argv)
+
+    with open(args.image, 'rb') as file:
+        body = file.read()
+    query = {'lab': args.lab}
+    if args.endpoint == 'embed':
+        query['message'] = args.message
+    target = f"/{args.endpoint}?{urlencode(query)}"
+    result = asyncio.run(load_test(target, body, args.requests, args.concurrency, host=args.host, port=args.port, unix=args.unix))
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,149 @@
+import math
+
+import cv2
+import numpy as np
+
+CHUNK_PIXELS = 1 << 20  # скільки пікселів (рядки x ширина x канали) обробляти за раз
+DATA_RANGE = 255  # діапазон значень 8-бітних зображень
+SSIM_SIGMA = 1.5  # гаусове вікно SSIM (Wang et al., 2004)
+SSIM_RADIUS = 5  # радіус вікна: int(3.5 * sigma + 0.5), як у skimage
+SSIM_K1, SSIM_K2 = 0.01, 0.03
+
+
+class Buffers:
+    """Попередньо виділені робочі масиви, що перевикористовуються між фрагментами та парами зображень."""
+
+    def __init__(self):
+        self._arrays = {}
+
+    def get(self, name, shape, dtype):
+        """Масив потрібної форми: view на вже виділений буфер, якщо він достатньо великий."""
+        size = math.prod(shape)
+        array = self._arrays.get((name, np.dtype(dtype)))
+        if array is None or array.size < size:
+            array = self._arrays[(name, np.dtype(dtype))] = np.empty(size, dtype=dtype)
+        return array[:size].reshape(shape)
+
+
+def chunk_rows(shape, chunk_pixels=CHUNK_PIXELS):
+    """Кількість рядків у фрагменті, щоб фрагмент мав приблизно chunk_pixels значень."""
+    return max(1, chunk_pixels // max(1, math.prod(shape[1:])))
+
+
+def squared_error(original, stego, chunk_pixels=CHUNK_PIXELS, buffers=None):
+    """Сума квадратів різниць без повнорозмірних копій у float (фрагментами по рядках)."""
+    if original.shape != stego.shape:
+        raise ValueError(f"Розміри зображень не збігаються: {original.shape} та {stego.shape}.")
+    buffers = buffers or Buffers()
+    rows = chunk_rows(original.shape, chunk_pixels)
+    total = 0
+    for start in range(0, original.shape[0], rows):
+        a, b = original[start:start + rows], stego[start:start + rows]
+        diff = buffers.get('diff', a.shape, np.int32)
+        np.subtract(a, b, out=diff, dtype=np.int32)
+        flat = diff.reshape(-1)
+        # Скалярний добуток замість diff ** 2 - без ще одного масиву; сума в int64, бо int32 переповнюється
+        total += int(np.einsum('i,i->', flat, flat, dtype=np.int64))
+    return total
+
+
+def mse(original, stego, chunk_pixels=CHUNK_PIXELS, buffers=None):
+    """Середньоквадратична помилка."""
+    return squared_error(original, stego, chunk_pixels, buffers) / original.size
+
+
+def psnr(original, stego, chunk_pixels=CHUNK_PIXELS, buffers=None, data_range=DATA_RANGE):
+    """Пікове відношення сигнал/шум у дБ (inf для однакових зображень)."""
+    return psnr_from_mse(mse(original, stego, chunk_pixels, buffers), data_range)
+
+
+def psnr_from_mse(error, data_range=DATA_RANGE):
+    """PSNR за вже обчисленою MSE."""
+    return math.inf if error == 0 else 10 * math.log10(data_range ** 2 / error)
+
+
+def ssim_rows(a, b, buffers, data_range=DATA_RANGE):
+    """Сума значень карти SSIM для внутрішніх рядків фрагмента (без SSIM_RADIUS рядків з кожного боку)."""
+    c1, c2 = (SSIM_K1 * data_range) ** 2, (SSIM_K2 * data_range) ** 2
+    ksize = (2 * SSIM_RADIUS + 1,) * 2
+    x = buffers.get('x', a.shape, np.float32)
+    y = buffers.get('y', a.shape, np.float32)
+    x[...], y[...] = a, b
+
+    def blur(values, name):
+        return cv2.GaussianBlur(values, ksize, SSIM_SIGMA, dst=buffers.get(name, a.shape, np.float32),
+                                borderType=cv2.BORDER_REFLECT)
+
+    mu_x, mu_y = blur(x, 'mu_x'), blur(y, 'mu_y')
+    xy = buffers.get('xy', a.shape, np.float32)
+    sigma_xy = blur(np.multiply(x, y, out=xy), 'sigma_xy')
+    sigma_x = blur(np.multiply(x, x, out=x), 'sigma_x')
+    sigma_y = blur(np.multiply(y, y, out=y), 'sigma_y')
+    inner = slice(SSIM_RADIUS, a.shape[0] - SSIM_RADIUS)
+    mu_x, mu_y, sigma_x, sigma_y, sigma_xy = (v[inner, SSIM_RADIUS:a.shape[1] - SSIM_RADIUS].astype(np.float64)
+                                              for v in (mu_x, mu_y, sigma_x, sigma_y, sigma_xy))
+    mu_xy = mu_x * mu_y
+    mu_x *= mu_x
+    mu_y *= mu_y
+    numerator = (2 * mu_xy + c1) * (2 * (sigma_xy - mu_xy) + c2)
+    denominator = (mu_x + mu_y + c1) * ((sigma_x - mu_x) + (sigma_y - mu_y) + c2)
+    return float((numerator / denominator).sum())
+
+
+def ssim(original, stego, chunk_pixels=CHUNK_PIXELS, buffers=None, data_range=DATA_RANGE):
+    """Середній SSIM з гаусовим вікном (як skimage structural_similarity з gaussian_weights=True, sigma=1.5).
+
+    Багатоканальні зображення усереднюються по каналах. Обчислення йде фрагментами по рядках
+    з перекриттям SSIM_RADIUS рядків, тож результат не залежить від розміру фрагмента.
+    """
+    if original.shape != stego.shape:
+        raise ValueError(f"Розміри зображень не збігаються: {original.shape} та {stego.shape}.")
+    height, width = original.shape[:2]
+    if min(height, width) <= 2 * SSIM_RADIUS:
+        raise ValueError(f"Зображення {width}x{height} замале для вікна SSIM.")
+    buffers = buffers or Buffers()
+    channels = 1 if original.ndim == 2 else original.shape[2]
+    rows = max(1, chunk_rows(original.shape, chunk_pixels) - 2 * SSIM_RADIUS)
+    total = 0.0
+    for channel in range(channels):
+        a = original if original.ndim == 2 else original[:, :, channel]
+        b = stego if stego.ndim == 2 else stego[:, :, channel]
+        for start in range(SSIM_RADIUS, height - SSIM_RADIUS, rows):
+            stop = min(start + rows, height - SSIM_RADIUS)
+            window = slice(start - SSIM_RADIUS, stop + SSIM_RADIUS)
+            total += ssim_rows(a[window], b[window], buffers, data_range)
+    return total / (channels * (height - 2 * SSIM_RADIUS) * (width - 2 * SSIM_RADIUS))
+
+
+def bit_error_rate(expected, actual):
+    """Частка помилкових бітів; біти, яких бракує в actual, вважаються помилковими."""
+    expected, actual = np.asarray(expected, dtype=np.uint8).ravel(), np.asarray(actual, dtype=np.uint8).ravel()
+    if not expected.size:
+        return 0.0
+    common = min(expected.size, actual.size)
+    errors = np.count_nonzero(expected[:common] != actual[:common]) + expected.size - common
+    return float(errors / expected.size)
+
+
+def quality(original, stego, expected_bits=None, extracted_bits=None, ssim_enabled=True,
+            chunk_pixels=CHUNK_PIXELS, buffers=None):
+    """Метрики однієї пари (оригінал, стего): mse, psnr, ssim та ber (якщо передано біти)."""
+    buffers = buffers or Buffers()
+    error = mse(original, stego, chunk_pixels, buffers)
+    result = {'mse': error, 'psnr': psnr_from_mse(error)}
+    if ssim_enabled:
+        result['ssim'] = ssim(original, stego, chunk_pixels, buffers)
+    if expected_bits is not None:
+        result['ber'] = bit_error_rate(expected_bits, extracted_bits)
+    return result
+
+
+def batch_quality(pairs, ssim_enabled=True, chunk_pixels=CHUNK_PIXELS):
+    """Метрики для послідовності пар (original, stego) або (original, stego, expected_bits, extracted_bits).
+
+    Усі пари ділять одні робочі буфери, тож пам'ять обмежена розміром фрагмента, а не кількістю пар.
+    """
+    buffers = Buffers()
+    for pair in pairs:
+        original, stego, *bits = pair
+        yield quality(original, stego, *bits, ssim_enabled=ssim_enabled, chunk_pixels=chunk_pixels, buffers=buffers)
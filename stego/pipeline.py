@@ -0,0 +1,243 @@
+import os
+import time
+
+import cv2
+import numpy as np
+
+from stego import codec
+from stego.images import imread
+from stego.labs import load_lab
+from stego.positions import keyed_positions
+
+LOSSLESS_FORMATS = ('.png', '.bmp', '.tif', '.tiff', '.ppm', '.pgm')  # формати, що зберігають LSB без змін
+
+
+def pad_to_multiple_of_8(image):
+    """Доповнює зображення повторенням крайніх пікселів до розмірів, кратних 8."""
+    height, width = image.shape[:2]
+    return cv2.copyMakeBorder(image, 0, -height % 8, 0, -width % 8, cv2.BORDER_REPLICATE)
+
+
+def resize_to_multiple_of_8(image):
+    """Масштабує зображення до розмірів, кратних 8 (округлення вгору, як у lab4)."""
+    height, width = image.shape[:2]
+    return cv2.resize(image, (width + -width % 8, height + -height % 8), interpolation=cv2.INTER_AREA)
+
+
+def to_grayscale(image):
+    """BGR(A) -> відтінки сірого; одноканальне зображення повертається без змін."""
+    if image.ndim == 2:
+        return image
+    return cv2.cvtColor(image, cv2.COLOR_BGRA2GRAY if image.shape[2] == 4 else cv2.COLOR_BGR2GRAY)
+
+
+# Алгоритми вбудовування на масивах (BGR або відтінки сірого, як після cv2.imread).
+# embed(image, bits, options) -> стего-зображення; reader(image, options) -> (read_bits(start, count), ємність)
+
+def embed_lsb_blue(image, bits, options):
+    """lab1 (та lab3: синій канал RGB - це той самий канал BGR): послідовно або за ключем seed."""
+    encoder = load_lab('lab1', 'encoder')
+    if options.get('seed') is None:
+        return encoder.embed_sequential_fast(image, bits)
+    return encoder.embed_random_keyed(image, bits, options['seed'])
+
+
+def read_lsb_blue(image, options):
+    blue = np.ascontiguousarray(image).reshape(-1, image.shape[2])[:, 0]
+    seed = options.get('seed')
+    if seed is None:
+        return (lambda start, count: blue[start:start + count] & 1), blue.size
+
+    def read_bits(start, count):
+        count = max(0, min(count, blue.size - start))
+        return blue[keyed_positions(seed, blue.size, count, start)] & 1
+    return read_bits, blue.size
+
+
+def embed_blocks(image, bits, options):
+    """lab2: червоний канал лівого верхнього пікселя кожного блоку (lab2 працює з RGB)."""
+    return np.ascontiguousarray(load_lab('lab2').block_hide(image[:, :, ::-1], bits)[:, :, ::-1])
+
+
+def read_blocks(image, options):
+    grid = image[::8, ::8, 2]
+    return (lambda start, count: load_lab('lab2').read_grid_bits(grid, start, count)), grid.size
+
+
+def embed_koch_zhao(image, bits, options):
+    """lab4: відносна заміна коефіцієнтів DCT (потребує відтінків сірого та розмірів, кратних 8)."""
+    script = load_lab('lab4')
+    if image.shape[0] % 8 or image.shape[1] % 8:
+        raise ValueError(f"lab4 потребує розмірів, кратних 8, отримано {image.shape[1]}x{image.shape[0]}; "
+                         "додайте етап .fit8().")
+    if len(bits) > image.shape[0] * image.shape[1] // 64:
+        raise ValueError("Message is too long for the image capacity.")
+    return script.embed_bits_batched(image, bits, options.get('P', 100), options.get('workers', 1))
+
+
+def read_koch_zhao(image, options):
+    script = load_lab('lab4')
+    return (lambda start, count: script.extract_bits_range(image, start, count)), (image.shape[0] // 8) * (image.shape[1] // 8)
+
+
+EMBEDDERS = {
+    1: (embed_lsb_blue, read_lsb_blue, False),
+    2: (embed_blocks, read_blocks, False),
+    3: (embed_lsb_blue, read_lsb_blue, False),
+    4: (embed_koch_zhao, read_koch_zhao, True),
+}  # lab -> (embed, reader, потрібні відтінки сірого)
+
+
+class PipelineResult:
+    """Результат виконання конвеєра."""
+
+    def __init__(self, image, data=None, path=None, verified=None, timings=None):
+        self.image = image  # підсумкове зображення (масив)
+        self.data = data  # закодовані байти файлу (якщо був етап encode)
+        self.path = path  # куди їх записано
+        self.verified = verified  # результат перевірки: True/False або None, якщо її не було
+        self.timings = timings or {}  # секунди на кожен етап
+
+
+class Pipeline:
+    """Лінивий конвеєр обробки зображення в пам'яті.
+
+    Методи лише додають етапи й повертають self; обчислення відбувається в run().
+    Перед виконанням етапи зливаються (plan): завантаження + grayscale декодує одразу у відтінки
+    сірого, повторні grayscale/fit8 відкидаються, а кодування у вихідний формат виконується
+    один раз наприкінці. Перевірка витягуванням для форматів без втрат працює на масиві в пам'яті.
+
+        Pipeline('images/image_2.jpg').grayscale().fit8().embed(4, 'lishchuk').encode('out.png').verify().run()
+    """
+
+    def __init__(self, source):
+        self.source = source  # шлях до файлу або масив (BGR чи відтінки сірого)
+        self.stages = []
+
+    def _add(self, name, **options):
+        self.stages.append((name, options))
+        return self
+
+    def grayscale(self):
+        return self._add('grayscale')
+
+    def fit8(self, mode='pad'):
+        """Доводить розміри до кратних 8: mode='pad' (повторення країв) або 'resize'."""
+        if mode not in ('pad', 'resize'):
+            raise ValueError(f"Невідомий режим {mode}, очікується 'pad' або 'resize'.")
+        return self._add('fit8', mode=mode)
+
+    def embed(self, lab, message, **options):
+        """Вбудовує message алгоритмом лабораторної lab разом із заголовком codec.pack.
+
+        options: seed (lab1/lab3), P та workers (lab4); для lab5 message - зображення водяного
+        знака, options - strength та workers.
+        """
+        if lab not in EMBEDDERS and lab != 5:
+            raise ValueError(f"Невідома лабораторна {lab}, очікується 1-5.")
+        return self._add('embed', lab=lab, message=message, options=options)
+
+    def encode(self, path=None, ext='.png', params=()):
+        """Кодує результат у формат ext (або за розширенням path) і, якщо задано path, записує файл."""
+        if path is not None:
+            ext = os.path.splitext(path)[1] or ext
+        return self._add('encode', path=path, ext=ext.lower(), params=list(params))
+
+    def verify(self):
+        """Перевіряє вбудовування витягуванням (після encode - із того, що буде у файлі)."""
+        return self._add('verify')
+
+    def plan(self):
+        """Етапи після злиття: список (назва, параметри), що його виконує run()."""
+        stages = [('load', {'mode': cv2.IMREAD_COLOR})]
+
+        def add_grayscale():
+            if stages[-1][0] == 'load':
+                stages[-1] = ('load', {'mode': cv2.IMREAD_GRAYSCALE})  # декодуємо одразу у відтінки сірого
+            else:
+                stages.append(('grayscale', {}))
+
+        gray = False
+        for name, options in self.stages:
+            if name == 'grayscale':
+                if not gray:
+                    add_grayscale()
+                gray = True
+                continue
+            if name == 'fit8' and any(stage == 'fit8' for stage, _ in stages):
+                continue  # після першого fit8 розміри вже кратні 8
+            if name == 'embed' and gray and options['lab'] != 5 and not EMBEDDERS[options['lab']][2]:
+                raise ValueError(f"lab{options['lab']} вбудовує в кольорові канали, тож несумісна з етапом grayscale.")
+            if name == 'embed' and (options['lab'] == 5 or EMBEDDERS[options['lab']][2]) and not gray:
+                add_grayscale()  # lab4 та lab5 працюють із відтінками сірого
+                gray = True
+            if name == 'encode' and any(stage == 'encode' for stage, _ in stages):
+                raise ValueError("Конвеєр може мати лише один етап encode.")
+            stages.append((name, options))
+        return stages
+
+    def run(self):
+        timings = {}
+        image, data, path, ext, verified = None, None, None, None, None
+        container = embedded = None
+        for name, options in self.plan():
+            start = time.perf_counter()
+            if name == 'load':
+                image = self._load(options['mode'])
+            elif name == 'grayscale':
+                image = to_grayscale(image)
+            elif name == 'fit8':
+                if image.shape[0] % 8 or image.shape[1] % 8:
+                    image = pad_to_multiple_of_8(image) if options['mode'] == 'pad' else resize_to_multiple_of_8(image)
+            elif name == 'embed':
+                container, embedded = image, options
+                image = self._embed(image, options)
+            elif name == 'encode':
+                ok, buffer = cv2.imencode(options['ext'], image, options['params'])
+                if not ok:
+                    raise ValueError(f"Не вдалося закодувати зображення у формат {options['ext']}.")
+                data, path, ext = buffer.tobytes(), options['path'], options['ext']
+                if path is not None:
+                    with open(path, 'wb') as file:
+                        file.write(data)
+            elif name == 'verify':
+                if embedded is None:
+                    raise ValueError("Немає що перевіряти: у конвеєрі немає етапу embed.")
+                stored = image
+                if data is not None and ext not in LOSSLESS_FORMATS:
+                    stored = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_UNCHANGED)
+                verified = self._verify(stored, container, embedded)
+            timings[name] = timings.get(name, 0.0) + time.perf_counter() - start
+        return PipelineResult(image, data, path, verified, timings)
+
+    def _load(self, mode):
+        if isinstance(self.source, np.ndarray):
+            return to_grayscale(self.source) if mode == cv2.IMREAD_GRAYSCALE else self.source
+        image = imread(self.source, mode)
+        if image is None:
+            raise ValueError(f"Не вдалося прочитати {self.source}.")
+        return image
+
+    @staticmethod
+    def _embed(image, options):
+        if options['lab'] == 5:
+            strength = options['options'].get('strength', 10)
+            return load_lab('lab5').embed_watermark_dct_batched(image, to_grayscale(options['message']), strength,
+                                                                options['options'].get('workers', 1))
+        embed, _, _ = EMBEDDERS[options['lab']]
+        return embed(image, codec.pack(options['message']), options['options'])
+
+    @staticmethod
+    def _verify(stored, container, options):
+        if options['lab'] == 5:
+            script = load_lab('lab5')
+            wm_shape = (container.shape[0] // 8, container.shape[1] // 8)
+            expected = script.watermark_mask(to_grayscale(options['message']), container.shape)
+            extracted = script.extract_watermark_dct_batched(stored, container, wm_shape) > 0
+            return bool(np.array_equal(extracted[:expected.shape[0], :expected.shape[1]], expected))
+        _, reader, _ = EMBEDDERS[options['lab']]
+        try:
+            return codec.unpack(*reader(stored, options['options'])) == codec.to_bytes(options['message'])
+        except ValueError:
+            return False  # CRC32 не збігся
+
@@ -0,0 +1,88 @@
+import functools
+import random
+
+import numpy as np
+
+FEISTEL_ROUNDS = 4  # кількість раундів мережі Фейстеля
+CACHE_SIZE = 32  # скільки перестановок тримати в LRU-кеші
+
+
+def readonly(array):
+    """Забороняє запис у масив, щоб кешоване значення можна було безпечно ділити між потоками."""
+    array.setflags(write=False)
+    return array
+
+
+def round_keys(seed, rounds=FEISTEL_ROUNDS):
+    """Раундові ключі мережі Фейстеля, отримані з seed без глобального стану RNG."""
+    return np.random.default_rng(seed % (1 << 64)).integers(0, 1 << 63, rounds, dtype=np.uint64)
+
+
+def mix(values, key):
+    """Раундова функція: перемішування бітів у стилі splitmix64 (uint64 з переповненням)."""
+    z = (values + key) * np.uint64(0x9E3779B97F4A7C15)
+    z ^= z >> np.uint64(31)
+    z *= np.uint64(0xBF58476D1CE4E5B9)
+    z ^= z >> np.uint64(29)
+    return z
+
+
+def feistel(values, half_bits, keys):
+    """Збалансована мережа Фейстеля - бієкція на [0, 4^half_bits)."""
+    shift, mask = np.uint64(half_bits), np.uint64((1 << half_bits) - 1)
+    left, right = values >> shift, values & mask
+    for key in keys:
+        left, right = right, left ^ (mix(right, key) & mask)
+    return (left << shift) | right
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def keyed_positions(seed, total, count, start=0):
+    """Позиції start..start+count-1 ключової псевдовипадкової перестановки [0, total) за O(count).
+
+    Перестановка задається мережею Фейстеля з обходом циклу (cycle walking), тож перші k
+    позицій не потребують генерації всієї перестановки, а різні позиції ніколи не збігаються.
+    """
+    if start + count > total:
+        raise ValueError(f"Неможливо вибрати {count} позицій з {total - start} доступних.")
+    half_bits = max(1, ((total - 1).bit_length() + 1) // 2)
+    keys = round_keys(seed)
+    positions = feistel(np.arange(start, start + count, dtype=np.uint64), half_bits, keys)
+    outside = np.flatnonzero(positions >= total)
+    while outside.size:
+        positions[outside] = feistel(positions[outside], half_bits, keys)
+        outside = outside[positions[outside] >= total]
+    return readonly(positions.astype(np.intp))
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def sample_positions(seed, total, count):
+    """Ті самі позиції, що random.seed(seed); random.sample(range(total), count), але без глобального стану."""
+    return readonly(np.array(random.Random(seed).sample(range(total), count), dtype=np.intp))
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def shuffled_indexes(seed, size):
+    """Та сама перестановка, що np.random.seed(seed); np.random.shuffle(np.arange(size)), без глобального стану."""
+    indexes = np.arange(size)
+    np.random.RandomState(seed).shuffle(indexes)
+    return readonly(indexes)
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def inverse_shuffled_indexes(seed, size):
+    """Обернена перестановка до shuffled_indexes, обчислена розкиданням (scatter) замість argsort."""
+    return readonly(inverse_permutation(shuffled_indexes(seed, size)))
+
+
+def clear_caches():
+    """Очищає кеші позицій, щоб наступний виклик обчислював їх заново (для чесних вимірювань часу)."""
+    for cached in (keyed_positions, sample_positions, shuffled_indexes, inverse_shuffled_indexes):
+        cached.cache_clear()
+
+
+def inverse_permutation(indexes):
+    """Обернена перестановка за O(n): inverse[indexes[i]] = i."""
+    inverse = np.empty_like(indexes)
+    inverse[indexes] = np.arange(indexes.size, dtype=indexes.dtype)
+    return inverse
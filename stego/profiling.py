@@ -0,0 +1,271 @@
+import functools
+import json
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+
+# Функції лабораторних, що обгортаються instrument(): назва -> категорія етапу
+FUNCTION_STAGES = {
+    'read_jpg': 'decode', 'load_image': 'decode', 'load_gray': 'decode',
+    'write_jpg': 'encode', 'save_image': 'encode', 'save_stego': 'encode',
+    'text_to_bin': 'bits', 'bin_to_text': 'bits', 'text_to_bits': 'bits', 'bits_to_text': 'bits',
+    'text_to_binary': 'bits', 'binary_to_text': 'bits', 'bits_to_array': 'bits',
+    'dct': 'transform', 'idct': 'transform', 'block_dct': 'transform', 'block_idct': 'transform',
+    'batch_dct': 'transform', 'batch_idct': 'transform',
+    'embed_sequential': 'loop', 'embed_random': 'loop', 'extract_message': 'loop', 'extract_message_random': 'loop',
+    'apply_palette_substitution': 'loop', 'reverse_palette_substitution': 'loop',
+    'embed_watermark_dct': 'loop', 'extract_watermark_dct': 'loop',
+    'embed_sequential_fast': 'embed', 'embed_random_fast': 'embed', 'embed_random_keyed': 'embed',
+    'block_hide': 'embed', 'permute_pixels': 'embed', 'apply_palette_substitution_fast': 'embed',
+    'embed_data': 'embed', 'embed_koch_zhao': 'embed', 'embed_bits_batched': 'embed',
+    'embed_watermark_dct_batched': 'embed', 'embed_watermark_mask': 'embed', 'embed_watermark_blind': 'embed',
+    'extract_message_fast': 'extract', 'extract_message_random_fast': 'extract', 'extract_message_random_keyed': 'extract',
+    'extract_block_data': 'extract', 'inverse_permute_pixels': 'extract', 'reverse_palette_substitution_fast': 'extract',
+    'extract_data': 'extract', 'extract_koch_zhao': 'extract', 'extract_bits_batched': 'extract',
+    'extract_bits_range': 'extract', 'extract_watermark_dct_batched': 'extract', 'extract_watermark_blind': 'extract',
+}
+JPEG_METHODS = {'require': 'decode', 'encode_scan': 'encode'}  # JpegImage: ентропійне декодування та кодування
+LAB_MODULES = (('lab1', 'utils'), ('lab1', 'encoder'), ('lab1', 'decoder'),
+               ('lab2', 'script'), ('lab3', 'script'), ('lab4', 'script'), ('lab5', 'script'))
+
+
+class Profiler:
+    """Накопичує час, оброблені байти та пікове виділення пам'яті для вкладених етапів.
+
+    Етапи ідентифікуються стеком назв ("embed:lab4.embed_koch_zhao;transform:lab4.dct"),
+    тож результат можна вивантажити у форматі folded stacks для flame graph.
+    """
+
+    def __init__(self, memory=True):
+        self.memory = memory
+        self.stats = {}  # стек -> {'calls', 'seconds', 'child_seconds', 'bytes', 'peak_bytes'}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _stack(self):
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    def enter(self, name):
+        stack = self._stack()
+        frame = {'name': name, 'start': time.perf_counter(), 'child_seconds': 0.0, 'peak': 0, 'base': 0}
+        if self.memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1]['peak'] = max(stack[-1]['peak'], peak)  # скидання піку нижче не повинно загубити пік батьківського етапу
+            tracemalloc.reset_peak()
+            frame['base'] = current
+        stack.append(frame)
+
+    def exit(self, nbytes=0):
+        stack = self._stack()
+        frame = stack.pop()
+        seconds = time.perf_counter() - frame['start']
+        peak = 0
+        if self.memory and tracemalloc.is_tracing():
+            frame['peak'] = max(frame['peak'], tracemalloc.get_traced_memory()[1])
+            peak = frame['peak'] - frame['base']
+            if stack:
+                stack[-1]['peak'] = max(stack[-1]['peak'], frame['peak'])
+        if stack:
+            stack[-1]['child_seconds'] += seconds
+        key = ';'.join([item['name'] for item in stack] + [frame['name']])
+        with self._lock:
+            stats = self.stats.setdefault(key, {'calls': 0, 'seconds': 0.0, 'child_seconds': 0.0, 'bytes': 0, 'peak_bytes': 0})
+            stats['calls'] += 1
+            stats['seconds'] += seconds
+            stats['child_seconds'] += frame['child_seconds']
+            stats['bytes'] += nbytes
+            stats['peak_bytes'] = max(stats['peak_bytes'], peak)
+
+    def merge(self, snapshot):
+        """Додає статистику з іншого процесу (результат snapshot())."""
+        with self._lock:
+            for key, other in snapshot.items():
+                stats = self.stats.setdefault(key, {'calls': 0, 'seconds': 0.0, 'child_seconds': 0.0, 'bytes': 0, 'peak_bytes': 0})
+                for field in ('calls', 'seconds', 'child_seconds', 'bytes'):
+                    stats[field] += other[field]
+                stats['peak_bytes'] = max(stats['peak_bytes'], other['peak_bytes'])
+
+    def snapshot(self):
+        with self._lock:
+            return {key: dict(stats) for key, stats in self.stats.items()}
+
+    def reset(self):
+        with self._lock:
+            self.stats.clear()
+
+    def by_stage(self):
+        """Підсумки за назвою етапу (останній елемент стеку), незалежно від того, звідки його викликано."""
+        totals = {}
+        for key, stats in self.snapshot().items():
+            total = totals.setdefault(key.rsplit(';', 1)[-1], {'calls': 0, 'seconds': 0.0, 'bytes': 0, 'peak_bytes': 0})
+            total['calls'] += stats['calls']
+            total['seconds'] += stats['seconds']
+            total['bytes'] += stats['bytes']
+            total['peak_bytes'] = max(total['peak_bytes'], stats['peak_bytes'])
+        return totals
+
+    def to_json(self):
+        return json.dumps({'stages': self.by_stage(), 'stacks': self.snapshot()}, indent=2, sort_keys=True)
+
+    def to_prometheus(self):
+        """Текстовий формат Prometheus (exposition format 0.0.4)."""
+        lines = []
+        metrics = (('stego_stage_calls_total', 'counter', 'calls', "Number of stage executions."),
+                   ('stego_stage_seconds_total', 'counter', 'seconds', "Wall time spent in the stage."),
+                   ('stego_stage_bytes_total', 'counter', 'bytes', "Bytes processed by the stage."),
+                   ('stego_stage_peak_bytes', 'gauge', 'peak_bytes', "Peak traced allocation during one stage execution."))
+        stages = self.by_stage()
+        for name, kind, field, help_text in metrics:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            for stage, stats in sorted(stages.items()):
+                category, _, function = stage.partition(':')
+                lines.append(f'{name}{{stage="{category}",function="{function}"}} {stats[field]}')
+        return '\n'.join(lines) + '\n'
+
+    def to_folded(self):
+        """Folded stacks (flamegraph.pl, speedscope, inferno): "a;b;c <власний час у мікросекундах>"."""
+        lines = []
+        for key, stats in sorted(self.snapshot().items()):
+            self_us = round((stats['seconds'] - stats['child_seconds']) * 1e6)
+            if self_us > 0:
+                lines.append(f"{key} {self_us}")
+        return '\n'.join(lines) + '\n'
+
+
+class NullStage:
+    """Контекст етапу, коли профілювання вимкнене: нічого не робить."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_STAGE = NullStage()
+profiler = None  # активний Profiler або None (профілювання вимкнене)
+_originals = []  # (об'єкт, атрибут, початкове значення) для uninstrument()
+
+
+class Stage:
+    def __init__(self, name, nbytes):
+        self.name, self.nbytes = name, nbytes
+
+    def __enter__(self):
+        profiler.enter(self.name)
+        return self
+
+    def __exit__(self, *exc):
+        profiler.exit(self.nbytes)
+        return False
+
+
+def stage(name, nbytes=0):
+    """Контекстний менеджер етапу; коли профілювання вимкнене - спільний порожній контекст."""
+    return NULL_STAGE if profiler is None else Stage(name, nbytes)
+
+
+def payload_bytes(args, result):
+    """Оцінка оброблених байтів: найбільший масив numpy серед аргументів та результату (або довжина bytes/str)."""
+    size = 0
+    for value in (*args, result):
+        if isinstance(value, np.ndarray):
+            size = max(size, value.nbytes)
+        elif isinstance(value, (bytes, bytearray, str)):
+            size = max(size, len(value))
+        elif isinstance(value, tuple) and value and isinstance(value[-1], np.ndarray):
+            size = max(size, value[-1].nbytes)  # cv2.imencode повертає (ok, buffer)
+    return size
+
+
+def profiled(name, func):
+    """Обгортка функції етапом name; без активного профайлера лише перевіряє глобальну змінну."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if profiler is None:
+            return func(*args, **kwargs)
+        profiler.enter(name)
+        nbytes = 0
+        try:
+            result = func(*args, **kwargs)
+            nbytes = payload_bytes(args, result)
+            return result
+        finally:
+            profiler.exit(nbytes)
+    wrapper.stage = name
+    return wrapper
+
+
+def patch(owner, attribute, name):
+    original = getattr(owner, attribute, None)
+    if original is None or hasattr(original, 'stage'):
+        return
+    _originals.append((owner, attribute, original))
+    setattr(owner, attribute, profiled(name, original))
+
+
+def instrument():
+    """Обгортає етапи: декодування/кодування (cv2, PIL), DCT, перетворення бітів та функції лабораторних."""
+    import cv2
+    from PIL import Image
+
+    from stego import codec, jpeg
+    from stego.labs import load_lab
+
+    for attribute, category in (('imread', 'decode'), ('imdecode', 'decode'), ('imwrite', 'encode'),
+                                ('imencode', 'encode'), ('dct', 'transform'), ('idct', 'transform')):
+        patch(cv2, attribute, f"{category}:cv2.{attribute}")
+    patch(Image, 'open', 'decode:PIL.Image.open')
+    patch(Image.Image, 'save', 'encode:PIL.Image.save')
+    for attribute in ('to_bits', 'pack', 'bits_to_bytes', 'bits_to_text', 'bits_to_string', 'string_to_bits'):
+        patch(codec, attribute, f"bits:codec.{attribute}")
+    for attribute, category in JPEG_METHODS.items():
+        patch(jpeg.JpegImage, attribute, f"{category}:jpeg.JpegImage.{attribute}")
+    for attribute, category in FUNCTION_STAGES.items():
+        if callable(getattr(jpeg, attribute, None)):
+            patch(jpeg, attribute, f"{category}:jpeg.{attribute}")
+    for lab, module_name in LAB_MODULES:
+        module = load_lab(lab, module_name)
+        for attribute, category in FUNCTION_STAGES.items():
+            if callable(getattr(module, attribute, None)):
+                patch(module, attribute, f"{category}:{lab}.{attribute}")
+
+
+def uninstrument():
+    """Повертає початкові функції."""
+    while _originals:
+        owner, attribute, original = _originals.pop()
+        setattr(owner, attribute, original)
+
+
+def enable(memory=True):
+    """Вмикає профілювання (та tracemalloc, якщо memory) і обгортає етапи; повертає Profiler."""
+    global profiler
+    if profiler is None:
+        profiler = Profiler(memory)
+        instrument()  # імпорт лабораторних - до tracemalloc, інакше він у рази повільніший
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+    return profiler
+
+
+def disable():
+    global profiler
+    uninstrument()
+    if profiler is not None and profiler.memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    profiler = None
+
+
+EXPORTS = {'folded': Profiler.to_folded, 'json': Profiler.to_json, 'prometheus': Profiler.to_prometheus}
+
+
+def dump(path, fmt='folded', source=None):
+    """Записує профіль у файл у форматі folded, json або prometheus."""
+    with open(path, 'w') as file:
+        file.write(EXPORTS[fmt](source or profiler))
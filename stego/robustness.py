@@ -0,0 +1,242 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+from stego import metrics
+from stego.cli import collect_images
+from stego.images import imread
+from stego.labs import load_lab
+
+DEFAULT_ATTACKS = ('none', 'jpeg:90', 'jpeg:75', 'jpeg:50', 'noise:2', 'noise:5', 'scale:0.5', 'crop:0.1')
+DEFAULT_PARAMS = {'lab4': (25, 50, 100, 200), 'lab5': (10, 50, 150), 'lab5-blind': (10, 50, 150)}  # P для lab4, strength для lab5
+PAYLOAD_BITS = 1024  # скільки бітів вбудовувати в lab4 (обрізається до ємності)
+SEED = 340698234968
+
+
+# Атаки виконуються в пам'яті й повертають зображення того самого розміру, що й вхідне
+
+def attack_none(image, value):
+    return image
+
+
+def attack_jpeg(image, quality):
+    """Стиснення JPEG із заданою якістю (cv2.imencode/imdecode, без файлів)."""
+    ok, buffer = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, int(quality)])
+    if not ok:
+        raise ValueError("Не вдалося закодувати JPEG.")
+    return cv2.imdecode(buffer, cv2.IMREAD_UNCHANGED)
+
+
+def attack_noise(image, sigma):
+    """Адитивний гаусів шум зі стандартним відхиленням sigma (детермінований seed)."""
+    noise = np.random.default_rng(SEED).normal(0, sigma, image.shape)
+    return np.clip(image + noise, 0, 255).astype(np.uint8)
+
+
+def attack_scale(image, factor):
+    """Масштабування в factor разів і назад до початкового розміру."""
+    height, width = image.shape[:2]
+    small = cv2.resize(image, (max(1, round(width * factor)), max(1, round(height * factor))), interpolation=cv2.INTER_AREA)
+    return cv2.resize(small, (width, height), interpolation=cv2.INTER_LINEAR)
+
+
+def attack_crop(image, fraction):
+    """Обрізання частки fraction справа та знизу; відрізана область заповнюється нулями (геометрія блоків зберігається)."""
+    height, width = image.shape[:2]
+    cropped = np.zeros_like(image)
+    keep_h, keep_w = round(height * (1 - fraction)), round(width * (1 - fraction))
+    cropped[:keep_h, :keep_w] = image[:keep_h, :keep_w]
+    return cropped
+
+
+ATTACKS = {
+    'none': attack_none,
+    'jpeg': attack_jpeg,
+    'noise': attack_noise,
+    'scale': attack_scale,
+    'crop': attack_crop,
+}
+
+
+def parse_attack(spec):
+    """'jpeg:75' -> ('jpeg', 75.0); 'none' -> ('none', None)."""
+    name, _, value = spec.partition(':')
+    if name not in ATTACKS:
+        raise ValueError(f"Невідома атака {name}, очікується одна з: {', '.join(ATTACKS)}.")
+    if name != 'none' and not value:
+        raise ValueError(f"Атака {name} потребує параметра, напр. {name}:{'75' if name == 'jpeg' else '0.5'}.")
+    return name, float(value) if value else None
+
+
+# Схеми: embed(cover, param) -> (stego, expected_bits); extract(attacked, reference, expected_bits) -> біти,
+# де reference - оригінал (lab4), кешовані коефіцієнти оригіналу (lab5) або лише strength (lab5-blind)
+
+def embed_lab4(cover, P):
+    script = load_lab('lab4')
+    bits = np.random.default_rng(SEED).integers(0, 2, min(PAYLOAD_BITS, cover.size // 64), dtype=np.uint8)
+    return script.embed_bits_batched(cover, bits, P), bits
+
+
+def extract_lab4(attacked, cover, expected):
+    return load_lab('lab4').extract_bits_range(attacked, 0, expected.size)
+
+
+def embed_lab5(cover, strength):
+    script = load_lab('lab5')
+    mask = np.random.default_rng(SEED).integers(0, 2, (cover.shape[0] // 8, cover.shape[1] // 8)).astype(bool)
+    return script.embed_watermark_mask(cover, mask, strength), mask.ravel().astype(np.uint8)
+
+
+def extract_lab5(attacked, container, expected):
+    return (container.extract(attacked, container.coeffs.shape) > 0).ravel().astype(np.uint8)
+
+
+def embed_lab5_blind(cover, strength):
+    script = load_lab('lab5')
+    mask = np.random.default_rng(SEED).integers(0, 2, (cover.shape[0] // 8, cover.shape[1] // 8)).astype(bool)
+    return script.embed_watermark_mask_blind(cover, mask, strength), mask.ravel().astype(np.uint8)
+
+
+def extract_lab5_blind(attacked, strength, expected):
+    shape = (attacked.shape[0] // 8, attacked.shape[1] // 8)
+    return (load_lab('lab5').extract_watermark_blind(attacked, shape, strength) > 0).ravel().astype(np.uint8)
+
+
+SCHEMES = {
+    'lab4': (embed_lab4, extract_lab4),
+    'lab5': (embed_lab5, extract_lab5),
+    'lab5-blind': (embed_lab5_blind, extract_lab5_blind),
+}
+
+
+def error_row(path, scheme, param, spec, error):
+    return {'input': path, 'scheme': scheme, 'param': param, 'attack': spec, 'ok': False, 'error': error}
+
+
+def evaluate(path, scheme, param, attacks):
+    """Вбудовує один раз для (зображення, схема, параметр) і перевіряє всі атаки; повертає рядки результатів.
+
+    Помилка вбудовування (напр. замала ємність) чи окремої атаки стає рядком з 'ok': False,
+    а не перериває всю сітку.
+    """
+    start = time.perf_counter()
+    image = imread(path, cv2.IMREAD_GRAYSCALE)
+    if image is None:
+        return [error_row(path, scheme, param, spec, f"Не вдалося прочитати {path}.") for spec in attacks]
+    height, width = image.shape
+    cover = image[:height - height % 8, :width - width % 8]  # DCT-схеми працюють із цілими блоками 8x8
+    embed, extract = SCHEMES[scheme]
+    try:
+        if not cover.size:
+            raise ValueError(f"Зображення {width}x{height} менше за один блок 8x8.")
+        stego, expected = embed(cover, param)
+        if scheme == 'lab5':
+            reference = load_lab('lab5').ContainerDCT(cover)
+        elif scheme == 'lab5-blind':
+            reference = param  # сліпому витягуванню потрібна лише сила вбудовування
+        else:
+            reference = cover
+        psnr = metrics.psnr(cover, stego)
+    except Exception as e:
+        return [error_row(path, scheme, param, spec, f"{type(e).__name__}: {e}") for spec in attacks]
+    embed_seconds = time.perf_counter() - start
+    rows = []
+    for spec in attacks:
+        attack_start = time.perf_counter()
+        name, value = parse_attack(spec)
+        try:
+            extracted = extract(ATTACKS[name](stego, value), reference, expected)
+            ber = metrics.bit_error_rate(expected, extracted)
+        except Exception as e:
+            rows.append(error_row(path, scheme, param, spec, f"{type(e).__name__}: {e}"))
+            continue
+        seconds = time.perf_counter() - attack_start + embed_seconds / len(attacks)
+        rows.append({
+            'input': path, 'scheme': scheme, 'param': param, 'attack': spec, 'ok': True,
+            'bits': int(expected.size), 'ber': ber, 'psnr': psnr,
+            'megapixels': cover.size / 1e6, 'seconds': seconds,
+        })
+    return rows
+
+
+def evaluate_job(job):
+    return evaluate(*job)
+
+
+def run_grid(paths, scheme, params, attacks, workers=None):
+    """Перебирає сітку (зображення x параметр) у пулі процесів; кожна задача перевіряє всі атаки."""
+    for spec in attacks:
+        parse_attack(spec)  # помилка в назві атаки - до запуску пулу
+    jobs = [(path, scheme, param, tuple(attacks)) for path in paths for param in params]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for rows in executor.map(evaluate_job, jobs):
+            yield from rows
+
+
+def summarize(rows):
+    """Середні BER та PSNR для кожної пари (параметр, атака) по всіх зображеннях."""
+    groups = {}
+    for row in rows:
+        if row['ok']:
+            groups.setdefault((row['param'], row['attack']), []).append(row)
+    return [{
+        'param': param, 'attack': attack, 'images': len(group),
+        'ber': float(np.mean([row['ber'] for row in group])),
+        'psnr': float(np.mean([row['psnr'] for row in group])),
+    } for (param, attack), group in groups.items()]
+
+
+def format_table(summary, attacks):
+    """Таблиця: рядки - параметри, стовпці - атаки, значення - середній BER; останній стовпець - PSNR."""
+    params = sorted({row['param'] for row in summary})
+    cells = {(row['param'], row['attack']): row for row in summary}
+    width = max(9, *(len(spec) + 1 for spec in attacks))
+    lines = [f"{'param':>8}" + ''.join(f"{spec:>{width}}" for spec in attacks) + f"{'PSNR dB':>10}"]
+    for param in params:
+        bers = ''.join(f"{cells[param, spec]['ber']:>{width}.4f}" if (param, spec) in cells else f"{'-':>{width}}" for spec in attacks)
+        psnr = next((cells[param, spec]['psnr'] for spec in attacks if (param, spec) in cells), float('nan'))
+        lines.append(f"{param:>8g}" + bers + f"{psnr:>10.2f}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m stego.robustness', description="Оцінка стійкості DCT-схем lab4/lab5 до атак.")
+    parser.add_argument('sources', nargs='+', help="файли, директорії або glob-шаблони")
+    parser.add_argument('--scheme', choices=sorted(SCHEMES), default='lab4')
+    parser.add_argument('--params', type=float, nargs='+', help="значення P (lab4) або strength (lab5, lab5-blind)")
+    parser.add_argument('--attacks', nargs='+', default=DEFAULT_ATTACKS, help="напр. none jpeg:75 noise:2 scale:0.5 crop:0.1")
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count(), help="кількість процесів")
+    parser.add_argument('--json', action='store_true', help="виводити кожен результат як рядок JSON замість таблиці")
+    args = parser.parse_args(argv)
+
+    params = args.params or DEFAULT_PARAMS[args.scheme]
+    try:
+        for spec in args.attacks:
+            parse_attack(spec)
+    except ValueError as e:
+        parser.error(str(e))
+    start = time.perf_counter()
+    rows = []
+    for row in run_grid(collect_images(args.sources), args.scheme, params, args.attacks, args.workers):
+        rows.append(row)
+        if args.json:
+            print(json.dumps(row, ensure_ascii=False), flush=True)
+    elapsed = time.perf_counter() - start
+    failed = [row for row in rows if not row['ok']]
+    for row in failed:
+        print(f"{row['input']}: {row['error']}", file=sys.stderr)
+    if not args.json:
+        print(format_table(summarize(rows), args.attacks))
+    megapixels = sum(row['megapixels'] for row in rows if row['ok'])
+    print(f"{len(rows)} configurations in {elapsed:.2f}s ({len(rows) / elapsed:.1f}/s, {megapixels / elapsed:.1f} MP/s)", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
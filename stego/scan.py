@@ -0,0 +1,225 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import cv2
+import numpy as np
+from scipy.stats import chi2
+
+from stego.cli import collect_images
+
+BANDS = 16  # на скільки горизонтальних смуг ділимо канал (локальне вбудовування видно в окремих смугах)
+MIN_EXPECTED = 5  # мінімальна очікувана частота пари значень для критерію хі-квадрат
+CHANNEL_NAMES = {1: ('gray',), 3: ('blue', 'green', 'red'), 4: ('blue', 'green', 'red', 'alpha')}
+
+RS_FIELD_BITS = 4  # ширина поля однієї RS-статистики в упакованому uint16
+RS_CENTER = 6  # сума трьох доданків зі зсувом +2: більше - група стала менш гладкою, менше - гладкішою
+
+
+def band_edges(height, bands=BANDS):
+    """Межі горизонтальних смуг (у рядках)."""
+    return np.unique(np.linspace(0, height, min(bands, height) + 1).astype(int))
+
+
+def chi_square(channel, bands=BANDS):
+    """Атака хі-квадрат Вестфельда-Пфітцманна.
+
+    Повертає найбільшу ймовірність вбудовування серед префіксів каналу (перші 1/bands, 2/bands, ... рядків),
+    тож послідовне вбудовування на початку зображення теж виявляється.
+    """
+    edges = band_edges(channel.shape[0], bands)
+    # cv2.calcHist рахує гістограму uint8 без перетворення в intp, як np.bincount
+    histograms = np.cumsum([cv2.calcHist([channel[start:stop]], [0], None, [256], [0, 256]).ravel()
+                            for start, stop in zip(edges[:-1], edges[1:])], axis=0)
+    pairs = histograms.reshape(-1, 128, 2).astype(np.float64)
+    expected = pairs.mean(axis=2)
+    valid = expected >= MIN_EXPECTED
+    statistic = np.where(valid, (pairs[:, :, 0] - expected) ** 2 / np.where(valid, expected, 1), 0).sum(axis=1)
+    dof = valid.sum(axis=1) - 1
+    probability = np.where(dof > 0, chi2.sf(statistic, np.maximum(dof, 1)), 0.0)
+    return float(probability.max())
+
+
+def flip_positive(values):
+    return values ^ 1
+
+
+def flip_negative(values):
+    return ((values + 1) ^ 1) - 1
+
+
+def rs_terms():
+    """Таблиці зміни гладкості групи (a, b, c, d) під маскою [0, 1, 1, 0] для пар (a, b), (b, c), (c, d).
+
+    Гладкість - сума |b - a| + |c - b| + |d - c|, тож її зміна розкладається на три доданки, кожен із
+    яких залежить лише від пари сусідніх пікселів. Кожен елемент uint16 упаковує чотири поля по
+    RS_FIELD_BITS бітів (доданок + 2): маски M та -M для вихідного та інвертованого (x ^ 1) зображення.
+    Індекс пари (x, y) - x | y << 8, тобто два сусідні байти каналу, прочитані як little-endian uint16.
+    """
+    v, u = (grid.astype(np.int16) for grid in np.meshgrid(np.arange(256), np.arange(256), indexing='ij'))
+    tables = [np.zeros((256, 256), dtype=np.uint16) for _ in range(3)]
+    for field, (flip, invert) in enumerate(((flip_positive, 0), (flip_negative, 0), (flip_positive, 1), (flip_negative, 1))):
+        left, right = u ^ invert, v ^ invert
+        base = np.abs(right - left)
+        changes = (np.abs(flip(right) - left), np.abs(flip(right) - flip(left)), np.abs(right - flip(left)))
+        for table, changed in zip(tables, changes):
+            table |= (changed - base + 2).astype(np.uint16) << (RS_FIELD_BITS * field)
+    return [table.ravel() for table in tables]
+
+
+RS_TERMS = rs_terms()
+
+
+def solve_rs(d0, dn0, d1, dn1):
+    """Оцінка частки заміненого LSB за RS-статистиками вихідного (d0, dn0) та інвертованого (d1, dn1) зображення."""
+    a, b, c = 2 * (d1 + d0), dn0 - dn1 - d1 - 3 * d0, d0 - dn0
+    discriminant = b * b - 4 * a * c
+    if a == 0 or discriminant < 0:
+        return 0.0
+    roots = ((-b + np.sqrt(discriminant)) / (2 * a), (-b - np.sqrt(discriminant)) / (2 * a))
+    z = min(roots, key=abs)
+    return float(np.clip(z / (z - 0.5), 0, 1))
+
+
+def rs_estimates(channel, edges):
+    """RS-аналіз Фрідріх для кожної смуги: оцінка частки пікселів із заміненим LSB (0..1).
+
+    Замість перевертання пікселів для кожної маски - три пошуки в таблицях RS_TERMS на групу.
+    Смуги обробляються по черзі, щоб проміжні масиви вміщувалися в кеш.
+    """
+    width = channel.shape[1] // 4 * 4
+    if not width:
+        return np.zeros(len(edges) - 1)
+    channel = np.ascontiguousarray(channel)
+    pairs = channel[:, :width].view('<u2')  # (a, b), (c, d), (a, b), ...
+    middle = channel[:, 1:width - 1].view('<u2')[:, ::2]  # (b, c)
+    estimates = []
+    for start, stop in zip(edges[:-1], edges[1:]):
+        packed = RS_TERMS[0][pairs[start:stop, 0::2]]
+        packed += RS_TERMS[1][middle[start:stop]]
+        packed += RS_TERMS[2][pairs[start:stop, 1::2]]
+        counts = []
+        for field in range(4):
+            values = (packed >> (RS_FIELD_BITS * field)) & 15
+            counts.append((np.count_nonzero(values > RS_CENTER) - np.count_nonzero(values < RS_CENTER)) / packed.size)
+        estimates.append(solve_rs(*counts))
+    return np.array(estimates)
+
+
+def solve_spa(x, y, close, total):
+    """Оцінка частки заміненого LSB (SPA, Думітреску) за кількостями пар X, Y, пар з u >> 1 == v >> 1 та всіх пар."""
+    a, b, c = 0.5 * close, 2 * x - total, y - x
+    if a == 0:
+        return 0.0
+    discriminant = b * b - 4 * a * c
+    # Поблизу повного вбудовування дискримінант може бути від'ємним; тоді беремо вершину параболи
+    estimate = -b / (2 * a) if discriminant < 0 else (-b - np.sqrt(discriminant)) / (2 * a)
+    return float(np.clip(estimate, 0, 1))
+
+
+def spa_estimates(channel, edges):
+    """Аналіз пар сусідніх пікселів (SPA) для кожної смуги через підрахунок булевих масок.
+
+    X - пари з парним v та u < v або непарним v та u > v, Y - навпаки; обидві множини виражаються
+    через кількості пар u < v, u == v та непарних v, тож гістограма пар (u, v) не потрібна.
+    """
+    if channel.shape[1] < 2:
+        return np.zeros(len(edges) - 1)
+    estimates = []
+    for start, stop in zip(edges[:-1], edges[1:]):
+        u, v = channel[start:stop, :-1], channel[start:stop, 1:]
+        less, equal, odd = u < v, u == v, (v & 1).view(bool)
+        less_count, less_odd, odd_count, equal_count, equal_odd, close = (
+            np.count_nonzero(mask) for mask in (less, less & odd, odd, equal, equal & odd, (u ^ v) < 2))
+        total = u.size
+        greater_odd = odd_count - less_odd - equal_odd
+        greater = total - less_count - equal_count
+        x = less_count - less_odd + greater_odd
+        y = greater - greater_odd + less_odd
+        estimates.append(solve_spa(x, y, close, total))
+    return np.array(estimates)
+
+
+def analyse_image(image, stride=1, bands=BANDS):
+    """Статистики для кожного каналу; stride > 1 аналізує лише кожен stride-й рядок (швидше, грубіше).
+
+    rs та spa - найбільша по смугах оцінка частки заміненого LSB; score - максимум rs та spa по каналах.
+    chi_square - найбільша ймовірність вбудовування за хі-квадрат по префіксах (довідково: на зображеннях
+    із гладкою гістограмою він дає хибні спрацювання, тому в score не входить).
+    """
+    if image.dtype != np.uint8:
+        raise ValueError(f"Підтримуються лише 8-бітні зображення, отримано {image.dtype}.")
+    if image.ndim == 2:
+        image = image[:, :, np.newaxis]
+    image = image[::stride]
+    edges = band_edges(image.shape[0], bands)
+    channels = []
+    for index, name in enumerate(CHANNEL_NAMES.get(image.shape[2], range(image.shape[2]))):
+        channel = np.ascontiguousarray(image[:, :, index])
+        stats = {
+            'channel': name,
+            'chi_square': chi_square(channel, bands),
+            'rs': float(rs_estimates(channel, edges).max()),
+            'spa': float(spa_estimates(channel, edges).max()),
+        }
+        stats['score'] = max(stats['rs'], stats['spa'])
+        channels.append(stats)
+    return {'score': max(stats['score'] for stats in channels), 'channels': channels}
+
+
+def scan_file(path, stride=1):
+    """Аналізує один файл; помилки повертаються в результаті, а не піднімаються."""
+    start = time.perf_counter()
+    result = {'input': path}
+    try:
+        image = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+        if image is None:
+            raise ValueError(f"Не вдалося прочитати {path}.")
+        decoded = time.perf_counter()
+        result.update(analyse_image(image, stride))
+        analysed = time.perf_counter()
+        result.update(ok=True, megapixels=image.shape[0] * image.shape[1] / 1e6,
+                      decode_seconds=round(decoded - start, 6), analyse_seconds=round(analysed - decoded, 6))
+    except Exception as e:
+        result.update(ok=False, score=None, error=f"{type(e).__name__}: {e}")
+    return result
+
+
+def scan(paths, stride=1, workers=None):
+    """Аналізує файли в пулі процесів і повертає результати в міру завершення."""
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(scan_file, path, stride) for path in paths]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m stego.scan', description="Пошук LSB-вбудовувань у великих наборах зображень.")
+    parser.add_argument('sources', nargs='+', help="файли, директорії або glob-шаблони")
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count(), help="кількість процесів")
+    parser.add_argument('--stride', type=int, default=1, help="аналізувати кожен N-й рядок")
+    parser.add_argument('--rank', action='store_true', help="вивести результати наприкінці, впорядковані за підозрілістю")
+    parser.add_argument('--top', type=int, help="разом із --rank: лише N найпідозріліших файлів")
+    parser.add_argument('--threshold', type=float, default=0.0, help="не виводити файли з оцінкою нижче порогу")
+    args = parser.parse_args(argv)
+
+    results = []
+    for result in scan(collect_images(args.sources), args.stride, args.workers):
+        if result['ok'] and result['score'] < args.threshold:
+            continue
+        if args.rank:
+            results.append(result)
+        else:
+            print(json.dumps(result), flush=True)
+    if args.rank:
+        results.sort(key=lambda item: -1 if item['score'] is None else item['score'], reverse=True)
+        for result in results[:args.top]:
+            print(json.dumps(result))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
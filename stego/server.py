@@ -0,0 +1,269 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from urllib.parse import parse_qs, urlsplit
+
+import cv2
+import numpy as np
+
+from stego import codec
+from stego.labs import load_lab
+from stego.pipeline import EMBEDDERS, to_grayscale  # імпортується й у кожному процесі пулу разом із задачами
+
+QUEUE_SIZE = 32  # скільки запитів може чекати на вільний процес, понад це - 429
+MAX_BODY = 64 * 1024 * 1024  # найбільше тіло запиту (байтів)
+LATENCY_WINDOW = 4096  # скільки останніх затримок тримати для перцентилів
+STATUS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 413: 'Payload Too Large',
+          429: 'Too Many Requests', 500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+
+class RequestError(Exception):
+    """Помилка запиту з HTTP-статусом."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def warm_up():
+    """Ініціалізатор процесів пулу: імпорт лабораторних один раз на процес."""
+    for lab in ('lab2', 'lab4', 'lab5'):
+        load_lab(lab)
+    load_lab('lab1', 'encoder')
+
+
+def ping(_):
+    return os.getpid()
+
+
+def decode_image(data, mode=cv2.IMREAD_COLOR):
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), mode)
+    if image is None:
+        raise ValueError("Не вдалося декодувати зображення.")
+    return image
+
+
+def encode_png(image):
+    ok, buffer = cv2.imencode('.png', image)
+    if not ok:
+        raise ValueError("Не вдалося закодувати PNG.")
+    return buffer.tobytes()
+
+
+# Задачі, що виконуються в процесах пулу: байти зображення -> (тип вмісту, байти відповіді)
+
+def embed_task(data, lab, message, options):
+    """Вбудовує повідомлення із заголовком codec.pack (lab1-lab4) або водяний знак у QIM-варіанті lab5."""
+    if lab == 5:
+        watermark = decode_image(message, cv2.IMREAD_GRAYSCALE)
+        container = decode_image(data, cv2.IMREAD_GRAYSCALE)
+        return 'image/png', encode_png(load_lab('lab5').embed_watermark_blind(container, watermark, options.get('strength', 10)))
+    embed, _, gray = EMBEDDERS[lab]
+    image = decode_image(data)
+    image = to_grayscale(image) if gray else image
+    if gray and (image.shape[0] % 8 or image.shape[1] % 8):
+        raise ValueError(f"Розміри {image.shape[1]}x{image.shape[0]} мають бути кратні 8.")
+    return 'image/png', encode_png(embed(image, codec.pack(message), options))
+
+
+def extract_task(data, lab, options):
+    """Витягує повідомлення за заголовком (lab1-lab4) або сліпо - маску водяного знака (lab5, PNG)."""
+    if lab == 5:
+        image = decode_image(data, cv2.IMREAD_GRAYSCALE)
+        wm_shape = (image.shape[0] // 8, image.shape[1] // 8)
+        return 'image/png', encode_png(load_lab('lab5').extract_watermark_blind(image, wm_shape, options.get('strength', 10)))
+    _, reader, gray = EMBEDDERS[lab]
+    image = decode_image(data, cv2.IMREAD_GRAYSCALE if gray else cv2.IMREAD_COLOR)
+    payload = codec.unpack(*reader(image, options))
+    message = None if payload is None else payload.decode(codec.ENCODING, 'replace')
+    return 'application/json', json.dumps({'message': message}, ensure_ascii=False).encode()
+
+
+def parse_options(query):
+    """Параметри алгоритмів із рядка запиту: seed, P, strength, workers."""
+    options = {}
+    for name, kind in (('seed', int), ('P', float), ('strength', float)):
+        if name in query:
+            try:
+                options[name] = kind(query[name][0])
+            except ValueError:
+                raise RequestError(400, f"Некоректне значення {name}: {query[name][0]}.")
+    return options
+
+
+def parse_lab(query):
+    try:
+        lab = int(query.get('lab', ['1'])[0])
+    except ValueError:
+        lab = 0
+    if lab not in (1, 2, 3, 4, 5):
+        raise RequestError(400, "Параметр lab має бути від 1 до 5.")
+    return lab
+
+
+class Service:
+    """HTTP-сервіс вбудовування/витягування поверх asyncio та прогрітого пулу процесів.
+
+    Одночасно виконується не більше workers задач, ще queue_size чекають; решта запитів
+    одразу отримує 429 з Retry-After, а не накопичується в пам'яті.
+    """
+
+    def __init__(self, workers=None, queue_size=QUEUE_SIZE, watermark=None):
+        self.workers = workers or os.cpu_count()
+        self.watermark = watermark  # байти водяного знака lab5, задані при запуску (--watermark)
+        self.capacity = self.workers + queue_size
+        self.executor = None
+        self.in_flight = 0
+        self.counts = {'requests': 0, 'ok': 0, 'rejected': 0, 'errors': 0, 'restarts': 0}
+        self.latencies = []
+
+    def start_pool(self):
+        """Створює пул і дочікується запуску всіх процесів (імпорти виконуються до першого запиту)."""
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=warm_up)
+        list(self.executor.map(ping, range(self.workers)))
+
+    def restart_pool(self, broken):
+        """Замінює пул, у якому загинув процес (BrokenProcessPool), новим; повторні виклики для того самого пулу ігноруються."""
+        if self.executor is not broken:
+            return
+        broken.shutdown(wait=False, cancel_futures=True)
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=warm_up)
+        self.counts['restarts'] += 1
+
+    def stats(self):
+        latencies = np.array(self.latencies[-LATENCY_WINDOW:]) * 1000
+        percentiles = {f"p{q}_ms": float(np.percentile(latencies, q)) if latencies.size else None for q in (50, 90, 99)}
+        return {**self.counts, 'in_flight': self.in_flight, 'workers': self.workers, 'capacity': self.capacity, **percentiles}
+
+    async def run(self, func, *args):
+        """Виконує func у пулі або відмовляє з 429, якщо черга заповнена."""
+        if self.in_flight >= self.capacity:
+            raise RequestError(429, "Сервер перевантажений, повторіть запит пізніше.")
+        self.in_flight += 1
+        executor = self.executor
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+        except ValueError as e:
+            raise RequestError(400, str(e))
+        except BrokenProcessPool:
+            self.restart_pool(executor)
+            raise RequestError(503, "Процес пулу завершився аварійно; пул перезапущено, повторіть запит.")
+        finally:
+            self.in_flight -= 1
+
+    async def dispatch(self, method, target, body):
+        url = urlsplit(target)
+        query = parse_qs(url.query)
+        if method == 'GET' and url.path == '/health':
+            return 'application/json', b'{"ok": true}'
+        if method == 'GET' and url.path == '/stats':
+            return 'application/json', json.dumps(self.stats()).encode()
+        if method == 'POST' and url.path == '/embed':
+            lab = parse_lab(query)
+            if lab == 5:
+                # Тіло: контейнер; водяний знак задається лише при запуску сервера, а не шляхом із запиту
+                if self.watermark is None:
+                    raise RequestError(400, "Для lab=5 сервер має бути запущений з --watermark.")
+                message = self.watermark
+            elif 'message' in query:
+                message = query['message'][0]
+            else:
+                raise RequestError(400, "Потрібен параметр message.")
+            return await self.run(embed_task, body, lab, message, parse_options(query))
+        if method == 'POST' and url.path == '/extract':
+            return await self.run(extract_task, body, parse_lab(query), parse_options(query))
+        raise RequestError(404, f"Невідомий шлях {method} {url.path}.")
+
+    async def handle(self, reader, writer):
+        start = time.perf_counter()
+        status, content_type, payload = 200, 'application/json', b''
+        try:
+            request_line = await reader.readline()
+            if not request_line:
+                writer.close()
+                return
+            self.counts['requests'] += 1
+            try:
+                method, target, _ = request_line.decode('latin-1').split(' ', 2)
+            except ValueError:
+                raise RequestError(400, "Некоректний рядок запиту.")
+            headers = {}
+            while (line := await reader.readline()) not in (b'\r\n', b'\n', b''):
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+            try:
+                length = int(headers.get('content-length', 0))
+            except ValueError:
+                raise RequestError(400, "Некоректний заголовок Content-Length.")
+            if length < 0:
+                raise RequestError(400, "Некоректний заголовок Content-Length.")
+            if length > MAX_BODY:
+                raise RequestError(413, f"Тіло запиту більше за {MAX_BODY} байтів.")
+            body = await reader.readexactly(length)
+            content_type, payload = await self.dispatch(method, target, body)
+            self.counts['ok'] += 1
+        except RequestError as e:
+            status, payload = e.status, json.dumps({'error': str(e)}, ensure_ascii=False).encode()
+            self.counts['rejected' if e.status == 429 else 'errors'] += 1
+        except Exception as e:
+            status, payload = 500, json.dumps({'error': f"{type(e).__name__}: {e}"}, ensure_ascii=False).encode()
+            self.counts['errors'] += 1
+        latency = time.perf_counter() - start
+        if status == 200:
+            self.latencies.append(latency)
+            del self.latencies[:-LATENCY_WINDOW]
+        head = [f"HTTP/1.1 {status} {STATUS[status]}", f"Content-Type: {content_type if status == 200 else 'application/json'}",
+                f"Content-Length: {len(payload)}", f"X-Latency-Ms: {latency * 1000:.3f}", "Connection: close"]
+        if status in (429, 503):
+            head.append("Retry-After: 1")
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + payload)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+
+async def serve(service, host='127.0.0.1', port=8765, unix=None):
+    if unix:
+        server = await asyncio.start_unix_server(service.handle, unix)
+        address = unix
+    else:
+        server = await asyncio.start_server(service.handle, host, port)
+        address = f"http://{host}:{port}"
+    print(f"Listening on {address} ({service.workers} workers, capacity {service.capacity})", file=sys.stderr, flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m stego.server', description="HTTP-сервіс вбудовування/витягування (lab1-lab5).")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help="слухати Unix-сокет замість TCP")
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count(), help="кількість процесів")
+    parser.add_argument('--queue', type=int, default=QUEUE_SIZE, help="скільки запитів може чекати понад зайняті процеси")
+    parser.add_argument('--watermark', help="зображення водяного знака для POST /embed?lab=5")
+    args = parser.parse_args(argv)
+
+    watermark = None
+    if args.watermark:
+        with open(args.watermark, 'rb') as file:
+            watermark = file.read()
+    service = Service(args.workers, args.queue, watermark)
+    service.start_pool()
+    try:
+        asyncio.run(serve(service, args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.executor.shutdown(cancel_futures=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
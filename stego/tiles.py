@@ -0,0 +1,221 @@
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+from stego.labs import load_lab
+
+DEFAULT_BAND_ROWS = 256  # рядків у смузі; кратне 8, щоб DCT-блоки не розривались між смугами
+
+
+def read_npy_header(file):
+    """Читає заголовок NPY та повертає (shape, dtype, зміщення даних)."""
+    version = np.lib.format.read_magic(file)
+    if version == (1, 0):
+        shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(file)
+    else:
+        shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(file)
+    if fortran_order:
+        raise ValueError("Порядок Fortran не підтримується для потокового читання.")
+    return shape, dtype, file.tell()
+
+
+def write_npy_header(file, shape, dtype):
+    """Пише заголовок NPY та повертає зміщення даних."""
+    header = {'descr': np.lib.format.dtype_to_descr(dtype), 'fortran_order': False, 'shape': tuple(shape)}
+    np.lib.format.write_array_header_2_0(file, header)
+    return file.tell()
+
+
+class RasterFile:
+    """Растр у файлі NPY або raw, який читається та пишеться смугами рядків.
+
+    У пам'яті одночасно перебуває лише одна смуга, тож пікове споживання не залежить від розміру зображення.
+    Для raw-файлів shape та dtype задаються явно; NPY описує себе заголовком.
+    """
+
+    def __init__(self, path, mode='r', shape=None, dtype=np.uint8):
+        self.path = path
+        is_npy = path.lower().endswith('.npy')
+        if mode == 'w':
+            self.shape, self.dtype = tuple(shape), np.dtype(dtype)
+            self.file = open(path, 'w+b')
+            self.offset = write_npy_header(self.file, self.shape, self.dtype) if is_npy else 0
+            self.file.truncate(self.offset + int(np.prod(self.shape)) * self.dtype.itemsize)
+        elif mode in ('r', 'r+'):
+            self.file = open(path, 'rb' if mode == 'r' else 'r+b')
+            if is_npy:
+                self.shape, self.dtype, self.offset = read_npy_header(self.file)
+            elif shape is None:
+                raise ValueError(f"Для raw-файлу {path} потрібно вказати shape.")
+            else:
+                self.shape, self.dtype, self.offset = tuple(shape), np.dtype(dtype), 0
+        else:
+            raise ValueError(f"Невідомий режим {mode}.")
+        self.row_bytes = int(np.prod(self.shape[1:])) * self.dtype.itemsize
+
+    def read_rows(self, start, stop):
+        """Читає рядки [start, stop) у новий масив."""
+        stop = min(stop, self.shape[0])
+        band = np.empty((stop - start,) + self.shape[1:], dtype=self.dtype)
+        self.file.seek(self.offset + start * self.row_bytes)
+        if self.file.readinto(band.data.cast('B')) != band.nbytes:
+            raise EOFError(f"Файл {self.path} коротший за очікуваний розмір {self.shape}.")
+        return band
+
+    def write_rows(self, start, band):
+        """Записує смугу, починаючи з рядка start."""
+        band = np.ascontiguousarray(band, dtype=self.dtype)
+        self.file.seek(self.offset + start * self.row_bytes)
+        self.file.write(band.data.cast('B'))
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def iter_bands(height, band_rows=DEFAULT_BAND_ROWS):
+    """Генерує межі смуг (start, stop), що покривають height рядків."""
+    for start in range(0, height, band_rows):
+        yield start, min(start + band_rows, height)
+
+
+def stream_bands(source, destination, func, band_rows=DEFAULT_BAND_ROWS):
+    """Застосовує func(band, start) до кожної смуги source та пише результат у destination."""
+    for start, stop in iter_bands(source.shape[0], band_rows):
+        destination.write_rows(start, func(source.read_rows(start, stop), start))
+
+
+def embed_sequential_stream(source_path, output_path, message, band_rows=DEFAULT_BAND_ROWS):
+    """Послідовне LSB-вбудовування lab1 (синій канал BGR) смугами, з обмеженою пам'яттю."""
+    bits = load_lab('lab1', 'utils').text_to_bits(message)
+    with RasterFile(source_path) as source, RasterFile(output_path, 'w', source.shape, source.dtype) as output:
+        width, channels = source.shape[1], source.shape[2]
+
+        def embed_band(band, start):
+            chunk = bits[start * width:(start + band.shape[0]) * width]
+            blue = band.reshape(-1, channels)[:, 0]
+            blue[:chunk.size] = (blue[:chunk.size] & 254) | chunk
+            return band
+
+        stream_bands(source, output, embed_band, band_rows)
+
+
+def extract_sequential_stream(stego_path, length, band_rows=DEFAULT_BAND_ROWS):
+    """Витягує length символів, вбудованих embed_sequential_stream, читаючи лише потрібні смуги."""
+    utils = load_lab('lab1', 'utils')
+    with RasterFile(stego_path) as stego:
+        width, channels = stego.shape[1], stego.shape[2]
+        needed_rows = min(-(-length * 8 // width), stego.shape[0])
+        chunks = [stego.read_rows(start, stop).reshape(-1, channels)[:, 0] & 1
+                  for start, stop in iter_bands(needed_rows, band_rows)]
+    bits = np.concatenate(chunks) if chunks else np.empty(0, dtype=np.uint8)
+    return utils.bits_to_text(bits[:length * 8])
+
+
+def embed_koch_zhao_stream(source_path, output_path, bits, P=100, band_rows=DEFAULT_BAND_ROWS):
+    """Вбудовування Коха-Жао (lab4) у півтонове зображення смугами."""
+    if band_rows % 8:
+        raise ValueError("Висота смуги має бути кратною 8.")
+    script = load_lab('lab4')
+    bits = script.bits_to_array(bits)
+    with RasterFile(source_path) as source, RasterFile(output_path, 'w', source.shape, source.dtype) as output:
+        height, width = source.shape
+        if height % 8 or width % 8:
+            raise ValueError(f"Image dimensions {width}x{height} must be divisible by 8.")
+        if len(bits) > height * width // 64:
+            raise ValueError("Message is too long for the image capacity.")
+        blocks_per_row = width // 8
+
+        def embed_band(band, start):
+            chunk = bits[start // 8 * blocks_per_row:(start + band.shape[0]) // 8 * blocks_per_row]
+            return script.embed_bits_batched(band, chunk, P) if chunk.size else band
+
+        stream_bands(source, output, embed_band, band_rows)
+
+
+def extract_koch_zhao_stream(stego_path, bit_length, band_rows=DEFAULT_BAND_ROWS):
+    """Витягує bit_length бітів Коха-Жао, читаючи лише смуги з корисним навантаженням."""
+    if band_rows % 8:
+        raise ValueError("Висота смуги має бути кратною 8.")
+    script = load_lab('lab4')
+    with RasterFile(stego_path) as stego:
+        blocks_per_row = stego.shape[1] // 8
+        needed_rows = min(-(-bit_length // blocks_per_row) * 8, stego.shape[0])
+        bits = ''
+        for start, stop in iter_bands(needed_rows, band_rows):
+            band_bits = (stop - start) // 8 * blocks_per_row
+            bits += script.extract_bits_batched(stego.read_rows(start, stop), min(band_bits, bit_length - len(bits)))
+    return bits
+
+
+def embed_watermark_stream(source_path, output_path, watermark_img, strength=10, band_rows=DEFAULT_BAND_ROWS):
+    """Вбудовування водяного знака Хсу-Ву (lab5) смугами; маска знака мала (H/8 x W/8) і тримається цілком."""
+    if band_rows % 8:
+        raise ValueError("Висота смуги має бути кратною 8.")
+    script = load_lab('lab5')
+    with RasterFile(source_path) as source, RasterFile(output_path, 'w', source.shape, source.dtype) as output:
+        watermark_bin = script.watermark_mask(watermark_img, source.shape)
+
+        def embed_band(band, start):
+            mask = watermark_bin[start // 8:start // 8 + band.shape[0] // 8]
+            return script.embed_watermark_mask(band, mask, strength)
+
+        stream_bands(source, output, embed_band, band_rows)
+
+
+def write_synthetic(path, shape, band_rows=DEFAULT_BAND_ROWS, seed=0):
+    """Створює випадкове зображення заданої форми, генеруючи його смугами."""
+    rng = np.random.default_rng(seed)
+    with RasterFile(path, 'w', shape) as output:
+        for start, stop in iter_bands(shape[0], band_rows):
+            output.write_rows(start, rng.integers(0, 256, (stop - start,) + tuple(shape[1:]), dtype=np.uint8))
+
+
+def measure(mode, path, output_path):
+    """Виконує одне вбудовування та повертає пікове RSS процесу в МБ."""
+    if mode == 'lsb':
+        embed_sequential_stream(path, output_path, 'x' * 4096)
+    elif mode == 'koch':
+        embed_koch_zhao_stream(path, output_path, '01' * 4096)
+    elif mode == 'watermark':
+        embed_watermark_stream(path, output_path, np.eye(64, dtype=np.uint8) * 255)
+    elif mode == 'in-memory':
+        image = np.load(path)
+        np.save(output_path, load_lab('lab1', 'encoder').embed_sequential_fast(image, 'x' * 4096))
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def memory_report(sizes, modes=('lsb', 'koch', 'watermark', 'in-memory')):
+    """Друкує пікове RSS для кожного розміру; кожен замір виконується в окремому процесі."""
+    print(f"{'size':>12} " + ' '.join(f"{mode:>12}" for mode in modes) + "   (peak RSS, MB)")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            row = []
+            for mode in modes:
+                shape = (size, size) if mode in ('koch', 'watermark') else (size, size, 3)
+                source = os.path.join(tmp, f"{mode}_{size}.npy")
+                write_synthetic(source, shape)
+                result = subprocess.run(
+                    [sys.executable, '-m', 'stego.tiles', '--measure', mode, source, os.path.join(tmp, 'out.npy')],
+                    capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.dirname(__file__)),
+                )
+                row.append(float(result.stdout))
+                os.remove(source)
+            print(f"{size:>5}x{size:<6} " + ' '.join(f"{value:12.1f}" for value in row))
+
+
+# Основне виконання: python -m stego.tiles [сторона ...]
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == '--measure':
+        print(measure(*sys.argv[2:5]))
+    else:
+        memory_report([int(size) for size in sys.argv[1:]] or [1024, 4096, 8192])
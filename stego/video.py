@@ -0,0 +1,187 @@
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from stego.labs import load_lab
+
+QUEUE_SIZE = 16  # скільки кадрів може бути «в дорозі» між декодуванням і записом
+FOURCC = 'mp4v'
+MODES = ('luma', 'channels')  # яскравість (Y у YCrCb) або кожен канал BGR окремо
+
+
+class FramePatterns:
+    """Адитивні шаблони водяного знака (lab5, коефіцієнт [4, 4] кожного блоку 8x8) для кожної роздільності.
+
+    Бінарна маска та піксельний шаблон обчислюються один раз для розміру кадру, а не для кожного кадру.
+    """
+
+    def __init__(self, watermark, strength=10):
+        self.script = load_lab('lab5')
+        self.watermark = watermark if watermark.ndim == 2 else cv2.cvtColor(watermark, cv2.COLOR_BGR2GRAY)
+        self.strength = strength
+        self._patterns = {}
+        self._lock = threading.Lock()
+
+    def mask(self, shape):
+        """Бінарна маска (H // 8, W // 8), як у watermark_mask lab5."""
+        return self.script.watermark_mask(self.watermark, shape[:2])
+
+    def get(self, shape):
+        """Шаблон float32 (H, W): сума по блоках +-strength x базисна функція (4, 4); неповні крайові блоки - нулі."""
+        height, width = shape[:2]
+        with self._lock:
+            pattern = self._patterns.get((height, width))
+            if pattern is None:
+                pattern = np.zeros((height, width), dtype=np.float32)
+                pattern[:height - height % 8, :width - width % 8] = self.script.watermark_pattern(self.mask(shape), self.strength)
+                pattern.setflags(write=False)
+                self._patterns[height, width] = pattern
+        return pattern
+
+
+def embed_frame(frame, patterns, mode='luma'):
+    """Вбудовує водяний знак у кадр BGR (або сірий) і повертає новий кадр того самого формату."""
+    pattern = patterns.get(frame.shape)
+    if frame.ndim == 2:
+        return np.clip(frame + pattern, 0, 255).astype(np.uint8)
+    if mode == 'channels':
+        return np.clip(frame + pattern[:, :, np.newaxis], 0, 255).astype(np.uint8)
+    ycrcb = cv2.cvtColor(frame, cv2.COLOR_BGR2YCrCb)
+    ycrcb[:, :, 0] = np.clip(ycrcb[:, :, 0] + pattern, 0, 255).astype(np.uint8)
+    return cv2.cvtColor(ycrcb, cv2.COLOR_YCrCb2BGR)
+
+
+def extract_frame(watermarked, original, mode='luma'):
+    """Невсліпе витягування маски з кадру (порівняння коефіцієнтів [4, 4] з оригінальним кадром)."""
+    script = load_lab('lab5')
+    if watermarked.ndim == 3:
+        if mode == 'luma':
+            watermarked = cv2.cvtColor(watermarked, cv2.COLOR_BGR2YCrCb)[:, :, 0]
+            original = cv2.cvtColor(original, cv2.COLOR_BGR2YCrCb)[:, :, 0]
+        else:
+            watermarked, original = watermarked.mean(axis=2), original.mean(axis=2)
+    wm_shape = (original.shape[0] // 8, original.shape[1] // 8)
+    return script.extract_watermark_dct_batched(watermarked, original, wm_shape) > 0
+
+
+def read_frames(capture, frames, stop):
+    """Потік декодування: кладе кадри в обмежену чергу; None - кінець відео."""
+    try:
+        while not stop.is_set():
+            ok, frame = capture.read()
+            if not ok:
+                break
+            frames.put(frame)
+    finally:
+        frames.put(None)
+
+
+def watermark_video(source, output, watermark, strength=10, mode='luma', workers=None, queue_size=QUEUE_SIZE, fourcc=FOURCC):
+    """Вбудовує водяний знак у кожен кадр відео.
+
+    Декодування (окремий потік), вбудовування (пул потоків) та кодування (поточний потік) працюють
+    конвеєром: декодовані кадри та задачі на вбудовування проходять через черги обмеженого розміру,
+    тож у пам'яті не більше ~2 x queue_size кадрів, а порядок кадрів зберігається.
+    OpenCV та NumPy звільняють GIL, тому етапи виконуються паралельно.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Невідомий режим {mode}, очікується один з: {', '.join(MODES)}.")
+    capture = cv2.VideoCapture(source)
+    if not capture.isOpened():
+        raise ValueError(f"Не вдалося відкрити відео {source}.")
+    fps = capture.get(cv2.CAP_PROP_FPS) or 25
+    size = (int(capture.get(cv2.CAP_PROP_FRAME_WIDTH)), int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+    writer = cv2.VideoWriter(output, cv2.VideoWriter_fourcc(*fourcc), fps, size)
+    if not writer.isOpened():
+        capture.release()
+        raise ValueError(f"Не вдалося створити {output} з кодеком {fourcc}.")
+
+    patterns = FramePatterns(watermark, strength)
+    frames, pending = queue.Queue(maxsize=queue_size), queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    reader = threading.Thread(target=read_frames, args=(capture, frames, stop), daemon=True)
+    start = time.perf_counter()
+    count = 0
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        def dispatch():
+            # Передає кадри в пул; черга pending обмежує кількість кадрів, що вбудовуються одночасно
+            while (frame := frames.get()) is not None:
+                pending.put(executor.submit(embed_frame, frame, patterns, mode))
+            pending.put(None)
+
+        dispatcher = threading.Thread(target=dispatch, daemon=True)
+        reader.start()
+        dispatcher.start()
+        try:
+            while (future := pending.get()) is not None:
+                writer.write(future.result())
+                count += 1
+        finally:
+            stop.set()
+            while dispatcher.is_alive():  # звільняємо місце в чергах, щоб потоки завершилися
+                try:
+                    pending.get_nowait()
+                except queue.Empty:
+                    dispatcher.join(0.01)
+            reader.join()
+            capture.release()
+            writer.release()
+    seconds = time.perf_counter() - start
+    return {'frames': count, 'seconds': seconds, 'fps': count / seconds if seconds else 0.0,
+            'width': size[0], 'height': size[1]}
+
+
+def write_synthetic_clip(path, frames=100, width=640, height=360, fps=25, fourcc=FOURCC):
+    """Записує синтетичне відео: градієнт, що рухається, з шумом (для тестів без зовнішніх файлів)."""
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*fourcc), fps, (width, height))
+    if not writer.isOpened():
+        raise ValueError(f"Не вдалося створити {path} з кодеком {fourcc}.")
+    rng = np.random.default_rng(0)
+    y, x = np.mgrid[0:height, 0:width]
+    for index in range(frames):
+        base = (x + y + index * 4) % 256
+        frame = np.stack([base, (x * 2 + index) % 256, (y * 2 - index) % 256], axis=2)
+        writer.write(np.clip(frame + rng.normal(0, 8, frame.shape), 0, 255).astype(np.uint8))
+    writer.release()
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m stego.video', description="Вбудовування водяного знака (lab5) у відео.")
+    parser.add_argument('source', nargs='?', help="вхідне відео (без нього див. --synthetic)")
+    parser.add_argument('output', help="вихідне відео")
+    parser.add_argument('-w', '--watermark', required=True, help="зображення водяного знака")
+    parser.add_argument('--strength', type=float, default=10)
+    parser.add_argument('--mode', choices=MODES, default='luma')
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count(), help="потоків вбудовування")
+    parser.add_argument('--queue', type=int, default=QUEUE_SIZE, help="розмір черг між етапами (у кадрах)")
+    parser.add_argument('--fourcc', default=FOURCC, help="кодек вихідного відео")
+    parser.add_argument('--synthetic', type=int, metavar='FRAMES', help="згенерувати синтетичний кліп як вхідний")
+    args = parser.parse_args(argv)
+
+    watermark = cv2.imread(args.watermark, cv2.IMREAD_GRAYSCALE)
+    if watermark is None:
+        parser.error(f"Не вдалося прочитати {args.watermark}.")
+    source = args.source
+    if args.synthetic and source is not None:
+        parser.error("--synthetic генерує вхідне відео сам, тож несумісний з явним source (його буде перезаписано)")
+    if args.synthetic:
+        source = os.path.splitext(args.output)[0] + '_synthetic.avi'
+        write_synthetic_clip(source, args.synthetic, fourcc='MJPG')
+    elif source is None:
+        parser.error("потрібне вхідне відео або --synthetic")
+    result = watermark_video(source, args.output, watermark, args.strength, args.mode, args.workers, args.queue, args.fourcc)
+    print(json.dumps({'input': source, 'output': args.output, **result}))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
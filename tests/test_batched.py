@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from stego.labs import load_lab
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(0)
+
+
+def test_lab4_batched_and_parallel_match_loop(rng):
+    script = load_lab('lab4')
+    image = rng.integers(0, 256, (96, 128), dtype=np.uint8)
+    bits = rng.integers(0, 2, 150).astype(np.uint8)
+    stego = script.embed_koch_zhao(image, bits)
+    assert np.array_equal(script.embed_koch_zhao(image, bits, batched=True), stego)
+    assert np.array_equal(script.embed_koch_zhao(image, bits, workers=3), stego)
+    assert script.extract_koch_zhao(stego, bits.size, batched=True) == script.extract_koch_zhao(stego, bits.size)
+
+
+def embed_variants(script, image, watermark, strength):
+    return (script.embed_watermark_dct(image, watermark, strength),
+            script.embed_watermark_dct(image, watermark, strength, workers=3),
+            script.embed_watermark_dct_batched(image, watermark, strength),
+            script.embed_watermark_dct_batched(image, watermark, strength, workers=3))
+
+
+def test_lab5_batched_and_parallel_match_loop(rng):
+    script = load_lab('lab5')
+    image = rng.integers(0, 256, (100, 130), dtype=np.uint8)  # неповні блоки на краях
+    watermark = (rng.integers(0, 2, (12, 16)) * 255).astype(np.uint8)
+    loop, loop_parallel, batched, batched_parallel = embed_variants(script, image, watermark, 10)
+    assert np.array_equal(loop_parallel, loop)
+    assert np.array_equal(batched, loop)
+    assert np.array_equal(batched_parallel, loop)
+    assert np.array_equal(script.extract_watermark_dct_batched(loop, image, (12, 16)),
+                          script.extract_watermark_dct(loop, image, (12, 16)))
+
+
+@pytest.mark.parametrize('strength', [8, 16])
+def test_lab5_batched_is_within_one_grey_level_at_multiples_of_8(rng, strength):
+    script = load_lab('lab5')
+    image = rng.integers(0, 256, (96, 128), dtype=np.uint8)
+    watermark = (rng.integers(0, 2, (12, 16)) * 255).astype(np.uint8)
+    loop, loop_parallel, batched, batched_parallel = embed_variants(script, image, watermark, strength)
+    assert np.array_equal(loop_parallel, loop)
+    assert np.array_equal(batched_parallel, batched)
+    assert np.abs(batched.astype(np.int16) - loop).max() <= 1
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+from PIL import Image
+
+from stego import codec
+from stego.labs import load_lab
+
+MESSAGE = "café, привіт"
+
+
+def byte_length(message):
+    return len(message.encode('utf-8'))
+
+
+def test_lab1_round_trips_non_ascii_message_by_byte_length():
+    encoder, decoder = load_lab('lab1', 'encoder'), load_lab('lab1', 'decoder')
+    image = np.random.default_rng(0).integers(0, 256, (32, 32, 3), dtype=np.uint8)
+    length = byte_length(MESSAGE)
+    assert decoder.extract_message(encoder.embed_sequential(image, MESSAGE), length) == MESSAGE
+    assert decoder.extract_message_fast(encoder.embed_sequential_fast(image, MESSAGE), length) == MESSAGE
+    assert decoder.extract_message_random(encoder.embed_random(image, MESSAGE, 7), length, 7) == MESSAGE
+
+
+def test_lab3_round_trips_non_ascii_message_by_byte_length(tmp_path):
+    script = load_lab('lab3')
+    source, output = str(tmp_path / 'cover.png'), str(tmp_path / 'stego.png')
+    image = np.random.default_rng(1).integers(0, 256, (32, 32, 3), dtype=np.uint8)
+    Image.fromarray(image).save(source)
+    script.embed_data(source, MESSAGE, output)
+    assert script.extract_data(output, byte_length(MESSAGE)) == MESSAGE
+
+
+def reader(bits):
+    return lambda start, count: bits[start:start + count]
+
+
+def test_pack_unpack_round_trip():
+    bits = codec.pack(MESSAGE)
+    assert codec.unpack_text(reader(bits), bits.size) == MESSAGE
+
+
+def test_unpack_rejects_crc_mismatch():
+    bits = codec.pack(MESSAGE).copy()
+    bits[-1] ^= 1
+    with pytest.raises(ValueError):
+        codec.unpack(reader(bits))
+
+
+def test_unpack_returns_none_for_truncated_header():
+    bits = codec.pack(MESSAGE)[:codec.HEADER_BITS - 8]
+    assert codec.unpack(reader(bits)) is None
+
+
+def test_unpack_returns_none_without_magic_or_when_length_exceeds_capacity():
+    bits = codec.pack(MESSAGE)
+    assert codec.unpack(reader(np.zeros_like(bits))) is None
+    assert codec.unpack(reader(bits), bits.size - 8) is None
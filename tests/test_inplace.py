@@ -0,0 +1,56 @@
+import struct
+
+import cv2
+import numpy as np
+import pytest
+
+from stego import codec, inplace
+from stego.labs import load_lab
+
+
+def write_bmp(tmp_path, seed=0):
+    path = str(tmp_path / 'cover.bmp')
+    image = np.random.default_rng(seed).integers(0, 256, (100, 130, 3), dtype=np.uint8)
+    cv2.imwrite(path, image)
+    return path, image
+
+
+def test_block_hide_inplace_with_pad_matches_block_hide(tmp_path):
+    path, image = write_bmp(tmp_path)
+    bits = codec.to_bits("hello")
+    inplace.block_hide_inplace(path, bits, pad=True)
+    expected = load_lab('lab2').block_hide(image[:, :, ::-1], bits)[:, :, ::-1]  # lab2 працює з RGB
+    assert np.array_equal(cv2.imread(path), expected)
+
+
+def test_block_hide_inplace_without_pad_is_extractable(tmp_path):
+    path, image = write_bmp(tmp_path)
+    script = load_lab('lab2')
+    inplace.block_hide_inplace(path, codec.to_bits("hello"))
+    stego = cv2.imread(path)[:, :, ::-1]
+    assert script.extract_block_data(stego, length=5) == "hello"
+    assert np.array_equal(stego[17:], image[17:, :, ::-1])  # 40 бітів - три рядки блоків по 17, далі без змін
+    inplace.block_hide_inplace(path, codec.pack("hi"))
+    assert script.extract_block_data(cv2.imread(path)[:, :, ::-1], header=True) == "hi"
+
+
+def test_embed_sequential_inplace_matches_lab1(tmp_path):
+    path, image = write_bmp(tmp_path)
+    inplace.embed_sequential_inplace(path, codec.to_bits("hello"))
+    assert np.array_equal(cv2.imread(path), load_lab('lab1', 'encoder').embed_sequential_fast(image, "hello"))
+
+
+def bitfields_bmp(path, masks):
+    width = height = 4
+    pixels = bytes(width * height * 4)
+    info = struct.pack('<IiiHHIIiiII', 40, width, height, 1, 32, 3, len(pixels), 0, 0, 0, 0) + struct.pack('<III', *masks)
+    offset = 14 + len(info)
+    with open(path, 'wb') as file:
+        file.write(b'BM' + struct.pack('<IHHI', offset + len(pixels), 0, 0, offset) + info + pixels)
+    return path
+
+
+def test_bitfields_bmp_requires_standard_masks(tmp_path):
+    assert inplace.open_bmp_pixels(bitfields_bmp(tmp_path / 'bgr.bmp', inplace.BGR_MASKS)).shape == (4, 4, 4)
+    with pytest.raises(ValueError):
+        inplace.open_bmp_pixels(bitfields_bmp(tmp_path / 'rgb.bmp', (0xFF, 0xFF00, 0xFF0000)))
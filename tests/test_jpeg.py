@@ -0,0 +1,30 @@
+import cv2
+import numpy as np
+import pytest
+
+from stego import codec, jpeg
+from stego.labs import load_lab
+
+
+def encode(shape, quality=90):
+    image = cv2.GaussianBlur(np.random.default_rng(0).integers(0, 256, shape, dtype=np.uint8), (5, 5), 0)
+    return cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, quality])[1].tobytes()
+
+
+@pytest.mark.parametrize('shape', [(128, 160), (144, 192, 3)])
+def test_parse_to_bytes_is_byte_identical(shape):
+    data = encode(shape)
+    assert jpeg.JpegImage(data).to_bytes() == data
+
+
+@pytest.mark.parametrize('shape', [(128, 160), (144, 192, 3)])
+def test_koch_zhao_survives_reparse(shape):
+    bits = codec.pack("привіт")
+    image = jpeg.embed_koch_zhao(jpeg.JpegImage(encode(shape)), bits)
+    data = image.to_bytes()
+    reparsed = jpeg.JpegImage(data, lazy=True)
+    assert jpeg.extract_koch_zhao(reparsed, bits.size) == codec.bits_to_string(bits)
+    assert jpeg.extract_koch_zhao(reparsed) == codec.bits_to_string(codec.to_bits("привіт"))
+    # Декодовані пікселі дають ті самі біти через lab4
+    pixels = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_GRAYSCALE)
+    assert load_lab('lab4').extract_koch_zhao(pixels, bits.size) == codec.bits_to_string(bits)
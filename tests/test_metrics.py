@@ -0,0 +1,21 @@
+import numpy as np
+
+from stego import metrics
+
+
+def reference_mse(a, b):
+    return ((a.astype(np.float64) - b.astype(np.float64)) ** 2).mean()
+
+
+def test_mse_does_not_overflow_on_large_differences():
+    a = np.zeros((1024, 1024, 3), dtype=np.uint8)
+    b = np.full_like(a, 255)
+    assert metrics.mse(a, b) == reference_mse(a, b) == 65025
+
+
+def test_mse_matches_float_reference_on_random_pair():
+    rng = np.random.default_rng(0)
+    a = rng.integers(0, 256, (2048, 2048), dtype=np.uint8)
+    b = rng.integers(0, 256, (2048, 2048), dtype=np.uint8)
+    assert np.isclose(metrics.mse(a, b), reference_mse(a, b))
+    assert np.isclose(metrics.psnr(a, b), 10 * np.log10(255 ** 2 / reference_mse(a, b)))
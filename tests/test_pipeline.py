@@ -0,0 +1,22 @@
+import numpy as np
+import pytest
+
+from stego.pipeline import Pipeline
+
+IMAGE = np.zeros((64, 64, 3), dtype=np.uint8)
+
+
+@pytest.mark.parametrize('path, expected', [('out', '.png'), ('a.b/out', '.png'), ('dir/out.JPG', '.jpg')])
+def test_encode_takes_extension_from_path_only_when_present(path, expected):
+    assert Pipeline(IMAGE).encode(path).stages[-1][1]['ext'] == expected
+
+
+@pytest.mark.parametrize('lab', [1, 2, 3])
+def test_grayscale_rejects_colour_embedders(lab):
+    with pytest.raises(ValueError):
+        Pipeline(IMAGE).grayscale().embed(lab, "hi").plan()
+
+
+def test_koch_zhao_requires_multiple_of_8_without_fit8():
+    with pytest.raises(ValueError, match='fit8'):
+        Pipeline(np.zeros((100, 101, 3), dtype=np.uint8)).embed(4, "hi").run()
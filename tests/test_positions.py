@@ -0,0 +1,25 @@
+import numpy as np
+
+from stego import positions
+
+SEED = 340698234968
+
+
+def test_keyed_positions_is_a_permutation_with_stable_prefix():
+    total = 1000  # не степінь двійки - перевіряє обхід циклу
+    permutation = positions.keyed_positions(SEED, total, total)
+    assert np.array_equal(np.sort(permutation), np.arange(total))
+    assert np.array_equal(positions.keyed_positions(SEED, total, 10), permutation[:10])
+    assert np.array_equal(positions.keyed_positions(SEED, total, 10, start=990), permutation[990:])
+
+
+def test_keyed_positions_inverse_round_trip():
+    data = np.random.default_rng(0).integers(0, 256, 777, dtype=np.uint8)
+    permutation = positions.keyed_positions(SEED, data.size, data.size)
+    shuffled = data[permutation]
+    assert np.array_equal(shuffled[positions.inverse_permutation(permutation)], data)
+
+
+def test_shuffled_indexes_inverse_round_trip():
+    indexes = positions.shuffled_indexes(42, 500)
+    assert np.array_equal(indexes[positions.inverse_shuffled_indexes(42, 500)], np.arange(500))
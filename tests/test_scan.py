@@ -0,0 +1,23 @@
+import os
+
+import cv2
+import numpy as np
+
+from stego import scan
+from stego.labs import ROOT_DIR
+
+
+def cover():
+    return cv2.imread(os.path.join(ROOT_DIR, 'lab1', 'images', 'image_1.jpg'))
+
+
+def test_clean_image_scores_low():
+    assert scan.analyse_image(cover())['score'] < 0.1
+
+
+def test_full_lsb_replacement_scores_high():
+    image = cover()
+    image[:, :, 0] = (image[:, :, 0] & 254) | np.random.default_rng(1).integers(0, 2, image.shape[:2], dtype=np.uint8)
+    result = scan.analyse_image(image)
+    assert result['channels'][0]['score'] > 0.8
+    assert max(channel['score'] for channel in result['channels'][1:]) < 0.1